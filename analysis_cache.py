@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of analysis results.
+An entry is keyed by the dataset's content hash, the stage name, the
+source of the code that computed it and the call parameters, so an
+unchanged lottery_results.csv never has its statistics recomputed and a
+changed dataset (or analysis code) can never be served stale results.
+Each entry is one zlib-compressed compact JSON file. Reading an entry
+refreshes its mtime, and once the directory grows past max_bytes the
+least recently used entries are deleted. A small index remembers each
+dataset's size, mtime and hash (like the generate_csv manifest), so an
+untouched file is not even re-hashed, and drops a file's old entries as
+soon as its content changes. Run it as a script to see the cache size,
+shrink it (--max-mb) or empty it (--clear).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import zlib
+
+from generate_csv import file_digest
+
+CACHE_VERSION = 1
+CACHE_DIR = '.analysis_cache'
+MAX_BYTES = 32 << 20
+INDEX_FILE = 'datasets.json'
+ENTRY_SUFFIX = '.jz'
+
+_source_hashes = {}
+
+
+def source_hash(*paths):
+    """Return a short sha256 over the given source files (memoized per process)."""
+    if paths not in _source_hashes:
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _source_hashes[paths] = digest.hexdigest()[:16]
+    return _source_hashes[paths]
+
+
+class AnalysisCache:
+    """Size-bounded LRU cache of JSON-compatible analysis results on disk."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r') as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return index if index.get('version') == CACHE_VERSION else {}
+
+    def _save_index(self, index):
+        index['version'] = CACHE_VERSION
+        tmp_file = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_file, self._index_path())
+
+    def dataset_hash(self, path):
+        """Return the sha256 of a dataset file, re-hashing it only when its size or mtime moved.
+
+        When the content behind a known path changes, the entries of its old
+        hash are deleted.
+        """
+        index = self._load_index()
+        datasets = index.setdefault('datasets', {})
+        name = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = datasets.get(name)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['sha256']
+
+        digest = file_digest(path)
+        if entry and entry['sha256'] != digest:
+            self.invalidate(entry['sha256'])
+        datasets[name] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest}
+        self._save_index(index)
+        return digest
+
+    @staticmethod
+    def key(dataset, stage, **params):
+        """Return the entry key of a stage's result for a dataset hash and call parameters."""
+        spec = json.dumps([CACHE_VERSION, dataset, stage, params], sort_keys=True, separators=(',', ':'))
+        return f"{dataset[:16]}-{hashlib.sha256(spec.encode()).hexdigest()[:32]}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss (a corrupt entry counts as one)."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = json.loads(zlib.decompress(f.read()))
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, zlib.error, ValueError):
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a JSON-compatible value, then evict entries past max_bytes."""
+        path = self._path(key)
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(zlib.compress(json.dumps(value, separators=(',', ':')).encode(), 6))
+        os.replace(tmp_file, path)
+        self.evict()
+
+    def fetch(self, key, compute):
+        """Return the cached value for key, calling compute() and storing its result on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def entries(self):
+        """Return (mtime, size, path) of every entry, least recently used first."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:  # evicted by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+        return sorted(entries)
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes; returns how many went."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, dataset):
+        """Delete every entry computed from the dataset with this hash."""
+        prefix = dataset[:16] + '-'
+        for _, _, path in self.entries():
+            if os.path.basename(path).startswith(prefix):
+                self._remove(path)
+
+    def clear(self):
+        """Delete every entry and the dataset index."""
+        self.evict(0)
+        self._remove(self._index_path())
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def main():
+    """Show or clear the analysis cache."""
+    parser = argparse.ArgumentParser(description="On-disk analysis cache")
+    parser.add_argument('--dir', default=CACHE_DIR, help="cache directory")
+    parser.add_argument('--clear', action='store_true', help="delete every cached result")
+    parser.add_argument('--max-mb', type=float, default=None, help="evict down to this many megabytes")
+    args = parser.parse_args()
+
+    cache = AnalysisCache(args.dir)
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {args.dir}")
+        return
+    if args.max_mb is not None:
+        removed = cache.evict(int(args.max_mb * (1 << 20)))
+        print(f"🧹 Evicted {removed} entries")
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"🗄️  {args.dir}: {len(entries)} entries, {total / 1024:.1f} KiB (limit {cache.max_bytes / (1 << 20):.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
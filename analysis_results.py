@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Structured results of an analyzer run.
+AnalysisResults holds everything the analyzers compute - frequencies, gap
+statistics, patterns, hot/cold windows and predictions - as plain Python
+data, so it can be saved as JSON, loaded back, and handed to the HTML
+report without running the analyzer in a subprocess. The render_*
+functions turn it into the text the analyzers print; printing is just
+one way to look at the results. Ranges and labels come from the game
+rules the results were computed for.
+"""
+
+import json
+import math
+from collections import Counter
+
+from game_rules import EUROMILLIONS, GameRules
+
+
+def counter_pairs(counter):
+    # Pairs keep the Counter's insertion order, which breaks most_common() ties
+    return [[int(num), int(count)] for num, count in counter.items()]
+
+
+def json_number(value):
+    """Return value as a JSON-safe number: NaN and infinities become None (null)."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def int_keys(mapping):
+    return {int(key): value for key, value in mapping.items()}
+
+
+class AnalysisResults:
+    """Everything one analyzer run produces."""
+
+    def __init__(self, draws, date_range, main_freq, lucky_freq, main_gaps, lucky_gaps, patterns,
+                 pattern_metrics, recent_draws, recent_main_freq, recent_lucky_freq, predictions=None,
+                 rules=EUROMILLIONS, cooccurrence=None):
+        self.draws = draws
+        self.date_range = date_range
+        self.main_freq = main_freq  # Counters
+        self.lucky_freq = lucky_freq
+        self.main_gaps = main_gaps  # {number: {'mean', 'median', 'p90', 'max', 'current'}}
+        self.lucky_gaps = lucky_gaps
+        self.patterns = patterns
+        self.pattern_metrics = pattern_metrics
+        self.recent_draws = recent_draws
+        self.recent_main_freq = recent_main_freq
+        self.recent_lucky_freq = recent_lucky_freq
+        self.predictions = predictions or {}
+        self.rules = rules
+        self.cooccurrence = cooccurrence  # {'main_pairs', 'triples', 'star_pairs', 'cross': [[numbers], count] lists}
+
+    def current_gaps(self):
+        """Return ({number: current gap} for main balls, same for lucky stars)."""
+        return ({num: stats['current'] for num, stats in self.main_gaps.items()},
+                {num: stats['current'] for num, stats in self.lucky_gaps.items()})
+
+    def to_dict(self):
+        """Return the results as strict JSON-compatible data (statistics that are not numbers become None)."""
+        return {
+            'game': self.rules.to_dict(),
+            'draws': int(self.draws),
+            'date_range': [str(date) for date in self.date_range],
+            'main_freq': counter_pairs(self.main_freq),
+            'lucky_freq': counter_pairs(self.lucky_freq),
+            'main_gaps': {str(num): {key: json_number(value) for key, value in stats.items()}
+                          for num, stats in self.main_gaps.items()},
+            'lucky_gaps': {str(num): {key: json_number(value) for key, value in stats.items()}
+                           for num, stats in self.lucky_gaps.items()},
+            'patterns': {key: dict(value) if key == 'sum_ranges' else int(value)
+                         for key, value in self.patterns.items()},
+            'pattern_metrics': {key: [int(count) for count in value] if hasattr(value, '__len__')
+                                else json_number(None if value is None else float(value))
+                                for key, value in self.pattern_metrics.items()},
+            'recent_draws': int(self.recent_draws),
+            'recent_main_freq': counter_pairs(self.recent_main_freq),
+            'recent_lucky_freq': counter_pairs(self.recent_lucky_freq),
+            'predictions': {method: {'main': [int(num) for num in pred['main']],
+                                     'lucky': [int(num) for num in pred['lucky']]}
+                            for method, pred in self.predictions.items()},
+            'cooccurrence': self.cooccurrence,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild results from to_dict() output."""
+        return cls(data['draws'], tuple(data['date_range']),
+                   Counter(dict(data['main_freq'])), Counter(dict(data['lucky_freq'])),
+                   int_keys(data['main_gaps']), int_keys(data['lucky_gaps']),
+                   data['patterns'], data['pattern_metrics'], data['recent_draws'],
+                   Counter(dict(data['recent_main_freq'])), Counter(dict(data['recent_lucky_freq'])),
+                   data['predictions'], GameRules.from_dict(data['game']) if 'game' in data else EUROMILLIONS,
+                   data.get('cooccurrence'))
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), indent=indent, allow_nan=False)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def save(self, path):
+        """Write the results to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, allow_nan=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _heading(title, width=50):
+    return ["", "=" * width, title, "=" * width]
+
+
+def _star_name(rules):
+    """Plural name of the second pool, e.g. 'Lucky Stars'."""
+    return f"{rules.star_label}s"
+
+
+def render_basic_statistics(main_freq, lucky_freq, draws, rules=EUROMILLIONS):
+    """Text of the BASIC STATISTICS section."""
+    lines = _heading("BASIC STATISTICS")
+    sections = [(f"\nMain Balls Frequency (1-{rules.main_pool}):", main_freq, draws * rules.main_picks, 10)]
+    if rules.star_picks:
+        sections.append((f"\n{_star_name(rules)} Frequency (1-{rules.star_pool}):", lucky_freq,
+                         draws * rules.star_picks, 6))
+    for label, freq, total, shown in sections:
+        lines += [label, "Most frequent:"]
+        for num, count in freq.most_common(shown):
+            lines.append(f"  {num:2d}: {count:3d} times ({count / total * 100:.1f}%)")
+        lines.append("Least frequent:")
+        for num, count in freq.most_common()[-shown:]:
+            lines.append(f"  {num:2d}: {count:3d} times ({count / total * 100:.1f}%)")
+    return "\n".join(lines)
+
+
+def _stat(value, spec):
+    """Format a statistic, or 'n/a' when there was nothing to compute it from."""
+    return "n/a" if value is None else format(value, spec)
+
+
+def render_gap_analysis(main_gaps, lucky_gaps, rules=EUROMILLIONS):
+    """Text of the GAP ANALYSIS section."""
+    lines = _heading("GAP ANALYSIS")
+    lines.append("Numbers with longest current gaps (overdue):")
+    sections = [("Main balls:", main_gaps, 10)]
+    if rules.star_picks:
+        sections.append((f"{_star_name(rules).capitalize()}:", lucky_gaps, 6))
+    for label, gap_stats, shown in sections:
+        lines.append(label)
+        current = sorted(((num, stats['current']) for num, stats in gap_stats.items()),
+                         key=lambda x: x[1], reverse=True)
+        for num, gap in current[:shown]:
+            stats = gap_stats[num]
+            lines.append(f"  {num:2d}: {gap:3d} draws ago (mean {_stat(stats['mean'], '.1f')}, "
+                         f"median {_stat(stats['median'], '.0f')}, p90 {_stat(stats['p90'], '.0f')}, max {stats['max']})")
+    return "\n".join(lines)
+
+
+def render_pattern_analysis(patterns, metrics, draws, rules=EUROMILLIONS):
+    """Text of the PATTERN ANALYSIS section (metrics may be None to leave out the spread)."""
+    lines = _heading("PATTERN ANALYSIS")
+    lines.append(f"Pattern frequencies out of {draws} draws:")
+    for label, key in (("Consecutive pairs", 'consecutive_pairs'), ("Consecutive triplets", 'consecutive_triplets'),
+                       ("Same decade concentration", 'same_decade'), ("All odd", 'all_odd'),
+                       ("All even", 'all_even'), ("Majority odd", 'majority_odd'),
+                       ("Majority even", 'majority_even')):
+        lines.append(f"  {label}: {patterns[key]} ({patterns[key]/draws*100:.1f}%)")
+
+    lines.append("\nSum ranges:")
+    for sum_range, count in sorted(patterns['sum_ranges'].items()):
+        lines.append(f"  {sum_range}: {count} ({count/draws*100:.1f}%)")
+
+    if metrics is not None:
+        lines.append("\nSpread:")
+        lines.append(f"  Average span (highest - lowest): {_stat(json_number(metrics['mean_span']), '.1f')}")
+        lines.append(f"  Average widest gap between balls: {_stat(json_number(metrics['mean_max_gap']), '.1f')}")
+        half = rules.main_pool // 2
+        lines.append(f"  Low (1-{half}) / high ({half + 1}-{rules.main_pool}) split:")
+        for low_count, count in enumerate(metrics['low_count']):
+            lines.append(f"    {low_count} low / {rules.main_picks - low_count} high: {count} ({count/draws*100:.1f}%)")
+    return "\n".join(lines)
+
+
+def render_hot_cold(recent_main_freq, recent_lucky_freq, recent_draws, rules=EUROMILLIONS):
+    """Text of the HOT/COLD ANALYSIS section."""
+    lines = _heading(f"HOT/COLD ANALYSIS (Last {recent_draws} draws)")
+    total_main = sum(recent_main_freq.values())
+    total_lucky = sum(recent_lucky_freq.values())
+
+    lines.append("HOT main balls (most frequent in recent draws):")
+    for num, count in recent_main_freq.most_common(10):
+        lines.append(f"  {num:2d}: {count:2d} times ({count / total_main * 100:.1f}%)")
+
+    lines.append("\nCOLD main balls (least frequent in recent draws):")
+    cold_main = [num for num in range(1, rules.main_pool + 1) if num not in recent_main_freq]
+    if cold_main:
+        lines.append(f"  Numbers not drawn: {cold_main}")
+    for num, count in recent_main_freq.most_common()[-10:]:
+        lines.append(f"  {num:2d}: {count:2d} times ({count / total_main * 100:.1f}%)")
+
+    if not rules.star_picks:
+        return "\n".join(lines)
+    lines.append(f"\nHOT {_star_name(rules).lower()}:")
+    for num, count in recent_lucky_freq.most_common(6):
+        lines.append(f"  {num:2d}: {count:2d} times ({count / total_lucky * 100:.1f}%)")
+
+    lines.append(f"\nCOLD {_star_name(rules).lower()}:")
+    cold_lucky = [num for num in range(1, rules.star_pool + 1) if num not in recent_lucky_freq]
+    if cold_lucky:
+        lines.append(f"  Numbers not drawn: {cold_lucky}")
+    return "\n".join(lines)
+
+
+def render_cooccurrence(cooccurrence, rules=EUROMILLIONS, shown=5):
+    """Text of the NUMBERS DRAWN TOGETHER section."""
+    lines = _heading("NUMBERS DRAWN TOGETHER")
+    sections = [("Main ball pairs:", 'main_pairs'), ("Main ball triples:", 'triples'),
+                (f"{rules.star_label} pairs:", 'star_pairs'), (f"Main ball / {rules.star_label} pairs:", 'cross')]
+    for label, kind in sections:
+        top = [(numbers, count) for numbers, count in cooccurrence[kind][:shown] if count]
+        if not top:
+            continue  # e.g. no star pairs in a one-star game
+        lines.append(label)
+        for numbers, count in top:
+            lines.append(f"  {' & '.join(f'{num:2d}' for num in numbers)}: {count} times")
+    return "\n".join(lines)
+
+
+def render_predictions(predictions):
+    """Text of the PREDICTION METHODS table."""
+    lines = ["\n🎱 PREDICTION METHODS:", "-" * 70]
+    for method, pred in predictions.items():
+        method_name = method.replace('_', ' ').title()
+        main_str = ' - '.join(f"{num:2d}" for num in sorted(pred['main']))
+        lucky_str = ' - '.join(f"{num:2d}" for num in sorted(pred['lucky']))
+        lines.append(f"{method_name:15}: [{main_str}]" + (f" + [{lucky_str}]" if pred['lucky'] else ""))
+    return "\n".join(lines)
+
+
+def render_text(results):
+    """The full analysis as the analyzers print it: every section, then the predictions."""
+    return "\n".join([
+        "\n".join(_heading("LOTTERY PREDICTIONS FOR NEXT DRAW", 70)),
+        render_basic_statistics(results.main_freq, results.lucky_freq, results.draws, results.rules),
+        render_gap_analysis(results.main_gaps, results.lucky_gaps, results.rules),
+        render_pattern_analysis(results.patterns, results.pattern_metrics, results.draws, results.rules),
+        render_hot_cold(results.recent_main_freq, results.recent_lucky_freq, results.recent_draws, results.rules),
+    ] + ([render_cooccurrence(results.cooccurrence, results.rules)] if results.cooccurrence else []) + [
+        render_predictions(results.predictions),
+    ])
+
+
+def render_recommendation(title, pred, rules=EUROMILLIONS):
+    """Text of one recommended ticket."""
+    main_str = ' - '.join(f"{num:2d}" for num in pred['main'])
+    text = f"{title}\n   Main Balls: {main_str}"
+    if rules.star_picks:
+        lucky_str = ' - '.join(f"{num:2d}" for num in pred['lucky'])
+        text += f"\n   {_star_name(rules)}: {lucky_str}"
+    return text
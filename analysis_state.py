@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Incremental analysis state for lottery draws.
+Keeps every aggregate the analyzers report (frequencies, last-seen
+positions, gap accumulators, pattern tallies and a ring buffer of recent
+draws) and updates them in O(1) per appended draw. The state can be saved
+to disk so a new draw costs one append instead of a full rescan.
+The per-draw pattern rules (pattern_features, tally_pattern) live here
+and are shared with row_stats, so every engine buckets draws alike.
+"""
+
+import json
+import os
+from collections import Counter, defaultdict, deque
+
+from game_rules import EUROMILLIONS
+
+STATE_VERSION = 1
+DEFAULT_WINDOW = 250
+
+
+def pattern_features(main_nums, sum_width=25):
+    """Return the pattern features of one draw's main balls.
+
+    Matches the bucketing used by the analyzers' pattern_analysis: the
+    number of consecutive pairs, the count of distinct decades, the odd
+    count and the sum_width-wide sum range label.
+    """
+    main_nums = sorted(main_nums)
+    consecutive_count = 0
+    for i in range(len(main_nums) - 1):
+        if main_nums[i + 1] - main_nums[i] == 1:
+            consecutive_count += 1
+    decades = len(set(num // 10 for num in main_nums))
+    odd_count = sum(1 for num in main_nums if num % 2 == 1)
+    total_sum = sum(main_nums)
+    sum_range = f"{(total_sum // sum_width) * sum_width}-{(total_sum // sum_width) * sum_width + sum_width - 1}"
+    return consecutive_count, decades, odd_count, sum_range
+
+
+def empty_patterns():
+    """Return a zeroed pattern tally in the analyzers' layout."""
+    return {
+        'consecutive_pairs': 0,
+        'consecutive_triplets': 0,
+        'same_decade': 0,
+        'all_odd': 0,
+        'all_even': 0,
+        'majority_odd': 0,
+        'majority_even': 0,
+        'sum_ranges': defaultdict(int)
+    }
+
+
+def tally_pattern(patterns, main_nums, main_picks=5, sum_width=25):
+    """Add one draw's main balls to a pattern tally."""
+    consecutive_count, decades, odd_count, sum_range = pattern_features(main_nums, sum_width)
+    if consecutive_count >= 1:
+        patterns['consecutive_pairs'] += 1
+    if consecutive_count >= 2:
+        patterns['consecutive_triplets'] += 1
+    if decades <= (main_picks + 1) // 2:  # Numbers concentrated in half as many decades (3 of 5)
+        patterns['same_decade'] += 1
+    if odd_count == main_picks:
+        patterns['all_odd'] += 1
+    elif odd_count == 0:
+        patterns['all_even'] += 1
+    elif 2 * odd_count > main_picks:
+        patterns['majority_odd'] += 1
+    else:
+        patterns['majority_even'] += 1
+    patterns['sum_ranges'][sum_range] += 1
+
+
+def histogram_percentile(histogram, count, q):
+    """Linear-interpolated percentile q (0-1) of values stored as {value: count}; None when empty."""
+    if count == 0:
+        return None
+    position = q * (count - 1)
+    lower_idx = int(position)
+    upper_idx = min(lower_idx + 1, count - 1)
+    lower = upper = None
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if lower is None and seen > lower_idx:
+            lower = value
+        if seen > upper_idx:
+            upper = value
+            break
+    return lower + (upper - lower) * (position - lower_idx)
+
+
+class AnalysisState:
+    """Running aggregates over a draw history, updated one draw at a time."""
+
+    def __init__(self, main_pool=50, main_picks=5, star_pool=12, star_picks=2, window=DEFAULT_WINDOW):
+        self.main_pool = main_pool
+        self.main_picks = main_picks
+        self.star_pool = star_pool
+        self.star_picks = star_picks
+        self.window = window
+
+        self.draws = 0
+        self.last_draw = None
+        self.main_freq = Counter()
+        self.lucky_freq = Counter()
+        # Index 0 is unused so numbers index directly
+        self.main_last_seen = [-1] * (main_pool + 1)
+        self.lucky_last_seen = [-1] * (star_pool + 1)
+        # Per-number gap accumulators: completed gap count, sum, max and histogram
+        self.main_gaps = [self._empty_gaps() for _ in range(main_pool + 1)]
+        self.lucky_gaps = [self._empty_gaps() for _ in range(star_pool + 1)]
+        self.patterns = empty_patterns()
+        self.recent = deque(maxlen=window)
+
+    @classmethod
+    def for_rules(cls, rules=EUROMILLIONS, window=DEFAULT_WINDOW):
+        """Return an empty state sized for a game's pools."""
+        return cls(rules.main_pool, rules.main_picks, rules.star_pool, rules.star_picks, window)
+
+    @property
+    def pools(self):
+        return (self.main_pool, self.main_picks, self.star_pool, self.star_picks)
+
+    @staticmethod
+    def _empty_gaps():
+        return {'count': 0, 'sum': 0, 'max': 0, 'histogram': Counter()}
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Build a state from [date, ball 1..5, star 1..2] rows."""
+        state = cls(**kwargs)
+        for row in rows:
+            state.append(row[1:])
+        return state
+
+    def append(self, draw):
+        """Add one draw (main balls followed by lucky stars) to the state."""
+        draw = tuple(int(num) for num in draw)
+        main = draw[:self.main_picks]
+        lucky = draw[self.main_picks:self.main_picks + self.star_picks]
+        draw_idx = self.draws
+
+        self.main_freq.update(main)
+        self.lucky_freq.update(lucky)
+        self._record_seen(main, draw_idx, self.main_last_seen, self.main_gaps)
+        self._record_seen(lucky, draw_idx, self.lucky_last_seen, self.lucky_gaps)
+        tally_pattern(self.patterns, main, self.main_picks)
+        self.recent.append(draw)
+
+        self.draws += 1
+        self.last_draw = draw
+
+    def extend(self, draws):
+        """Append several draws in order."""
+        for draw in draws:
+            self.append(draw)
+
+    @staticmethod
+    def _record_seen(numbers, draw_idx, last_seen, gaps):
+        for num in numbers:
+            previous = last_seen[num]
+            if previous != -1:
+                gap = draw_idx - previous
+                accumulator = gaps[num]
+                accumulator['count'] += 1
+                accumulator['sum'] += gap
+                accumulator['histogram'][gap] += 1
+                if gap > accumulator['max']:
+                    accumulator['max'] = gap
+            last_seen[num] = draw_idx
+
+    def frequencies(self):
+        """Return copies of the all-time (main, lucky) frequency Counters."""
+        return Counter(self.main_freq), Counter(self.lucky_freq)
+
+    def current_gaps(self):
+        """Return {number: draws since last seen} for main balls and lucky stars."""
+        current_draw = self.draws - 1
+        main_gaps = {num: current_draw - self.main_last_seen[num] for num in range(1, self.main_pool + 1)}
+        lucky_gaps = {num: current_draw - self.lucky_last_seen[num] for num in range(1, self.star_pool + 1)}
+        return main_gaps, lucky_gaps
+
+    def gap_stats(self):
+        """Return {number: {mean, median, p90, max, current}} for main balls and lucky stars."""
+        main_current, lucky_current = self.current_gaps()
+        return (self._gap_stats(self.main_gaps, main_current),
+                self._gap_stats(self.lucky_gaps, lucky_current))
+
+    @staticmethod
+    def _gap_stats(gaps, current):
+        stats = {}
+        for num, current_gap in current.items():
+            accumulator = gaps[num]
+            count = accumulator['count']
+            stats[num] = {
+                'mean': accumulator['sum'] / count if count else None,
+                'median': histogram_percentile(accumulator['histogram'], count, 0.5),
+                'p90': histogram_percentile(accumulator['histogram'], count, 0.9),
+                'max': accumulator['max'],
+                'current': current_gap,
+            }
+        return stats
+
+    def pattern_counts(self):
+        """Return a copy of the pattern tally."""
+        patterns = dict(self.patterns)
+        patterns['sum_ranges'] = defaultdict(int, self.patterns['sum_ranges'])
+        return patterns
+
+    def recent_frequencies(self, recent_draws):
+        """Return (main, lucky) Counters over the last recent_draws draws.
+
+        Answered from the ring buffer, so recent_draws may not exceed the
+        state's window.
+        """
+        if recent_draws > self.window:
+            raise ValueError(f"Window of {recent_draws} draws exceeds the state's ring buffer ({self.window})")
+        recent = list(self.recent)[-recent_draws:] if recent_draws > 0 else []
+        main_freq, lucky_freq = Counter(), Counter()
+        for draw in recent:
+            main_freq.update(draw[:self.main_picks])
+            lucky_freq.update(draw[self.main_picks:])
+        return main_freq, lucky_freq
+
+    def snapshot(self, top=5, recent_draws=None):
+        """Return a compact summary of the current statistics.
+
+        Lists the top most frequent, most overdue and hottest (over the last
+        recent_draws draws, the whole ring buffer by default) numbers.
+        """
+        main_gaps, lucky_gaps = self.current_gaps()
+        recent_main, recent_lucky = self.recent_frequencies(len(self.recent) if recent_draws is None
+                                                           else recent_draws)
+        return {
+            'draws': self.draws,
+            'last_draw': list(self.last_draw) if self.last_draw else None,
+            'frequent_main': self.main_freq.most_common(top),
+            'frequent_lucky': self.lucky_freq.most_common(top),
+            'overdue_main': sorted(main_gaps.items(), key=lambda x: x[1], reverse=True)[:top],
+            'overdue_lucky': sorted(lucky_gaps.items(), key=lambda x: x[1], reverse=True)[:top],
+            'hot_main': recent_main.most_common(top),
+            'hot_lucky': recent_lucky.most_common(top),
+        }
+
+    def matches_prefix(self, rows):
+        """Return True if this state was built from a prefix of rows.
+
+        Compares the draw count and the ring buffer against the matching rows,
+        which catches a regenerated history without rescanning all of it.
+        """
+        if self.draws > len(rows):
+            return False
+        start = self.draws - len(self.recent)
+        return all(tuple(row[1:]) == draw for row, draw in zip(rows[start:self.draws], self.recent))
+
+    def to_dict(self):
+        """Serialize the state to a JSON-compatible dict."""
+        def gaps_to_list(gaps):
+            return [{'count': g['count'], 'sum': g['sum'], 'max': g['max'],
+                     'histogram': [[gap, count] for gap, count in g['histogram'].items()]}
+                    for g in gaps]
+
+        patterns = dict(self.patterns)
+        patterns['sum_ranges'] = list(self.patterns['sum_ranges'].items())
+        return {
+            'version': STATE_VERSION,
+            'rules': [self.main_pool, self.main_picks, self.star_pool, self.star_picks],
+            'window': self.window,
+            'draws': self.draws,
+            'last_draw': list(self.last_draw) if self.last_draw else None,
+            # Counters are stored as ordered pairs so tie order survives a reload
+            'main_freq': list(self.main_freq.items()),
+            'lucky_freq': list(self.lucky_freq.items()),
+            'main_last_seen': self.main_last_seen,
+            'lucky_last_seen': self.lucky_last_seen,
+            'main_gaps': gaps_to_list(self.main_gaps),
+            'lucky_gaps': gaps_to_list(self.lucky_gaps),
+            'patterns': patterns,
+            'recent': [list(draw) for draw in self.recent],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a state from to_dict() output."""
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported analysis state version {data.get('version')}")
+
+        def gaps_from_list(items):
+            return [{'count': g['count'], 'sum': g['sum'], 'max': g['max'],
+                     'histogram': Counter({gap: count for gap, count in g['histogram']})}
+                    for g in items]
+
+        main_pool, main_picks, star_pool, star_picks = data['rules']
+        state = cls(main_pool, main_picks, star_pool, star_picks, window=data['window'])
+        state.draws = data['draws']
+        state.last_draw = tuple(data['last_draw']) if data['last_draw'] else None
+        state.main_freq = Counter(dict(data['main_freq']))
+        state.lucky_freq = Counter(dict(data['lucky_freq']))
+        state.main_last_seen = data['main_last_seen']
+        state.lucky_last_seen = data['lucky_last_seen']
+        state.main_gaps = gaps_from_list(data['main_gaps'])
+        state.lucky_gaps = gaps_from_list(data['lucky_gaps'])
+        state.patterns = dict(data['patterns'])
+        state.patterns['sum_ranges'] = defaultdict(int, data['patterns']['sum_ranges'])
+        state.recent = deque((tuple(draw) for draw in data['recent']), maxlen=state.window)
+        return state
+
+    def save(self, path):
+        """Write the state to a JSON file atomically."""
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a state saved with save()."""
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def update_state(rows, state_file=None, window=DEFAULT_WINDOW, rules=EUROMILLIONS):
+    """Return a state covering rows, reusing and extending state_file when possible.
+
+    A saved state of another game (different pools) is rebuilt.
+
+    Returns (state, appended) where appended is the number of draws added
+    on top of the saved state (len(rows) after a rebuild).
+    """
+    state = None
+    if state_file and os.path.exists(state_file):
+        try:
+            state = AnalysisState.load(state_file)
+        except (ValueError, KeyError):
+            state = None
+        if state is not None and (state.window != window or state.pools != rules.pools
+                                  or not state.matches_prefix(rows)):
+            state = None
+
+    if state is None:
+        state = AnalysisState.for_rules(rules, window)
+    start = state.draws
+    for row in rows[start:]:
+        state.append(row[1:])
+
+    if state_file and (len(rows) > start or not os.path.exists(state_file)):
+        state.save(state_file)
+    return state, len(rows) - start
+
+
+def stream_states(rows, every=None, state=None, window=DEFAULT_WINDOW, rules=EUROMILLIONS):
+    """Feed an iterable of [date, width ints] rows through a state one draw at a time.
+
+    Yields the (same, updated) state after every `every` draws and once more
+    at the end of the feed, so memory stays bounded however long the feed is.
+    """
+    state = AnalysisState.for_rules(rules, window) if state is None else state
+    for row in rows:
+        state.append(row[1:])
+        if every and state.draws % every == 0:
+            yield state
+    if not every or state.draws % every or not state.draws:
+        yield state
+
+
+def print_snapshot(state):
+    """Print one line of streaming statistics."""
+    snapshot = state.snapshot()
+    frequent = ' '.join(f"{num}" for num, _ in snapshot['frequent_main'])
+    overdue = ' '.join(f"{num}" for num, _ in snapshot['overdue_main'])
+    hot = ' '.join(f"{num}" for num, _ in snapshot['hot_main'])
+    print(f"📈 {snapshot['draws']:>12,} draws | frequent: {frequent} | overdue: {overdue} | hot: {hot}")
+
+
+def main():
+    """Update a saved analysis state with any new draws, or stream a feed through one."""
+    import argparse
+    from draw_store import iter_draw_rows, load_rows, rules_for
+    from game_rules import GAMES, get_game
+
+    parser = argparse.ArgumentParser(description="Incremental analysis state")
+    parser.add_argument('data_file', nargs='?', default='lottery_results.csv', help="'-' reads CSV rows from stdin")
+    parser.add_argument('state_file', nargs='?', default='analysis_state.json')
+    parser.add_argument('--stream', type=int, metavar='N', default=None,
+                        help="stream the feed without loading it, printing statistics every N draws")
+    parser.add_argument('--game', choices=list(GAMES), help="game of a CSV history (a draw store knows its own)")
+    args = parser.parse_args()
+
+    rules = rules_for(args.data_file, get_game(args.game) if args.game else None)
+    if args.stream:
+        for state in stream_states(iter_draw_rows(args.data_file, rules), args.stream, rules=rules):
+            print_snapshot(state)
+        state.save(args.state_file)
+        print(f"✅ {args.state_file}: {state.draws} draws streamed")
+        return
+
+    rows = load_rows(args.data_file, rules)
+    state, appended = update_state(rows, args.state_file, rules=rules)
+    print(f"✅ {args.state_file}: {state.draws} draws ({appended} appended)")
+
+
+if __name__ == "__main__":
+    main()
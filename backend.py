@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Lazy array backend.
+numpy and pandas cost hundreds of milliseconds to import, which dominates
+the start-up of the short-running CLIs. Modules get them from here as
+lazy proxies: the name is bound at import time, but the real import only
+happens on first attribute access, so the pure-Python paths (csv rows,
+stdlib mmap, array) never pay for it. use_numpy() and use_pandas()
+decide when a dataset is big enough for them to win.
+"""
+
+import importlib
+import importlib.util
+
+# Below this many draws the stdlib loops beat numpy's import and call overhead
+NUMPY_MIN_ROWS = 20000
+# Below this file size the csv module beats importing pandas for its C parser
+PANDAS_MIN_BYTES = 16 << 20
+
+_available = {}
+
+
+def available(name):
+    """Return True if a module can be imported, without importing it."""
+    if name not in _available:
+        _available[name] = importlib.util.find_spec(name) is not None
+    return _available[name]
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import the module now and return it."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        # Only called for names not yet cached on the proxy
+        value = getattr(self.load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return a LazyModule for name, or None if it is not installed.
+
+    Callers keep the usual ``if np is not None`` checks for optional numpy.
+    """
+    return LazyModule(name) if available(name) else None
+
+
+numpy = lazy_import('numpy')
+pandas = lazy_import('pandas')
+
+
+def use_numpy(rows=None, min_rows=NUMPY_MIN_ROWS):
+    """Return True if numpy is installed and rows (if given) is large enough to use it."""
+    return numpy is not None and (rows is None or rows >= min_rows)
+
+
+def use_pandas(nbytes=None, min_bytes=PANDAS_MIN_BYTES):
+    """Return True if pandas is installed and nbytes (if given) of input is enough to use it."""
+    return pandas is not None and (nbytes is None or nbytes >= min_bytes)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Walk-forward backtest of the prediction methods.
+Replays every draw t of the history: each method builds its ticket from
+draws before t only, and the ticket is scored against draw t. Frequencies,
+last-seen positions and the hot window are carried forward chunk by chunk
+with prefix sums, so the whole replay costs O(N) array work instead of
+re-running the O(t) analyses at every step.
+"""
+
+import argparse
+
+import numpy as np
+
+from draw_store import draw_masks, load_rows, rules_for, shared_counts
+from draw_stats import incidence_matrix
+from game_rules import EUROMILLIONS, GAMES, get_game
+from prediction_methods import METHODS, predict
+
+DEFAULT_START = 50
+DEFAULT_HOT_WINDOW = 250
+DEFAULT_CHUNK = 1 << 16
+
+
+def snapshot_inputs(main_incidence, star_incidence, start=DEFAULT_START, hot_window=DEFAULT_HOT_WINDOW,
+                    chunk_size=DEFAULT_CHUNK):
+    """Yield (steps, inputs) for every draw index t >= start, chunk by chunk.
+
+    inputs holds one row per step with what the analyzers would compute from
+    draws [0, t): all-time frequencies, current gaps (t - 1 - last seen, so
+    a number never seen has gap t) and the counts over the last hot_window
+    draws.
+    """
+    total_draws = len(main_incidence)
+    incidence = np.hstack([main_incidence, star_incidence])
+    main_pool = main_incidence.shape[1]
+
+    counts_before = np.zeros(incidence.shape[1], dtype=np.int64)
+    last_seen = np.full(incidence.shape[1], -1, dtype=np.int64)
+    consumed = 0  # counts_before and last_seen cover draws [0, consumed)
+
+    for chunk_start in range(max(start, 0), total_draws, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, total_draws)
+
+        # Bring the carried state up to the chunk start
+        if consumed < chunk_start:
+            counts_before += incidence[consumed:chunk_start].sum(axis=0)
+            seen = incidence[consumed:chunk_start]
+            rows = np.arange(consumed, chunk_start)[:, None]
+            last_seen = np.maximum(last_seen, np.where(seen, rows, -1).max(axis=0))
+            consumed = chunk_start
+
+        steps = np.arange(chunk_start, chunk_end)
+        block = incidence[chunk_start:chunk_end]
+
+        # Exclusive prefix sums: row i covers draws [chunk_start, chunk_start + i)
+        within = np.zeros_like(block, dtype=np.int64)
+        np.cumsum(block[:-1], axis=0, out=within[1:])
+        freq = counts_before + within
+
+        positions = np.where(block, steps[:, None], -1)
+        seen_through = np.maximum.accumulate(np.vstack([last_seen, positions[:-1]]), axis=0)
+        gaps = (steps[:, None] - 1) - seen_through
+
+        # Hot window [t - hot_window, t) from a prefix sum over the extended block
+        window_start = max(chunk_start - hot_window, 0)
+        extended = np.zeros((chunk_end - window_start + 1, incidence.shape[1]), dtype=np.int64)
+        np.cumsum(incidence[window_start:chunk_end], axis=0, out=extended[1:])
+        upper = steps - window_start
+        lower = np.maximum(steps - hot_window, 0) - window_start
+        hot = extended[upper] - extended[lower]
+
+        inputs = {
+            'draws': steps,
+            'main_freq': freq[:, :main_pool],
+            'lucky_freq': freq[:, main_pool:],
+            'main_gaps': gaps[:, :main_pool],
+            'lucky_gaps': gaps[:, main_pool:],
+            'main_hot': hot[:, :main_pool],
+            'lucky_hot': hot[:, main_pool:],
+        }
+        yield steps, inputs
+
+        counts_before += block.sum(axis=0)
+        last_seen = seen_through[-1]
+        last_seen = np.maximum(last_seen, positions[-1])
+        consumed = chunk_end
+
+
+def walk_forward(draws, methods=METHODS, start=DEFAULT_START, hot_window=DEFAULT_HOT_WINDOW,
+                 seed=None, chunk_size=DEFAULT_CHUNK, rules=EUROMILLIONS):
+    """Backtest each method over the draw matrix.
+
+    Returns {method: {'tested', 'histogram', 'mean_main', 'mean_lucky'}}
+    where histogram[m, s] counts the steps whose ticket matched m main balls
+    and s lucky stars.
+    """
+    draws = np.asarray(draws)
+    main_picks = rules.main_picks
+    main_masks, star_masks = draw_masks(draws, rules)
+    main_incidence = incidence_matrix(draws[:, :main_picks], rules.main_pool)
+    star_incidence = incidence_matrix(draws[:, main_picks:], rules.star_pool)
+
+    rng = np.random.default_rng(seed)
+    histograms = {method: np.zeros((main_picks + 1, rules.star_picks + 1), dtype=np.int64) for method in methods}
+
+    for steps, inputs in snapshot_inputs(main_incidence, star_incidence, start, hot_window, chunk_size):
+        for method in methods:
+            main, lucky = predict(method, inputs, rng, rules)
+            ticket_main, ticket_star = draw_masks(np.hstack([main, lucky]), rules)
+            main_hits = shared_counts(main_masks[steps], ticket_main, rules.main_mask_words).astype(np.intp)
+            star_hits = shared_counts(star_masks[steps], ticket_star, rules.star_mask_words).astype(np.intp)
+            np.add.at(histograms[method], (main_hits, star_hits), 1)
+
+    results = {}
+    main_levels = np.arange(main_picks + 1)[:, None]
+    star_levels = np.arange(rules.star_picks + 1)[None, :]
+    for method, histogram in histograms.items():
+        tested = int(histogram.sum())
+        results[method] = {
+            'tested': tested,
+            'histogram': histogram,
+            'mean_main': float((histogram * main_levels).sum() / tested) if tested else float('nan'),
+            'mean_lucky': float((histogram * star_levels).sum() / tested) if tested else float('nan'),
+        }
+    return results
+
+
+def print_results(results, rules=EUROMILLIONS):
+    """Print a backtest summary table."""
+    star_picks = rules.star_picks
+    print(f"{'Method':16} {'Draws':>7} {'Avg main':>9} {'Avg stars':>10} {'3+ main':>8} {f'{star_picks} stars':>8}")
+    print("-" * 62)
+    for method, result in results.items():
+        histogram = result['histogram']
+        tested = max(result['tested'], 1)
+        three_plus = histogram[3:].sum() / tested * 100
+        two_stars = histogram[:, star_picks].sum() / tested * 100
+        method_name = method.replace('_', ' ').title()
+        print(f"{method_name:16} {result['tested']:7d} {result['mean_main']:9.3f} {result['mean_lucky']:10.3f} "
+              f"{three_plus:7.2f}% {two_stars:7.2f}%")
+    print("-" * 62)
+    star_baseline = star_picks * star_picks / rules.star_pool if star_picks else 0.0
+    print(f"{'Random baseline':16} {'':7} {rules.main_picks * rules.main_picks / rules.main_pool:9.3f} "
+          f"{star_baseline:10.3f}")
+
+
+def main():
+    """Run the walk-forward backtest from the command line."""
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the prediction methods")
+    parser.add_argument('data_file', nargs='?', default='lottery_results.csv')
+    parser.add_argument('--start', type=int, default=DEFAULT_START, help="first draw index to predict")
+    parser.add_argument('--hot-window', type=int, default=DEFAULT_HOT_WINDOW)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--methods', nargs='+', default=list(METHODS), choices=METHODS)
+    parser.add_argument('--game', choices=list(GAMES), help="game of a CSV history (a draw store knows its own)")
+    args = parser.parse_args()
+
+    rules = rules_for(args.data_file, get_game(args.game) if args.game else None)
+    rows = load_rows(args.data_file, rules)
+    draws = np.array([row[1:] for row in rows], dtype=rules.number_dtype)
+    print(f"🔁 Walk-forward backtest over {len(draws) - args.start} {rules.name} draws")
+    results = walk_forward(draws, args.methods, args.start, args.hot_window, args.seed, rules=rules)
+    print_results(results, rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for loading, analysis and report generation.
+Synthetic histories at multiples of the real one (1x, 100x and 10,000x by
+default) are written as CSV and binary draw stores, then every stage is
+timed on each: CSV and binary loading, each EuroMillionsAnalyzer method of
+the three analyzer variants, generate_predictions and generate_html_report.
+
+Timings are the best of a few runs and are keyed "<scale>x/<stage>". A run
+can be saved as a JSON baseline; later runs are compared against it and
+fail when a stage is slower than baseline x budget.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from draw_store import DrawStore, iter_draw_rows, load_draws, load_rows
+from synthetic_history import write_history
+
+BASELINE_FILE = 'benchmark_baseline.json'
+SCALES = (1, 100, 10000)
+BUDGET = 1.5  # allowed slowdown vs the baseline
+SLACK = 0.005  # seconds of noise allowed on top of the budget
+MIN_TIME = 1.0  # keep repeating a stage until this much time is spent (or repeat runs)
+
+VARIANTS = ('lottery_analyzer_simple', 'lottery_analyzer', 'lottery_predictor')
+METHODS = ('basic_statistics', 'gap_analysis', 'pattern_analysis', 'hot_cold_analysis')
+STREAM_ROWS = 1_000_000  # the pure Python predictor streams histories larger than this
+
+
+def best_time(func, repeat=3, min_time=MIN_TIME):
+    """Best wall time of func() over up to repeat runs (stops early after min_time seconds)."""
+    best = float('inf')
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent >= min_time:
+            break
+    return best
+
+
+def analyzer_stages(variant, csv_file, rows):
+    """Yield (stage name, callable) for one analyzer variant, methods run in order on one instance."""
+    module = __import__(variant)
+    kwargs = {'stream': True} if variant == 'lottery_predictor' and rows > STREAM_ROWS else {}
+    holder = {}
+
+    def build():
+        holder['analyzer'] = module.EuroMillionsAnalyzer(csv_file, **kwargs)
+
+    yield f"{variant}/init", build
+    for method in METHODS:
+        yield f"{variant}/{method}", lambda method=method: getattr(holder['analyzer'], method)()
+    yield f"{variant}/generate_predictions", lambda: holder['analyzer'].generate_predictions()
+
+
+def html_stage(data_dir, cached=False):
+    """generate_html_report in-process on data_dir/lottery_results.csv, writing data_dir/docs.
+
+    With cached=True the analyses go through an AnalysisCache in data_dir, so
+    every run after the first is a repeated report build on unchanged data.
+    """
+    import generate_html_report
+    from analysis_cache import AnalysisCache
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(data_dir)
+        try:
+            cache = AnalysisCache() if cached else None
+            generate_html_report.generate_html_report(generate_html_report.run_analysis(cache=cache))
+        finally:
+            os.chdir(cwd)
+    return run
+
+
+def stage_names(group):
+    """Names of the stages timed by one group ('load', an analyzer variant or 'report')."""
+    if group == 'load':
+        return ['load/csv_rows', 'load/csv_matrix', 'load/binary_rows', 'load/binary_matrix', 'load/binary_open']
+    if group == 'report':
+        return ['generate_html_report', 'generate_html_report/cached']
+    return [f"{group}/{method}" for method in ('init',) + METHODS + ('generate_predictions',)]
+
+
+def _report(scale, stage, seconds):
+    shown = f"{seconds:9.4f} s" if seconds is not None else "   failed"
+    print(f"  {scale:>6}x  {stage:45} {shown}", flush=True)
+
+
+def time_group(group, scale, data_dir, rows, repeat=3):
+    """Time one group of stages on the dataset in data_dir, logging them to data_dir/<group>.jsonl."""
+    csv_file = os.path.join(data_dir, 'lottery_results.csv')
+    store_file = os.path.join(data_dir, 'lottery_results.bin')
+    if group == 'load':
+        # Row loads are timed as a stream so 10,000x never holds a list per draw
+        funcs = [lambda: deque(iter_draw_rows(csv_file), maxlen=0), lambda: load_draws(csv_file),
+                 lambda: deque(iter_draw_rows(store_file), maxlen=0), lambda: load_draws(store_file),
+                 lambda: DrawStore(store_file).close()]
+        stages = list(zip(stage_names(group), funcs))
+    elif group == 'report':
+        cached_report = html_stage(data_dir, cached=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cached_report()  # fill the cache, so only repeated builds are timed
+        stages = list(zip(stage_names(group), (html_stage(data_dir), cached_report)))
+    else:
+        # Analyzer methods share one instance, so each is timed once, right after init
+        stages = list(analyzer_stages(group, csv_file, rows))
+        repeat = 1
+
+    # Each timing is appended as soon as it is taken, so a group killed part way keeps its earlier stages
+    with open(os.path.join(data_dir, f"{group}.jsonl"), 'a') as log:
+        for stage, func in stages:
+            seconds = best_time(func, repeat)
+            log.write(json.dumps([stage, seconds]) + '\n')
+            log.flush()
+            _report(scale, stage, seconds)
+
+
+def run_scale(scale, base_draws, data_dir, repeat=3, variants=VARIANTS):
+    """Time every stage on a history scale x base_draws long; returns {'<scale>x/<stage>': seconds}.
+
+    Each group of stages runs in its own process, so an analyzer that runs
+    out of memory at a large scale is reported as failed (None) instead of
+    taking the suite down, and no group inherits another's memory.
+    """
+    draws = scale * base_draws
+    write_history(os.path.join(data_dir, 'lottery_results.csv'), draws,
+                  os.path.join(data_dir, 'lottery_results.bin'), seed=scale)
+
+    results = {}
+    for group in ('load',) + tuple(variants) + ('report',):
+        log_file = os.path.join(data_dir, f"{group}.jsonl")
+        open(log_file, 'w').close()
+        try:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                pool.submit(time_group, group, scale, data_dir, draws, repeat).result()
+        except (BrokenProcessPool, MemoryError):
+            pass
+        with open(log_file, 'r') as log:
+            timings = dict(json.loads(line) for line in log)
+        for stage in stage_names(group):
+            if stage not in timings:
+                timings[stage] = None
+                _report(scale, stage, None)
+            results[f"{scale}x/{stage}"] = timings[stage]
+    return results
+
+
+def compare(results, baseline, budget=BUDGET, slack=SLACK):
+    """Return [(stage, seconds, baseline seconds)] for stages slower than baseline x budget + slack.
+
+    A stage that ran in the baseline but failed now (seconds None) is a
+    regression too, and so is a stage that failed in the baseline and still
+    fails (baseline seconds None): a known failure is never silently skipped.
+    """
+    regressions = []
+    for stage, seconds in results.items():
+        if stage not in baseline:
+            continue
+        reference = baseline[stage]
+        if reference is None:
+            if seconds is None:
+                regressions.append((stage, seconds, reference))
+        elif seconds is None or seconds > reference * budget + slack:
+            regressions.append((stage, seconds, reference))
+    return regressions
+
+
+def known_failing(baseline):
+    """Stages recorded as failed (None) in a baseline."""
+    return sorted(stage for stage, seconds in baseline.items() if seconds is None)
+
+
+def main():
+    """Run the benchmark suite and check it against a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark loading, analysis and reporting at scale")
+    parser.add_argument('data_file', nargs='?', default='lottery_results.csv',
+                        help="real history whose length sets the 1x scale")
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)), help="comma-separated multiples")
+    parser.add_argument('--variants', default=','.join(VARIANTS), help="analyzer modules to time")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage (best time kept)")
+    parser.add_argument('--baseline', help="JSON baseline to compare against")
+    parser.add_argument('--budget', type=float, help=f"allowed slowdown ratio (default: baseline's, else {BUDGET})")
+    parser.add_argument('--save', nargs='?', const=BASELINE_FILE, help="write the results as a baseline")
+    args = parser.parse_args()
+
+    base_draws = len(load_rows(args.data_file))
+    scales = [int(scale) for scale in args.scales.split(',')]
+    variants = tuple(args.variants.split(','))
+
+    print(f"⏱️  Benchmarking {len(variants)} analyzers at {', '.join(f'{s}x' for s in scales)} "
+          f"of {base_draws} draws")
+    results = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            results.update(run_scale(scale, base_draws, data_dir, args.repeat, variants))
+
+    baseline, budget = {}, args.budget
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            saved = json.load(f)
+        baseline = saved['results']
+        budget = budget or saved.get('budget', BUDGET)
+    budget = budget or BUDGET
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'base_draws': base_draws, 'budget': budget, 'results': results}, f, indent=2)
+        print(f"✅ Baseline written to {args.save}")
+
+    regressions = compare(results, baseline, budget)
+    if baseline:
+        print(f"\n📊 {len(results)} stages checked against {args.baseline} (budget {budget:.2f}x)")
+    for stage in known_failing(baseline):
+        if stage in results:
+            status = "still failing" if results[stage] is None else f"now {results[stage]:.4f} s, re-record the baseline"
+            print(f"⚠️  {stage}: known failing in the baseline ({status})")
+    for stage, seconds, reference in regressions:
+        if reference is None:
+            print(f"❌ {stage}: failed (known failing in the baseline)")
+        elif seconds is None:
+            print(f"❌ {stage}: failed (baseline {reference:.4f} s)")
+        else:
+            print(f"❌ {stage}: {seconds:.4f} s vs {reference:.4f} s ({seconds / reference:.2f}x)")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
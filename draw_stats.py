@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Vectorized statistics kernels shared by the numpy-based analyzers.
+Every kernel works on the N x width uint8 draw matrix or on one-hot
+incidence matrices derived from it, so the cost is a handful of array
+passes no matter how long the history is.
+"""
+
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from backend import numpy as np  # lazy: the analyzers import this module on their stdlib path too
+
+
+def incidence_matrix(numbers, pool):
+    """Return the N x pool one-hot matrix of an N x k block of drawn numbers."""
+    numbers = np.asarray(numbers)
+    incidence = np.zeros((len(numbers), pool), dtype=bool)
+    rows = np.arange(len(numbers))[:, None]
+    incidence[rows, numbers.astype(np.intp) - 1] = True
+    return incidence
+
+
+GAP_CHUNK = 1 << 16  # incidence rows scanned per gap_distribution step
+
+
+def _histogram_percentile(cumulative, counts, q):
+    """Linear-interpolated percentile q (0-1) of each row's values, from cumulative value histograms."""
+    position = q * (counts - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.ceil(position).astype(np.intp)
+    # The k-th smallest value (0-based) is the first value whose cumulative count exceeds k
+    low_values = (cumulative <= lower[:, None]).sum(axis=1).astype(np.float64)
+    high_values = (cumulative <= upper[:, None]).sum(axis=1).astype(np.float64)
+    return low_values + (high_values - low_values) * (position - lower)
+
+
+def gap_distribution(incidence, chunk_rows=GAP_CHUNK):
+    """Summarise the gaps between appearances of every number.
+
+    Returns a dict of arrays indexed by number - 1: 'mean', 'median', 'p90'
+    and 'max' of the completed gaps (NaN/0 for numbers seen fewer than
+    twice), 'current' (draws since last seen, N if never seen) and 'count'
+    (the number of completed gaps).
+
+    The incidence matrix is walked in chunks of chunk_rows draws, carrying
+    each number's last-seen position across chunks, and gaps are kept as a
+    pool x longest-gap histogram, so memory does not grow with the history.
+    """
+    total_draws, pool = incidence.shape
+    last_seen = np.full(pool, -1, dtype=np.int64)
+    histogram = np.zeros((pool, 1), dtype=np.int64)  # [number, gap length]
+
+    for offset in range(0, total_draws, chunk_rows):
+        # Column-major nonzero: positions grouped by number, ascending within each
+        numbers, positions = np.nonzero(incidence[offset:offset + chunk_rows].T)
+        if not len(numbers):
+            continue
+        positions += offset
+        first = np.concatenate(([True], numbers[1:] != numbers[:-1]))
+        previous = np.empty_like(positions)
+        previous[1:] = positions[:-1]
+        previous[first] = last_seen[numbers[first]]
+        last = np.concatenate((first[1:], [True]))
+        last_seen[numbers[last]] = positions[last]
+
+        completed = previous >= 0
+        gaps = positions[completed] - previous[completed]
+        if not len(gaps):
+            continue
+        stride = histogram.shape[1]
+        if gaps.max() >= stride:
+            stride = int(gaps.max()) + 1
+            histogram = np.pad(histogram, ((0, 0), (0, stride - histogram.shape[1])))
+        histogram += np.bincount(numbers[completed] * stride + gaps, minlength=pool * stride).reshape(pool, stride)
+
+    current = (total_draws - 1) - last_seen
+    counts = histogram.sum(axis=1)
+    mean = np.full(pool, np.nan)
+    median = np.full(pool, np.nan)
+    p90 = np.full(pool, np.nan)
+    longest = np.zeros(pool, dtype=np.int64)
+
+    has_gaps = counts > 0
+    if has_gaps.any():
+        lengths = np.arange(histogram.shape[1])
+        mean[has_gaps] = (histogram[has_gaps] @ lengths) / counts[has_gaps]
+        cumulative = np.cumsum(histogram[has_gaps], axis=1)
+        median[has_gaps] = _histogram_percentile(cumulative, counts[has_gaps], 0.5)
+        p90[has_gaps] = _histogram_percentile(cumulative, counts[has_gaps], 0.9)
+        longest[has_gaps] = histogram.shape[1] - 1 - np.argmax(histogram[has_gaps, ::-1] > 0, axis=1)
+
+    return {
+        'mean': mean,
+        'median': median,
+        'p90': p90,
+        'max': longest,
+        'current': current,
+        'count': counts,
+    }
+
+
+def gap_stats_by_number(distribution):
+    """Convert a gap_distribution result to {number: {stat: value}} with Python scalars.
+
+    Numbers with no completed gap get None for mean, median and p90.
+    """
+    stats = {}
+    for idx in range(len(distribution['current'])):
+        seen_twice = distribution['count'][idx] > 0
+        stats[idx + 1] = {
+            'mean': float(distribution['mean'][idx]) if seen_twice else None,
+            'median': float(distribution['median'][idx]) if seen_twice else None,
+            'p90': float(distribution['p90'][idx]) if seen_twice else None,
+            'max': int(distribution['max'][idx]),
+            'current': int(distribution['current'][idx]),
+        }
+    return stats
+
+
+ORDER_CHUNK = 1 << 16  # values scanned per first_seen_order step
+
+
+def first_seen_order(values, pool):
+    """Return the numbers 1..pool ordered by first appearance in a flat array.
+
+    Counter(values) iterates in this order, so Counters rebuilt from counts in
+    this order break most_common() ties exactly like the original scans.
+    Numbers that never appear are left out.
+    """
+    values = np.asarray(values)
+    first = np.full(pool, len(values), dtype=np.intp)
+    # Every number usually turns up in the first chunk, so the scan stops long before the end
+    for start in range(0, len(values), ORDER_CHUNK):
+        block = values[start:start + ORDER_CHUNK].astype(np.intp)
+        np.minimum.at(first, block - 1, np.arange(start, start + len(block)))
+        if (first < len(values)).all():
+            break
+    seen = np.flatnonzero(first < len(values))
+    return seen[np.argsort(first[seen], kind='stable')] + 1
+
+
+def counts_to_counter(counts, order):
+    """Build a Counter from per-number counts, inserting numbers in the given order."""
+    counter = Counter()
+    for num in order:
+        counter[int(num)] = int(counts[num - 1])
+    return counter
+
+
+def pattern_tally(main, sum_width=25, presorted=False):
+    """Vectorized pattern tally of an N x k block of main balls.
+
+    Returns the same dict as analysis_state.tally_pattern, with sums
+    bucketed into sum_width-wide ranges; the odd/even and decade thresholds
+    follow the number of main picks (k columns). Pass presorted=True for a
+    row-sorted matrix to skip the sort.
+    """
+    main = np.asarray(main)
+    if not presorted:
+        main = np.sort(main, axis=1)
+    picks = main.shape[1]
+    most_decades = (picks + 1) // 2
+
+    steps = np.diff(main.astype(np.int16), axis=1)
+    consecutive = (steps == 1).sum(axis=1)
+    distinct_decades = 1 + (np.diff(main // 10, axis=1) != 0).sum(axis=1)
+    odd = (main & 1).sum(axis=1)
+    sum_bins = np.bincount(main.sum(axis=1, dtype=np.int64) // sum_width)
+
+    patterns = {
+        'consecutive_pairs': int((consecutive >= 1).sum()),
+        'consecutive_triplets': int((consecutive >= 2).sum()),
+        'same_decade': int((distinct_decades <= most_decades).sum()),
+        'all_odd': int((odd == picks).sum()),
+        'all_even': int((odd == 0).sum()),
+        'majority_odd': int(((2 * odd > picks) & (odd < picks)).sum()),
+        'majority_even': int(((odd > 0) & (2 * odd <= picks)).sum()),
+        'sum_ranges': defaultdict(int),
+    }
+    for bucket in np.flatnonzero(sum_bins):
+        patterns['sum_ranges'][f"{bucket * sum_width}-{bucket * sum_width + sum_width - 1}"] = int(sum_bins[bucket])
+    return patterns
+
+
+def pattern_metrics(sorted_main, main_pool=50):
+    """Spread metrics of a row-sorted N x k block of main balls.
+
+    Returns histograms indexed by value: 'span' (largest minus smallest
+    ball), 'max_gap' (widest step between neighbouring balls) and
+    'low_count' (balls in the low half, 1..main_pool // 2), plus their means.
+    """
+    sorted_main = np.asarray(sorted_main)
+    picks = sorted_main.shape[1]
+    span = sorted_main[:, -1].astype(np.int16) - sorted_main[:, 0]
+    max_gap = np.diff(sorted_main.astype(np.int16), axis=1).max(axis=1)
+    low_count = (sorted_main <= main_pool // 2).sum(axis=1)
+    return {
+        'span': np.bincount(span, minlength=main_pool),
+        'max_gap': np.bincount(max_gap, minlength=main_pool),
+        'low_count': np.bincount(low_count, minlength=picks + 1),
+        'mean_span': float(span.mean()) if len(span) else float('nan'),
+        'mean_max_gap': float(max_gap.mean()) if len(max_gap) else float('nan'),
+    }
+
+
+def window_frequencies(draws, recent_draws, index=None, main_picks=5, main_pool=50, star_pool=12):
+    """Return (main, lucky) Counters over the last recent_draws rows of the draw matrix.
+
+    With a FrequencyIndex the counts come from one prefix-sum subtraction;
+    the window itself is only read to order the Counters by first appearance.
+    """
+    recent = draws[len(draws) - min(max(recent_draws, 0), len(draws)):]
+    main_flat = recent[:, :main_picks].T.ravel()
+    star_flat = recent[:, main_picks:].T.ravel()
+    if index is not None:
+        main_counts, star_counts = index.last(len(recent))
+    else:
+        main_counts = np.bincount(main_flat, minlength=main_pool + 1)[1:]
+        star_counts = np.bincount(star_flat, minlength=star_pool + 1)[1:]
+    return (counts_to_counter(main_counts, first_seen_order(main_flat, main_pool)),
+            counts_to_counter(star_counts, first_seen_order(star_flat, star_pool)))
+
+
+def summarize_draws(draws, main_incidence=None, star_incidence=None, sorted_main=None,
+                    main_picks=5, main_pool=50, star_pool=12):
+    """Compute every aggregate the analyzers report from one draw matrix.
+
+    One call replaces the separate basic_statistics, gap_analysis and
+    pattern_analysis scans. Returns a dict with the frequency Counters
+    ('main_freq', 'lucky_freq'), the gap distributions ('main_gaps',
+    'lucky_gaps', see gap_distribution), the pattern tally ('patterns') and
+    the spread metrics ('pattern_metrics'). Counters are ordered like
+    Counter(column-by-column values).
+    """
+    draws = np.asarray(draws)
+    main, stars = draws[:, :main_picks], draws[:, main_picks:]
+    if main_incidence is None:
+        main_incidence = incidence_matrix(main, main_pool)
+    if star_incidence is None:
+        star_incidence = incidence_matrix(stars, star_pool)
+    if sorted_main is None:
+        sorted_main = np.sort(main, axis=1)
+
+    main_flat = main.T.ravel()
+    star_flat = stars.T.ravel()
+    main_counts = main_incidence.sum(axis=0)
+    star_counts = star_incidence.sum(axis=0)
+
+    return {
+        'draws': len(draws),
+        'main_freq': counts_to_counter(main_counts, first_seen_order(main_flat, main_pool)),
+        'lucky_freq': counts_to_counter(star_counts, first_seen_order(star_flat, star_pool)),
+        'main_gaps': gap_distribution(main_incidence),
+        'lucky_gaps': gap_distribution(star_incidence),
+        'patterns': pattern_tally(sorted_main, presorted=True),
+        'pattern_metrics': pattern_metrics(sorted_main, main_pool),
+    }
+
+
+class FrequencyIndex:
+    """Cumulative per-number counts over the draw history.
+
+    Row i of the table holds how often every number was drawn in draws
+    [0, i), so the frequencies over any range [start, end) are a single
+    subtraction of two rows. Main balls occupy the first main_pool columns
+    and lucky stars the rest. The table uses the narrowest unsigned dtype
+    that can hold the draw count.
+    """
+
+    def __init__(self, main_incidence, star_incidence, years=None):
+        total_draws, main_pool = main_incidence.shape
+        self.main_pool = main_pool
+        self.star_pool = star_incidence.shape[1]
+        self.draws = total_draws
+        self.years = None if years is None else np.asarray(years)
+
+        dtype = np.min_scalar_type(total_draws)
+        self.table = np.zeros((total_draws + 1, main_pool + self.star_pool), dtype=dtype)
+        np.cumsum(main_incidence, axis=0, dtype=dtype, out=self.table[1:, :main_pool])
+        np.cumsum(star_incidence, axis=0, dtype=dtype, out=self.table[1:, main_pool:])
+
+    def _clip(self, index):
+        return min(max(int(index), 0), self.draws)
+
+    def range_counts(self, start, end):
+        """Return (main, star) count arrays over draws [start, end)."""
+        start, end = self._clip(start), self._clip(end)
+        counts = self.table[max(end, start)].astype(np.int64) - self.table[start]
+        return counts[:self.main_pool], counts[self.main_pool:]
+
+    def last(self, recent_draws, end=None):
+        """Return (main, star) count arrays over the recent_draws draws before end."""
+        end = self.draws if end is None else self._clip(end)
+        return self.range_counts(end - recent_draws, end)
+
+    def year_range(self, first_year, last_year):
+        """Return (main, star) count arrays over every draw from first_year to last_year inclusive."""
+        if self.years is None:
+            raise ValueError("FrequencyIndex was built without draw years")
+        start = np.searchsorted(self.years, first_year, side='left')
+        end = np.searchsorted(self.years, last_year, side='right')
+        return self.range_counts(start, end)
+
+    def windows(self, ends, sizes):
+        """Return count matrices for every (cut-point, window size) combination.
+
+        Returns (main, star) arrays of shape len(ends) x len(sizes) x pool,
+        where entry [i, j] covers draws [ends[i] - sizes[j], ends[i]).
+        """
+        ends = np.clip(np.asarray(ends, dtype=np.int64), 0, self.draws)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        starts = np.clip(ends[:, None] - sizes[None, :], 0, None)
+        counts = self.table[ends][:, None, :].astype(np.int64) - self.table[starts]
+        return counts[..., :self.main_pool], counts[..., self.main_pool:]
+
+
+def _pair_counts(left, right, chunk_size=1 << 18):
+    """Return left.T @ right for one-hot matrices as exact int64 counts.
+
+    Chunks are multiplied in float32 (exact below 2**24 rows) so the
+    product runs on BLAS, then summed in int64.
+    """
+    counts = np.zeros((left.shape[1], right.shape[1]), dtype=np.int64)
+    for start in range(0, len(left), chunk_size):
+        block_left = left[start:start + chunk_size].astype(np.float32)
+        block_right = block_left if right is left else right[start:start + chunk_size].astype(np.float32)
+        counts += (block_left.T @ block_right).astype(np.int64)
+    return counts
+
+
+TRIPLE_CHUNK = 1 << 18  # draws keyed per step when counting triples
+
+
+def _triple_keys(numbers, pool):
+    """Encode every ascending triple of each row of an N x k index block as a*pool^2 + b*pool + c."""
+    picks = numbers.shape[1]
+    first, second, third = np.array(list(combinations(range(picks), 3))).T
+    numbers = numbers.astype(np.int64)
+    return (numbers[:, first] * pool * pool + numbers[:, second] * pool + numbers[:, third]).ravel()
+
+
+class CoOccurrence:
+    """Counts of numbers drawn together.
+
+    main_pairs (main_pool x main_pool) and star_pairs (star_pool x
+    star_pool) are symmetric with the plain frequencies on the diagonal,
+    cross (main_pool x star_pool) counts main ball / lucky star pairs, and
+    triples is a sparse Counter of (a, b, c) main-ball triples with a < b < c.
+    Built with matrix products over the incidence matrices and updated in
+    place by append() and extend().
+    """
+
+    def __init__(self, main_incidence, star_incidence):
+        self.main_pool = main_incidence.shape[1]
+        self.star_pool = star_incidence.shape[1]
+        self.draws = 0
+        self.main_pairs = np.zeros((self.main_pool, self.main_pool), dtype=np.int64)
+        self.star_pairs = np.zeros((self.star_pool, self.star_pool), dtype=np.int64)
+        self.cross = np.zeros((self.main_pool, self.star_pool), dtype=np.int64)
+        self.triples = Counter()
+        self.extend_incidence(main_incidence, star_incidence)
+
+    def extend_incidence(self, main_incidence, star_incidence):
+        """Add a block of draws given as one-hot incidence rows."""
+        if not len(main_incidence):
+            return
+        self.main_pairs += _pair_counts(main_incidence, main_incidence)
+        self.star_pairs += _pair_counts(star_incidence, star_incidence)
+        self.cross += _pair_counts(main_incidence, star_incidence)
+
+        # Triples are keyed chunk by chunk, so the key arrays never grow with the history
+        found = Counter()
+        for start in range(0, len(main_incidence), TRIPLE_CHUNK):
+            block = main_incidence[start:start + TRIPLE_CHUNK]
+            # Row-major nonzero lists each draw's numbers in ascending order
+            _, columns = np.nonzero(block)
+            picks = len(columns) // len(block)
+            if picks < 3:
+                break
+            unique, counts = np.unique(_triple_keys(columns.reshape(-1, picks), self.main_pool), return_counts=True)
+            found.update(dict(zip(unique.tolist(), counts.tolist())))
+        pool = self.main_pool
+        for key in sorted(found):
+            self.triples[(key // (pool * pool) + 1, key // pool % pool + 1, key % pool + 1)] += found[key]
+        self.draws += len(main_incidence)
+
+    def extend(self, draws, main_picks=5):
+        """Add a block of draws given as an N x width number matrix."""
+        draws = np.asarray(draws)
+        self.extend_incidence(incidence_matrix(draws[:, :main_picks], self.main_pool),
+                              incidence_matrix(draws[:, main_picks:], self.star_pool))
+
+    def append(self, main, lucky):
+        """Add one draw in place."""
+        main_idx = np.asarray(sorted(main), dtype=np.intp) - 1
+        star_idx = np.asarray(sorted(lucky), dtype=np.intp) - 1
+        self.main_pairs[np.ix_(main_idx, main_idx)] += 1
+        self.star_pairs[np.ix_(star_idx, star_idx)] += 1
+        self.cross[np.ix_(main_idx, star_idx)] += 1
+        for triple in combinations(main_idx.tolist(), 3):
+            self.triples[tuple(idx + 1 for idx in triple)] += 1
+        self.draws += 1
+
+    def _matrix(self, kind):
+        if kind == 'main':
+            return self.main_pairs
+        if kind == 'star':
+            return self.star_pairs
+        if kind == 'cross':
+            return self.cross
+        raise ValueError(f"Unknown pair kind: {kind}")
+
+    def top_pairs(self, k=10, kind='main'):
+        """Return the k most frequent pairs as [((a, b), count)], ties by lower numbers.
+
+        kind is 'main', 'star' or 'cross' (main ball, lucky star).
+        """
+        matrix = self._matrix(kind)
+        if kind == 'cross':
+            rows, columns = np.indices(matrix.shape).reshape(2, -1)
+        else:
+            rows, columns = np.triu_indices(len(matrix), 1)
+        counts = matrix[rows, columns]
+        order = np.argsort(-counts, kind='stable')[:k]
+        return [((int(rows[i]) + 1, int(columns[i]) + 1), int(counts[i])) for i in order]
+
+    def partners(self, number, k=None, kind='main'):
+        """Return [(partner, count)] for the numbers most often drawn with number.
+
+        For kind 'cross', number is a main ball and partners are lucky stars.
+        """
+        row = self._matrix(kind)[number - 1]
+        order = np.argsort(-row, kind='stable')
+        if kind != 'cross':
+            order = order[order != number - 1]
+        return [(int(idx) + 1, int(row[idx])) for idx in order[:k]]
+
+    def top_triples(self, k=10):
+        """Return the k most frequent main-ball triples as [((a, b, c), count)]."""
+        return sorted(self.triples.items(), key=lambda item: (-item[1], item[0]))[:k]
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Binary draw store for lottery results.
+A fixed 64-byte header (game rules and row count) is followed by an N x width
+uint8 matrix of main balls and lucky stars, a uint16 year column and the
+draws as bitmasks, so the analyzers can open the history with np.memmap or
+the stdlib mmap without parsing any text. lottery_results.csv remains
+available as an export format.
+
+Number n is bit n - 1 of its mask, so the numbers a ticket shares with a
+draw are popcount(ticket_mask & draw_mask). Each pool's mask uses the
+narrowest unsigned dtype the game rules allow (uint64 main balls and uint16
+lucky stars for EuroMillions); pools wider than 64 numbers use several
+uint64 words per draw, stored as an N x words array.
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from backend import numpy as np, pandas, use_numpy, use_pandas  # imported on first use; the pure Python paths never load it
+from game_rules import EUROMILLIONS, GameRules
+
+STORE_FILE = 'lottery_results.bin'
+MAGIC = b'LDRW'
+VERSION = 2
+
+# magic, version, header size, main pool, main picks, star pool, star picks,
+# row count, matrix offset, years offset, main masks offset, star masks offset
+HEADER_STRUCT = struct.Struct('<4sHHBBBBQQQQQ')
+HEADER_SIZE = 64
+
+MAX_POOL = 255  # numbers are stored as uint8 and pools as header bytes
+
+# array module typecodes by item size, for the pure Python paths
+_ARRAY_CODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def parse_year(date):
+    """Convert a Date column value (e.g. '2004' or '2004.htm') to an int year."""
+    text = str(date).replace('.htm', '')
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"Unsupported date value for the draw store: {date!r}")
+
+
+def number_mask(numbers):
+    """Return the bitmask of a collection of numbers (bit n - 1 for number n)."""
+    mask = 0
+    for num in numbers:
+        mask |= 1 << (int(num) - 1)
+    return mask
+
+
+def mask_numbers(mask):
+    """Return the sorted numbers set in a bitmask."""
+    numbers = []
+    num = 1
+    while mask:
+        if mask & 1:
+            numbers.append(num)
+        mask >>= 1
+        num += 1
+    return numbers
+
+
+_BYTE_POPCOUNT = None
+
+
+def popcount(values):
+    """Count the set bits of every element of an unsigned integer array."""
+    values = np.asarray(values)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    # numpy < 2.0: sum a byte lookup table over the little-endian bytes
+    global _BYTE_POPCOUNT
+    if _BYTE_POPCOUNT is None:
+        _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+    as_bytes = values.astype(values.dtype.newbyteorder('<'), copy=False)
+    as_bytes = as_bytes.view(np.uint8).reshape(values.shape + (values.dtype.itemsize,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def index_masks(indices, dtype='<u8', words=1):
+    """Return the bitmasks of an N x k matrix of 0-based indices (bit i for index i).
+
+    With words > 1 the result is N x words uint64, index i landing in word
+    i // 64; otherwise one dtype mask per row.
+    """
+    indices = np.asarray(indices).astype(np.uint64)
+    one = np.uint64(1)
+    if words == 1:
+        return np.bitwise_or.reduce(one << indices, axis=1).astype(dtype)
+    masks = np.zeros((len(indices), words), dtype=np.uint64)
+    word_of = indices >> np.uint64(6)
+    bits = one << (indices & np.uint64(63))
+    for word in range(words):
+        masks[:, word] = np.bitwise_or.reduce(np.where(word_of == word, bits, 0), axis=1)
+    return masks
+
+
+def draw_masks(draws, rules=EUROMILLIONS):
+    """Build the (main, star) mask arrays of an N x width draw matrix, in the rules' mask dtypes."""
+    draws = np.asarray(draws)
+    main_masks = index_masks(draws[:, :rules.main_picks].astype(np.int64) - 1,
+                             rules.main_mask_dtype, rules.main_mask_words)
+    star_masks = index_masks(draws[:, rules.main_picks:].astype(np.int64) - 1,
+                             rules.star_mask_dtype, rules.star_mask_words)
+    return main_masks, star_masks
+
+
+def ticket_mask(numbers, dtype='<u8', words=1):
+    """Return one ticket's mask as a dtype scalar, or a uint64 word array when words > 1."""
+    mask = number_mask(numbers)
+    if words == 1:
+        return np.dtype(dtype).type(mask)
+    return np.array([(mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(words)], dtype=np.uint64)
+
+
+def shared_counts(masks, ticket, words=1):
+    """popcount(masks & ticket) as uint8, summed over the words of multi-word masks (last axis)."""
+    counts = popcount(np.asarray(masks) & ticket)
+    if words > 1:
+        counts = counts.sum(axis=-1, dtype=np.uint8)
+    return counts.astype(np.uint8)
+
+
+def match_counts(main_masks, star_masks, main, lucky, rules=EUROMILLIONS):
+    """Count how many main balls and lucky stars one ticket shares with every draw.
+
+    Returns two uint8 arrays aligned with the mask arrays.
+    """
+    main_hits = shared_counts(main_masks, ticket_mask(main, rules.main_mask_dtype, rules.main_mask_words),
+                              rules.main_mask_words)
+    star_hits = shared_counts(star_masks, ticket_mask(lucky, rules.star_mask_dtype, rules.star_mask_words),
+                              rules.star_mask_words)
+    return main_hits, star_hits
+
+
+def is_draw_store(path):
+    """Return True if the file starts with the draw store magic."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_store(path, draws, years, rules=EUROMILLIONS):
+    """Write a draw store from an N x width matrix of numbers and a year per row.
+
+    ``draws`` may be a numpy array or any sequence of rows; ``years`` any
+    sequence of ints. Every number is validated against the game rules.
+    """
+    width = rules.width
+    main_picks = rules.main_picks
+    _check_store_rules(rules)
+
+    if np is not None:
+        matrix = np.ascontiguousarray(draws, dtype=np.int64).reshape(-1, width)
+        _validate(matrix, rules)
+        matrix = matrix.astype(np.uint8)
+        main_masks, star_masks = draw_masks(matrix, rules)
+        sections = [
+            matrix.tobytes(),
+            np.asarray(years, dtype='<u2').tobytes(),
+            main_masks.tobytes(),
+            star_masks.tobytes(),
+        ]
+        rows = len(matrix)
+    else:
+        flat = array('B')
+        main_masks, main_append = _mask_array(rules.main_mask_dtype, rules.main_mask_words)
+        star_masks, star_append = _mask_array(rules.star_mask_dtype, rules.star_mask_words)
+        rows = 0
+        for row in draws:
+            row = list(row)
+            if len(row) != width:
+                raise ValueError(f"Expected {width} numbers per draw, got {len(row)}")
+            _validate([row], rules)
+            flat.extend(row)
+            main_append(number_mask(row[:main_picks]))
+            star_append(number_mask(row[main_picks:]))
+            rows += 1
+        year_array = array('H', years)
+        if sys.byteorder != 'little':
+            for section in (year_array, main_masks, star_masks):
+                section.byteswap()
+        sections = [flat.tobytes(), year_array.tobytes(), main_masks.tobytes(), star_masks.tobytes()]
+
+    if len(sections[1]) != rows * 2:
+        raise ValueError(f"Got {len(sections[1]) // 2} years for {rows} draws")
+
+    offsets, _ = _section_offsets([len(section) for section in sections])
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(_pack_header(rules, rows, offsets))
+        for section_offset, section in zip(offsets, sections):
+            f.write(b'\0' * (section_offset - f.tell()))
+            f.write(section)
+    os.replace(tmp_file, path)
+
+
+def _check_store_rules(rules):
+    if max(rules.main_pool, rules.star_pool) > MAX_POOL or rules.width > MAX_POOL:
+        raise ValueError(f"The draw store holds pools of at most {MAX_POOL} numbers")
+
+
+def _mask_array(dtype, words):
+    """Return (array, append) collecting masks in the store layout without numpy."""
+    masks = array(_ARRAY_CODES[int(dtype[-1])])
+    if words == 1:
+        return masks, masks.append
+    # Multi-word masks: uint64 words, lowest first
+    return masks, lambda mask: masks.extend((mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(words))
+
+
+def _section_offsets(sizes):
+    """Return (section offsets, file size) for sections of the given byte sizes after the header."""
+    # Each section starts on an 8-byte boundary so the mask arrays map aligned
+    offsets = []
+    end = HEADER_SIZE
+    for size in sizes:
+        offsets.append(_align(end))
+        end = offsets[-1] + size
+    return offsets, end
+
+
+def _pack_header(rules, rows, offsets):
+    header = HEADER_STRUCT.pack(
+        MAGIC, VERSION, HEADER_SIZE,
+        rules.main_pool, rules.main_picks, rules.star_pool, rules.star_picks,
+        rows, *offsets,
+    )
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+class StoreWriter:
+    """Write a draw store of a known length chunk by chunk, in bounded memory (needs numpy).
+
+    The file is sized up front and every chunk is written straight into its
+    place in each section, so histories far larger than RAM can be stored.
+    Use as a context manager; the store only appears at path once every
+    row has been written.
+    """
+
+    def __init__(self, path, rows, rules=EUROMILLIONS):
+        _check_store_rules(rules)
+        self.path = path
+        self.rows = rows
+        self.rules = rules
+        self.width = rules.width
+        # matrix row, year, main mask, star mask
+        self.itemsizes = (self.width, 2, rules.main_mask_bytes, rules.star_mask_bytes)
+        self.offsets, size = _section_offsets([rows * itemsize for itemsize in self.itemsizes])
+        self.written = 0
+        self._tmp_file = path + '.tmp'
+        self._file = open(self._tmp_file, 'wb')
+        self._file.write(_pack_header(rules, rows, self.offsets))
+        self._file.truncate(size)
+
+    def write(self, draws, years):
+        """Append an n x width block of draws and their n years."""
+        matrix = np.ascontiguousarray(draws, dtype=np.int64).reshape(-1, self.width)
+        years = np.asarray(years, dtype='<u2').ravel()
+        if len(years) != len(matrix):
+            raise ValueError(f"Got {len(years)} years for {len(matrix)} draws")
+        if self.written + len(matrix) > self.rows:
+            raise ValueError(f"More than the {self.rows} draws the store was sized for")
+        _validate(matrix, self.rules)
+        matrix = matrix.astype(np.uint8)
+        main_masks, star_masks = draw_masks(matrix, self.rules)
+        sections = (matrix, years, main_masks, star_masks)
+        for offset, itemsize, section in zip(self.offsets, self.itemsizes, sections):
+            self._file.seek(offset + self.written * itemsize)
+            self._file.write(section.tobytes())
+        self.written += len(matrix)
+
+    def close(self):
+        """Finish the store; raises ValueError (and leaves no file) if rows are missing."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self.written != self.rows:
+            os.remove(self._tmp_file)
+            raise ValueError(f"Wrote {self.written} of the {self.rows} draws the store was sized for")
+        os.replace(self._tmp_file, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._tmp_file)
+
+
+def _validate(matrix, rules):
+    """Check that every number lies inside its pool."""
+    main_picks = rules.main_picks
+    if np is not None and isinstance(matrix, np.ndarray):
+        if len(matrix) == 0:
+            return
+        main, stars = matrix[:, :main_picks], matrix[:, main_picks:]
+        if main.min() < 1 or main.max() > rules.main_pool:
+            raise ValueError(f"Main ball outside 1-{rules.main_pool}")
+        if stars.size and (stars.min() < 1 or stars.max() > rules.star_pool):
+            raise ValueError(f"{rules.star_label} outside 1-{rules.star_pool}")
+        return
+    for row in matrix:
+        if any(not 1 <= num <= rules.main_pool for num in row[:main_picks]):
+            raise ValueError(f"Main ball outside 1-{rules.main_pool}: {row}")
+        if any(not 1 <= num <= rules.star_pool for num in row[main_picks:]):
+            raise ValueError(f"{rules.star_label} outside 1-{rules.star_pool}: {row}")
+
+
+class DrawStore:
+    """Read-only, memory-mapped view of a draw store file."""
+
+    def __init__(self, path, use_numpy=True):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_STRUCT.size:
+            raise ValueError(f"{path} is too short to be a draw store")
+
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a draw store")
+        version = struct.unpack_from('<H', header, len(MAGIC))[0]
+        if version != VERSION:
+            raise ValueError(f"Unsupported draw store version {version} in {path}, "
+                             f"regenerate it with draw_store.py")
+        (magic, version, header_size, main_pool, main_picks, star_pool, star_picks,
+         rows, matrix_offset, years_offset, main_masks_offset,
+         star_masks_offset) = HEADER_STRUCT.unpack_from(header)
+
+        self.rules = rules = GameRules.for_pools(main_pool, main_picks, star_pool, star_picks)
+        self.rows = rows
+        self.width = rules.width
+        self._mmap = None
+        mask_layouts = ((main_masks_offset, rules.main_mask_dtype, rules.main_mask_words),
+                        (star_masks_offset, rules.star_mask_dtype, rules.star_mask_words))
+
+        if use_numpy and np is not None:
+            if rows:
+                self.draws = np.memmap(path, dtype=np.uint8, mode='r',
+                                       offset=matrix_offset, shape=(rows, self.width))
+                self.years = np.memmap(path, dtype='<u2', mode='r',
+                                       offset=years_offset, shape=(rows,))
+                self.main_masks, self.star_masks = (
+                    np.memmap(path, dtype=dtype, mode='r', offset=offset,
+                              shape=(rows,) if words == 1 else (rows, words))
+                    for offset, dtype, words in mask_layouts)
+            else:
+                self.draws = np.zeros((0, self.width), dtype=np.uint8)
+                self.years = np.zeros(0, dtype='<u2')
+                self.main_masks, self.star_masks = (
+                    np.zeros((0,) if words == 1 else (0, words), dtype=dtype) for _, dtype, words in mask_layouts)
+        else:
+            # Pure Python path: flat memoryviews over a stdlib mmap (multi-word masks stay flat words)
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+            self.draws = view[matrix_offset:matrix_offset + rows * self.width]
+            self.years = view[years_offset:years_offset + rows * 2].cast('H')
+            self.main_masks, self.star_masks = (
+                view[offset:offset + rows * int(dtype[-1]) * words].cast(_ARRAY_CODES[int(dtype[-1])])
+                for offset, dtype, words in mask_layouts)
+
+    def __len__(self):
+        return self.rows
+
+    def row(self, idx):
+        """Return the numbers of one draw as a list of ints."""
+        if self._mmap is None:
+            return self.draws[idx].tolist()
+        start = idx * self.width
+        return list(self.draws[start:start + self.width])
+
+    def year(self, idx):
+        """Return the year of one draw."""
+        return self._native(self.years[idx], 2)
+
+    def masks(self, idx):
+        """Return the (main, star) bitmasks of one draw as ints."""
+        rules = self.rules
+        return (self._mask(self.main_masks, idx, rules.main_mask_dtype, rules.main_mask_words),
+                self._mask(self.star_masks, idx, rules.star_mask_dtype, rules.star_mask_words))
+
+    def _mask(self, masks, idx, dtype, words):
+        size = int(dtype[-1])
+        if words == 1:
+            return self._native(masks[idx], size)
+        if self._mmap is None:
+            words_of_row = masks[idx].tolist()
+        else:
+            words_of_row = masks[idx * words:(idx + 1) * words]
+        return sum(self._native(word, size) << (64 * word_index) for word_index, word in enumerate(words_of_row))
+
+    def _native(self, value, size):
+        # memoryview casts use native byte order; the file is little-endian
+        value = int(value)
+        if self._mmap is not None and sys.byteorder != 'little':
+            value = int.from_bytes(value.to_bytes(size, 'big'), 'little')
+        return value
+
+    def match_counts(self, main, lucky):
+        """Count the main balls and lucky stars a ticket shares with every draw."""
+        rules = self.rules
+        if self._mmap is None:
+            return match_counts(self.main_masks, self.star_masks, main, lucky, rules)
+        if use_numpy(self.rows):
+            # Large store opened without numpy arrays: worth loading numpy for one vectorized pass
+            main_masks = np.frombuffer(self.main_masks, dtype=rules.main_mask_dtype)
+            star_masks = np.frombuffer(self.star_masks, dtype=rules.star_mask_dtype)
+            if rules.main_mask_words > 1:
+                main_masks = main_masks.reshape(-1, rules.main_mask_words)
+            if rules.star_mask_words > 1:
+                star_masks = star_masks.reshape(-1, rules.star_mask_words)
+            return match_counts(main_masks, star_masks, main, lucky, rules)
+        ticket_main, ticket_star = number_mask(main), number_mask(lucky)
+        main_hits, star_hits = [], []
+        for idx in range(self.rows):
+            main_mask, star_mask = self.masks(idx)
+            main_hits.append(bin(main_mask & ticket_main).count('1'))
+            star_hits.append(bin(star_mask & ticket_star).count('1'))
+        return main_hits, star_hits
+
+    def iter_rows(self):
+        """Yield rows in the analyzers' list layout: [date, ball 1..5, star 1..2]."""
+        for idx in range(self.rows):
+            yield [str(self.year(idx))] + self.row(idx)
+
+    def close(self):
+        """Release the memory map."""
+        if self._mmap is not None:
+            for view in (self.draws, self.years, self.main_masks, self.star_masks):
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+        self.draws = self.years = self.main_masks = self.star_masks = None
+
+
+def iter_csv_rows(source, rules=EUROMILLIONS):
+    """Yield [date, width ints] rows (dates cleaned) from a CSV path, '-' for stdin or an open file.
+
+    Rows are parsed lazily, so an unbounded feed is never held in memory.
+    A leading header line is skipped.
+    """
+    end = 1 + rules.width
+    if isinstance(source, str):
+        f = sys.stdin if source == '-' else open(source, 'r')
+    else:
+        f = source
+    try:
+        reader = csv.reader(f)
+        for line_no, row in enumerate(reader):
+            if len(row) < end or (line_no == 0 and not row[1].strip().isdigit()):
+                continue  # Skip header and blank lines
+            yield [row[0].replace('.htm', '')] + [int(x) for x in row[1:end]]
+    finally:
+        if f is not source and f is not sys.stdin:
+            f.close()
+
+
+def read_csv_rows(csv_file, rules=EUROMILLIONS):
+    """Read lottery_results.csv into [date, width ints] rows (dates cleaned)."""
+    return list(iter_csv_rows(csv_file, rules))
+
+
+def rules_for(path, rules=None):
+    """Return the game rules of a history: rules if given, else a draw store's own, else EuroMillions."""
+    if rules is not None:
+        return rules
+    if isinstance(path, str) and path != '-' and is_draw_store(path):
+        store = DrawStore(path, use_numpy=False)
+        store.close()
+        return store.rules
+    return EUROMILLIONS
+
+
+def iter_draw_rows(source, rules=EUROMILLIONS):
+    """Yield [date, width ints] rows from a draw store, a CSV path, '-' (stdin), an open file or an iterable of rows.
+
+    CSV input is read with the given rules; a draw store carries its own.
+    """
+    if isinstance(source, str) and source != '-' and is_draw_store(source):
+        store = DrawStore(source, use_numpy=False)
+        try:
+            yield from store.iter_rows()
+        finally:
+            store.close()
+    elif isinstance(source, str) or hasattr(source, 'read'):
+        yield from iter_csv_rows(source, rules)
+    else:
+        yield from source
+
+
+def load_rows(path, rules=EUROMILLIONS):
+    """Load draws as [date, width ints] rows from either a draw store or a CSV file (read with rules)."""
+    if is_draw_store(path):
+        store = DrawStore(path, use_numpy=False)
+        try:
+            return list(store.iter_rows())
+        finally:
+            store.close()
+    return read_csv_rows(path, rules)
+
+
+def count_draws(path):
+    """Return the number of draws in a draw store (from its header) or a CSV file (its lines, less the header).
+
+    Nothing is parsed, so this is a cheap way to pick a code path by size.
+    """
+    if is_draw_store(path):
+        store = DrawStore(path, use_numpy=False)
+        store.close()
+        return store.rows
+    lines = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+    return max(lines - 1, 0)
+
+
+def load_draws(path, chunk_size=1 << 18, rules=EUROMILLIONS):
+    """Load draws as (date labels, date codes, N x width numpy matrix) without pandas' import cost.
+
+    Dates are factorized: labels[codes[i]] is the (cleaned) date of draw i,
+    so a long history never holds one string per draw. A draw store is
+    mapped straight in. A CSV file is parsed in chunks with the csv module,
+    or with pandas' C parser once the file is big enough to pay for the
+    import, using rules for the column count and the narrowest number
+    dtype (uint8 for pools up to 255).
+    """
+    if is_draw_store(path):
+        store = DrawStore(path)
+        years = np.asarray(store.years).astype(np.intp)
+        present = np.flatnonzero(np.bincount(years, minlength=1))
+        lookup = np.zeros(len(present) and present[-1] + 1, dtype=np.int32)
+        lookup[present] = np.arange(len(present), dtype=np.int32)
+        return [str(year) for year in present.tolist()], lookup[years], np.array(store.draws)
+
+    labels = {}
+    code_chunks, draw_chunks = [], []
+    if use_pandas(os.path.getsize(path)):
+        for chunk in pandas.read_csv(path, chunksize=chunk_size):
+            dates = chunk.iloc[:, 0].astype(str).str.replace('.htm', '')
+            local_codes, uniques = pandas.factorize(dates)
+            remap = np.array([labels.setdefault(date, len(labels)) for date in uniques], dtype=np.int32)
+            code_chunks.append(remap[local_codes])
+            draw_chunks.append(chunk.iloc[:, 1:1 + rules.width].to_numpy(dtype=rules.number_dtype))
+    else:
+        rows = iter_csv_rows(path, rules)
+        while True:
+            block = [row for _, row in zip(range(chunk_size), rows)]
+            if not block:
+                break
+            code_chunks.append(np.array([labels.setdefault(row[0], len(labels)) for row in block], dtype=np.int32))
+            draw_chunks.append(np.array([row[1:] for row in block], dtype=rules.number_dtype))
+    if not draw_chunks:
+        return [], np.zeros(0, dtype=np.int32), np.zeros((0, rules.width), dtype=rules.number_dtype)
+    return list(labels), np.concatenate(code_chunks), np.concatenate(draw_chunks)
+
+
+def load_dataframe(path):
+    """Load draws as a pandas DataFrame with the CSV columns.
+
+    A draw store is mapped straight into compact uint8 columns; a CSV file
+    goes through pandas' parser as before.
+    """
+    import pandas as pd
+
+    if not is_draw_store(path):
+        return pd.read_csv(path)
+
+    store = DrawStore(path)
+    df = pd.DataFrame(np.asarray(store.draws), columns=store.rules.csv_header[1:])
+    df.insert(0, 'Date', np.asarray(store.years).astype(str))
+    return df
+
+
+def convert_csv(csv_file, store_file=STORE_FILE, rules=EUROMILLIONS):
+    """Convert a CSV history of a game into a draw store; returns the number of draws."""
+    data = read_csv_rows(csv_file, rules)
+    write_store(store_file, [row[1:] for row in data], [parse_year(row[0]) for row in data], rules)
+    return len(data)
+
+
+def export_csv(store_file, csv_file):
+    """Export a draw store back to the CSV layout; returns the number of draws."""
+    from generate_csv import write_csv
+
+    store = DrawStore(store_file, use_numpy=False)
+    try:
+        write_csv(store.iter_rows(), csv_file, store.rules.csv_header)
+        return store.rows
+    finally:
+        store.close()
+
+
+def main():
+    """Convert between lottery_results.csv and the binary draw store."""
+    import argparse
+    from game_rules import GAMES, get_game
+
+    parser = argparse.ArgumentParser(description="Convert lottery results between CSV and the binary draw store")
+    parser.add_argument('source', nargs='?', default='lottery_results.csv')
+    parser.add_argument('target', nargs='?', default=None)
+    parser.add_argument('--export', action='store_true', help="export a draw store to CSV")
+    parser.add_argument('--game', default=EUROMILLIONS.name, choices=list(GAMES), help="game of the CSV history")
+    args = parser.parse_args()
+
+    if args.export:
+        target = args.target or 'lottery_results.csv'
+        count = export_csv(args.source, target)
+    else:
+        target = args.target or STORE_FILE
+        count = convert_csv(args.source, target, get_game(args.game))
+    print(f"✅ Wrote {count} draws to {target}")
+
+
+if __name__ == "__main__":
+    main()
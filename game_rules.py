@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Game rules for k-of-n lotteries.
+A GameRules object describes one game: a main pool with its picks, an
+optional second pool (EuroMillions lucky stars, the Powerball) and the
+prize tiers as (main hits, star hits). The loaders, the draw store, the
+analyzers and the ticket generators take their ranges from it instead of
+assuming 5 of 50 plus 2 of 12, so several games can be analyzed in one
+process with the same kernels.
+
+It also picks the storage layout for each game: the narrowest unsigned
+dtype for the numbers and for each pool's bitmask. Pools wider than 64
+numbers get multi-word masks (several uint64 words per draw). Dtypes
+are plain strings ('<u1', '<u8'), so the stdlib paths can import the
+rules without numpy.
+"""
+
+from math import ceil, comb
+
+# Narrowest little-endian unsigned dtype for a number of bits
+_UNSIGNED = ((8, '<u1'), (16, '<u2'), (32, '<u4'), (64, '<u8'))
+
+
+def unsigned_dtype(bits):
+    """Return the narrowest unsigned dtype string holding bits bits, or '<u8' beyond 64."""
+    for width, dtype in _UNSIGNED:
+        if bits <= width:
+            return dtype
+    return '<u8'
+
+
+def count_dtype(count):
+    """Return the narrowest unsigned dtype string that can hold counts up to count."""
+    return unsigned_dtype(max(int(count), 1).bit_length())
+
+
+class GameRules:
+    """Pools, picks and prize tiers of one lottery game."""
+
+    def __init__(self, name, main_pool, main_picks, star_pool=0, star_picks=0, prize_tiers=(),
+                 main_label='Ball', star_label='Lucky Star'):
+        if not 1 <= main_picks <= main_pool:
+            raise ValueError(f"{name}: cannot pick {main_picks} of {main_pool} main numbers")
+        if not 0 <= star_picks <= star_pool or (star_pool and not star_picks):
+            raise ValueError(f"{name}: cannot pick {star_picks} of {star_pool} {star_label.lower()}s")
+        if max(main_pool, star_pool) > 0xFFFF:
+            raise ValueError(f"{name}: pools are limited to 65535 numbers")
+        for main_hits, star_hits in prize_tiers:
+            if not (0 <= main_hits <= main_picks and 0 <= star_hits <= star_picks):
+                raise ValueError(f"{name}: prize tier {main_hits}+{star_hits} is not a possible match")
+        self.name = name
+        self.main_pool = main_pool
+        self.main_picks = main_picks
+        self.star_pool = star_pool
+        self.star_picks = star_picks
+        self.prize_tiers = tuple(tuple(tier) for tier in prize_tiers)  # best first
+        self.main_label = main_label
+        self.star_label = star_label
+
+    @property
+    def width(self):
+        """Numbers per draw (main picks then star picks)."""
+        return self.main_picks + self.star_picks
+
+    @property
+    def main_columns(self):
+        return [f"{self.main_label} {i}" for i in range(1, self.main_picks + 1)]
+
+    @property
+    def star_columns(self):
+        return [f"{self.star_label} {i}" for i in range(1, self.star_picks + 1)]
+
+    @property
+    def csv_header(self):
+        """Column names of the CSV layout: Date, then every main and star column."""
+        return ['Date'] + self.main_columns + self.star_columns
+
+    @property
+    def number_dtype(self):
+        """Narrowest dtype of the draw matrix (uint8 up to 255 numbers per pool)."""
+        return unsigned_dtype(max(self.main_pool, self.star_pool).bit_length())
+
+    @property
+    def main_mask_dtype(self):
+        return unsigned_dtype(self.main_pool)
+
+    @property
+    def star_mask_dtype(self):
+        return unsigned_dtype(self.star_pool)
+
+    @property
+    def main_mask_words(self):
+        """uint64 words per main mask; 1 means a plain main_mask_dtype scalar per draw."""
+        return max(1, ceil(self.main_pool / 64))
+
+    @property
+    def star_mask_words(self):
+        return max(1, ceil(self.star_pool / 64))
+
+    @property
+    def main_mask_bytes(self):
+        """Bytes of one draw's main mask in the draw store."""
+        return int(self.main_mask_dtype[-1]) * self.main_mask_words
+
+    @property
+    def star_mask_bytes(self):
+        return int(self.star_mask_dtype[-1]) * self.star_mask_words
+
+    @property
+    def combinations(self):
+        """Number of distinct tickets."""
+        return comb(self.main_pool, self.main_picks) * comb(self.star_pool, self.star_picks)
+
+    @property
+    def hit_cells(self):
+        """Cells of a (main hits, star hits) histogram."""
+        return (self.main_picks + 1) * (self.star_picks + 1)
+
+    def tier_probabilities(self):
+        """Exact probability of each prize tier for one ticket against a uniform draw."""
+        return {
+            tier: comb(self.main_picks, tier[0]) * comb(self.main_pool - self.main_picks, self.main_picks - tier[0])
+            * comb(self.star_picks, tier[1]) * comb(self.star_pool - self.star_picks, self.star_picks - tier[1])
+            / self.combinations
+            for tier in self.prize_tiers
+        }
+
+    def is_valid_ticket(self, main, lucky):
+        """Return True if main and lucky are distinct in-range numbers in the right amounts."""
+        return (len(set(main)) == len(main) == self.main_picks
+                and len(set(lucky)) == len(lucky) == self.star_picks
+                and all(1 <= num <= self.main_pool for num in main)
+                and all(1 <= num <= self.star_pool for num in lucky))
+
+    def to_dict(self):
+        """Return the rules as JSON-compatible data."""
+        return {'name': self.name, 'main_pool': self.main_pool, 'main_picks': self.main_picks,
+                'star_pool': self.star_pool, 'star_picks': self.star_picks,
+                'prize_tiers': [list(tier) for tier in self.prize_tiers],
+                'main_label': self.main_label, 'star_label': self.star_label}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild rules from to_dict() data, reusing a known game when the pools match."""
+        known = GAMES.get(data.get('name'))
+        if known is not None and known.pools == (data['main_pool'], data['main_picks'],
+                                                 data['star_pool'], data['star_picks']):
+            return known
+        return cls(**data)
+
+    @classmethod
+    def for_pools(cls, main_pool, main_picks, star_pool=0, star_picks=0):
+        """Return the known game with these pools, or unnamed rules without prize tiers."""
+        for rules in GAMES.values():
+            if rules.pools == (main_pool, main_picks, star_pool, star_picks):
+                return rules
+        return cls(f"{main_picks}/{main_pool}" + (f"+{star_picks}/{star_pool}" if star_pool else ""),
+                   main_pool, main_picks, star_pool, star_picks)
+
+    @property
+    def pools(self):
+        return (self.main_pool, self.main_picks, self.star_pool, self.star_picks)
+
+    def __eq__(self, other):
+        if not isinstance(other, GameRules):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((self.name,) + self.pools)
+
+    def __repr__(self):
+        return f"GameRules({self.name!r}, {self.main_picks}/{self.main_pool}, {self.star_picks}/{self.star_pool})"
+
+
+EUROMILLIONS = GameRules(
+    'euromillions', 50, 5, 12, 2,
+    prize_tiers=((5, 2), (5, 1), (5, 0), (4, 2), (4, 1), (3, 2), (4, 0),
+                 (2, 2), (3, 1), (3, 0), (1, 2), (2, 1), (2, 0)),
+)
+LOTTO_6_49 = GameRules('lotto649', 49, 6, prize_tiers=((6, 0), (5, 0), (4, 0), (3, 0), (2, 0)))
+POWERBALL = GameRules(
+    'powerball', 69, 5, 26, 1,
+    prize_tiers=((5, 1), (5, 0), (4, 1), (4, 0), (3, 1), (3, 0), (2, 1), (1, 1), (0, 1)),
+    star_label='Powerball',
+)
+
+GAMES = {rules.name: rules for rules in (EUROMILLIONS, LOTTO_6_49, POWERBALL)}
+
+
+def get_game(name):
+    """Return the rules of a known game by name."""
+    try:
+        return GAMES[name]
+    except KeyError:
+        raise ValueError(f"Unknown game {name!r}, expected one of: {', '.join(GAMES)}")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Generate lottery_results.csv from the saved results/*.html pages.
+Streams each year file through a single-pass tokenizer and parses the
+years in parallel with a process pool. A manifest of each file's size,
+mtime and content hash lets a refresh re-parse only the changed years.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+MANIFEST_FILE = os.path.join(RESULTS_DIR, 'manifest.json')
+MANIFEST_VERSION = 1
+CSV_FILE = 'lottery_results.csv'
+CSV_HEADER = ['Date', 'Ball 1', 'Ball 2', 'Ball 3', 'Ball 4', 'Ball 5', 'Lucky Star 1', 'Lucky Star 2']
+
+CHUNK_SIZE = 1 << 20
+
+# The year pages are Chrome "view-source" dumps, so the markup we care about is
+# itself wrapped in syntax-highlighting spans. One alternation covers every
+# token the extractor reacts to, so each byte is scanned exactly once.
+_VALUE = rb'<span class="html-attribute-value">'
+_TAG_END = rb'</span>"&gt;</span>'
+_LI_CLOSE = rb'<span class="html-tag">&lt;/li&gt;</span>'
+
+TOKEN_RE = re.compile(
+    rb'(?P<balls>' + _VALUE + rb'balls' + _TAG_END + rb')'
+    rb'|' + _VALUE + rb'resultBall ball small' + _TAG_END + rb'(?P<ball>\d+)' + _LI_CLOSE +
+    rb'|' + _VALUE + rb'resultBall lucky-star small' + _TAG_END + rb'(?P<star>\d+)' + _LI_CLOSE +
+    rb'|(?P<close>&lt;/ul&gt;)'
+)
+
+# Longest token minus one byte: anything shorter than this at the end of a
+# chunk may be the start of a token that continues in the next chunk.
+_CARRY = len(_VALUE + b'resultBall lucky-star small' + _TAG_END + _LI_CLOSE) + 8
+
+
+class HashingReader:
+    """File wrapper that hashes every byte as it is read."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.hash.update(data)
+        self.size += len(data)
+        return data
+
+
+def tokenize(stream, chunk_size=CHUNK_SIZE):
+    """Yield (kind, value) tokens from a binary stream, reading it in chunks."""
+    buffer = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        last_end = 0
+        for match in TOKEN_RE.finditer(buffer):
+            kind = match.lastgroup
+            if kind in ('ball', 'star'):
+                yield kind, int(match.group(kind))
+            else:
+                yield kind, None
+            last_end = match.end()
+        if not chunk:
+            return
+        buffer = buffer[max(last_end, len(buffer) - _CARRY):]
+
+
+def year_label(path):
+    """Return the Date column value for a year file (matches basename($file, '.html'))."""
+    name = os.path.basename(path)
+    return name[:-len('.html')] if name.endswith('.html') else name
+
+
+def parse_draws(stream, label):
+    """Parse the draws of one year page from a binary stream, oldest first."""
+    results = []
+    in_section = False
+    main_balls, lucky_stars = [], []
+
+    for kind, value in tokenize(stream):
+        if kind == 'balls':
+            # A second "balls" list before the closing </ul> is plain text
+            # inside the current section, just like the old lazy regex.
+            if not in_section:
+                in_section = True
+                main_balls, lucky_stars = [], []
+        elif not in_section:
+            continue
+        elif kind == 'ball':
+            main_balls.append(value)
+        elif kind == 'star':
+            lucky_stars.append(value)
+        else:
+            if len(main_balls) >= 5:
+                results.append([label] + main_balls[:5] + lucky_stars[:2])
+            in_section = False
+
+    # Pages list the newest draw first
+    results.reverse()
+    return results
+
+
+def extract_draws(path):
+    """Extract the draws of one year file, oldest first."""
+    with open(path, 'rb') as f:
+        return parse_draws(f, year_label(path))
+
+
+def extract_entry(path):
+    """Extract one year file into a manifest entry (stat, hash and draws)."""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        reader = HashingReader(f)
+        draws = parse_draws(reader, year_label(path))
+    return {
+        'size': reader.size,
+        'mtime': stat.st_mtime,
+        'sha256': reader.hash.hexdigest(),
+        'draws': draws,
+    }
+
+
+def file_digest(path):
+    """Return the sha256 hex digest of a file."""
+    with open(path, 'rb') as f:
+        reader = HashingReader(f)
+        while reader.read(CHUNK_SIZE):
+            pass
+    return reader.hash.hexdigest()
+
+
+def format_row(row):
+    """Format a row the way PHP's fputcsv does (quote fields with spaces)."""
+    fields = []
+    for value in row:
+        text = str(value)
+        if any(c in text for c in ' \t\r\n,"\\'):
+            text = '"' + text.replace('"', '""') + '"'
+        fields.append(text)
+    return ','.join(fields) + '\n'
+
+
+def pad_row(row, width=len(CSV_HEADER)):
+    """Pad a draw row to the full CSV column layout."""
+    return row + [''] * (width - len(row))
+
+
+def find_year_files(results_dir=RESULTS_DIR):
+    """List the year files in the same order as glob('*.{html,htm}', GLOB_BRACE)."""
+    return (sorted(glob.glob(os.path.join(results_dir, '*.html'))) +
+            sorted(glob.glob(os.path.join(results_dir, '*.htm'))))
+
+
+def extract_all(files, workers=None):
+    """Extract every year file in parallel, returning the rows per file in order."""
+    return [entry['draws'] for entry in extract_entries(files, workers)]
+
+
+def extract_entries(files, workers=None):
+    """Extract manifest entries for the given files, in parallel when worthwhile."""
+    if len(files) <= 1 or workers == 1:
+        return [extract_entry(path) for path in files]
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing alone costs ~20 ms to import
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract_entry, files))
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Load the manifest, returning an empty one if missing or outdated."""
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    return manifest
+
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """Write the manifest atomically."""
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    os.replace(tmp_file, manifest_file)
+
+
+def refresh(files, manifest, workers=None):
+    """Bring the manifest up to date with the year files.
+
+    A file whose size and mtime match its entry is trusted without being
+    opened. If only the mtime moved, the content hash decides whether the
+    cached draws are still valid. Everything else is re-parsed.
+    Returns the names of the files that were re-parsed or removed.
+    """
+    entries = manifest['files']
+    stale = []
+    for path in files:
+        name = os.path.basename(path)
+        entry = entries.get(name)
+        if entry is None:
+            stale.append(path)
+            continue
+        stat = os.stat(path)
+        if stat.st_size != entry['size']:
+            stale.append(path)
+        elif stat.st_mtime != entry['mtime']:
+            if file_digest(path) == entry['sha256']:
+                entry['mtime'] = stat.st_mtime
+            else:
+                stale.append(path)
+
+    for path, entry in zip(stale, extract_entries(stale, workers)):
+        entries[os.path.basename(path)] = entry
+
+    changed = [os.path.basename(path) for path in stale]
+
+    # Forget files that were removed from results/
+    names = {os.path.basename(path) for path in files}
+    for name in list(entries):
+        if name not in names:
+            del entries[name]
+            changed.append(name)
+
+    return changed
+
+
+def manifest_rows(files, manifest):
+    """Return every draw row in CSV order (file order, oldest first within a year)."""
+    rows = []
+    for path in files:
+        rows.extend(manifest['files'][os.path.basename(path)]['draws'])
+    return rows
+
+
+def write_csv(rows, csv_file=CSV_FILE, header=CSV_HEADER):
+    """Write draw rows to the CSV file with the standard header (or another game's)."""
+    tmp_file = csv_file + '.tmp'
+    with open(tmp_file, 'w', newline='') as f:
+        f.write(format_row(header))
+        for row in rows:
+            f.write(format_row(pad_row(row, len(header))))
+    os.replace(tmp_file, csv_file)
+
+
+def main():
+    """Main function to regenerate the CSV file."""
+    parser = argparse.ArgumentParser(description="Generate lottery_results.csv from results/*.html")
+    parser.add_argument('--full', action='store_true', help="ignore the manifest and re-parse every year")
+    parser.add_argument('--workers', type=int, default=None, help="number of parser processes")
+    args = parser.parse_args()
+
+    files = find_year_files()
+    if not files:
+        print(f"❌ No HTML files found in {RESULTS_DIR}")
+        return 1
+
+    if args.full:
+        manifest = {'version': MANIFEST_VERSION, 'files': {}}
+    else:
+        manifest = load_manifest()
+    changed = refresh(files, manifest, args.workers)
+
+    for name in changed:
+        if name in manifest['files']:
+            draws = manifest['files'][name]['draws']
+            print(f"Extracted {len(draws)} lottery draws from {name}")
+        else:
+            print(f"Removed {name} from the manifest")
+
+    if not changed and os.path.exists(CSV_FILE):
+        save_manifest(manifest)
+        print("✓ All year files unchanged, lottery_results.csv is up to date")
+        return 0
+
+    rows = manifest_rows(files, manifest)
+    write_csv(rows)
+    save_manifest(manifest)
+
+    import draw_store
+    try:
+        draw_store.write_store(draw_store.STORE_FILE, [row[1:] for row in rows],
+                               [draw_store.parse_year(row[0]) for row in rows])
+    except ValueError as e:
+        print(f"⚠️  Skipped {draw_store.STORE_FILE}: {e}")
+    print(f"CSV file has been generated successfully! ({len(rows)} draws, {len(changed)} files changed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,64 @@
 #!/usr/bin/env python3
 """
-Generate HTML report from lottery analysis output
+Generate HTML report from lottery analysis results
 """
 
 import os
-import subprocess
-import sys
+import html
 from datetime import datetime
 import csv
 
-def run_analysis():
-    """Run the lottery analyzer and capture output"""
-    try:
-        # Run the analyzer and capture output
-        result = subprocess.run(['python3', 'lottery_analyzer_simple.py'], 
-                              capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running analysis: {e}")
-        return f"Error running analysis: {e.stderr}"
+from analysis_cache import AnalysisCache
+from analysis_results import AnalysisResults, render_recommendation, render_text
+
+def run_analysis(csv_file='lottery_results.csv', cache=None):
+    """Run the lottery analyzer in-process and return its AnalysisResults (analyses read from cache if given)"""
+    from lottery_analyzer_simple import EuroMillionsAnalyzer
+    
+    return EuroMillionsAnalyzer(csv_file, cache=cache).analyze()
+
+def render_report_text(results):
+    """Analysis text shown in the report: every section plus the recommendations"""
+    return "\n".join([
+        render_text(results),
+        "",
+        "🎯 RECOMMENDED NEXT DRAW PREDICTIONS:",
+        "=" * 70,
+        render_recommendation("🥇 PRIMARY RECOMMENDATION (Balanced Method):", results.predictions['balanced'],
+                              results.rules),
+        render_recommendation("\n🥈 SECONDARY RECOMMENDATION (Weighted Random):",
+                              results.predictions['weighted_random'], results.rules),
+    ])
+
+def prediction_cards(predictions):
+    """HTML cards with the balls of every prediction method"""
+    cards = ""
+    for method, pred in predictions.items():
+        balls = "".join(f'<span class="ball">{num}</span>' for num in sorted(pred['main']))
+        stars = "".join(f'<span class="ball lucky-star">{num}</span>' for num in sorted(pred['lucky']))
+        cards += f"""
+            <div class="prediction-card">
+                <h3>{method.replace('_', ' ').title()}</h3>
+                <div>{balls} {stars}</div>
+            </div>"""
+    return cards
+
+def last_csv_row(f, tail=4096):
+    """Last row of a CSV file opened in binary mode (None if it only has the header), reading only its tail"""
+    f.seek(0, os.SEEK_END)
+    start = max(f.tell() - tail, 0)
+    f.seek(start)
+    lines = [line for line in f.read().decode('utf-8').splitlines() if line.strip()]
+    if start == 0:
+        lines = lines[1:]  # the header
+    return next(csv.reader(lines[-1:]), None)
 
-def load_latest_predictions():
-    """Load latest predictions from CSV if available"""
+def load_latest_predictions(total_draws=None):
+    """Load latest predictions from CSV if available (the whole file is only read to count draws)"""
     try:
+        if total_draws is not None:
+            with open('lottery_results.csv', 'rb') as f:
+                return last_csv_row(f), total_draws
         with open('lottery_results.csv', 'r') as f:
             reader = csv.reader(f)
             headers = next(reader)
@@ -32,15 +68,24 @@ def load_latest_predictions():
     except FileNotFoundError:
         return None, 0
 
-def generate_html_report(analysis_output):
-    """Generate HTML report with analysis results"""
+def generate_html_report(results):
+    """Generate HTML report from AnalysisResults (or plain analysis text)"""
     
-    latest_draw, total_draws = load_latest_predictions()
+    latest_draw, total_draws = load_latest_predictions(
+        results.draws if isinstance(results, AnalysisResults) else None)
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
     
     # Create docs directory if it doesn't exist
     os.makedirs('docs', exist_ok=True)
     
+    if isinstance(results, AnalysisResults):
+        analysis_output = html.escape(render_report_text(results))
+        method_count = len(results.predictions)
+        main_pool = results.rules.main_pool
+    else:
+        analysis_output, method_count, results = html.escape(results), 6, None
+        main_pool = 50
+    
     html_content = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -224,12 +269,12 @@ def generate_html_report(analysis_output):
             </div>
             
             <div class="stat-card">
-                <div class="stat-number">6</div>
+                <div class="stat-number">{method_count}</div>
                 <div class="stat-label">Prediction Methods</div>
             </div>
             
             <div class="stat-card">
-                <div class="stat-number">50</div>
+                <div class="stat-number">{main_pool}</div>
                 <div class="stat-label">Main Ball Range</div>
             </div>
         </div>
@@ -259,6 +304,13 @@ def generate_html_report(analysis_output):
         </div>
 """
 
+    if results is not None and results.predictions:
+        html_content += f"""
+        <div class="predictions-section">
+            <h2>🎱 Predictions For Next Draw</h2>{prediction_cards(results.predictions)}
+        </div>
+"""
+
     html_content += f"""
         <div class="analysis-output">
             <h2>🔍 Complete Analysis Output</h2>
@@ -276,6 +328,8 @@ def generate_html_report(analysis_output):
     # Write HTML file
     with open('docs/index.html', 'w', encoding='utf-8') as f:
         f.write(html_content)
+    if results is not None:
+        results.save('docs/analysis.json')
     
     print("✅ HTML report generated successfully!")
     print("📄 Report saved to: docs/index.html")
@@ -286,11 +340,11 @@ def main():
     
     # Run analysis
     print("📊 Running lottery analysis...")
-    analysis_output = run_analysis()
+    results = run_analysis(cache=AnalysisCache())
     
     # Generate HTML report
     print("🌐 Generating HTML report...")
-    generate_html_report(analysis_output)
+    generate_html_report(results)
     
     print("✨ Report generation complete!")
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the entry points.
+Each module is imported in a fresh interpreter under ``python -X
+importtime`` and its cumulative import time is read from the trace, so
+the numbers exclude interpreter start-up. The heavy packages an import
+drags in (numpy, pandas, matplotlib, ...) are listed alongside, which is
+usually what explains a regression. Results can be saved as a JSON
+baseline and later runs checked against it.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = (
+    'lottery_analyzer_simple', 'lottery_analyzer', 'lottery_predictor', 'quick_predictor',
+    'analysis_state', 'generate_html_report', 'draw_store', 'ticket_index', 'ticket_matcher',
+    'syndicate_store', 'backtest', 'monte_carlo',
+)
+HEAVY_PACKAGES = ('numpy', 'pandas', 'matplotlib', 'seaborn', 'scipy')
+BASELINE_FILE = 'import_times.json'
+
+
+def parse_importtime(trace):
+    """Return {module: cumulative microseconds} from ``-X importtime`` stderr output."""
+    times = {}
+    for line in trace.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the column header line
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def import_time(module, python=sys.executable):
+    """Import module in a fresh interpreter; returns (cumulative microseconds, heavy packages loaded)."""
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    times = parse_importtime(result.stderr)
+    return times[module], [name for name in HEAVY_PACKAGES if name in times]
+
+
+def measure(modules=ENTRY_POINTS, repeat=5):
+    """Return {module: {'us': median cumulative microseconds, 'heavy': [...]}}."""
+    results = {}
+    for module in modules:
+        samples = []
+        for _ in range(repeat):
+            micros, heavy = import_time(module)
+            samples.append(micros)
+        results[module] = {'us': int(statistics.median(samples)), 'heavy': heavy}
+    return results
+
+
+def compare(results, baseline, budget=1.25, slack_us=5000):
+    """Return the modules whose import time exceeds baseline * budget + slack_us.
+
+    The absolute slack keeps millisecond-scale imports from failing on noise.
+    """
+    regressions = []
+    for module, result in results.items():
+        if module in baseline:
+            allowed = baseline[module]['us'] * budget + slack_us
+            if result['us'] > allowed:
+                regressions.append(module)
+    return regressions
+
+
+def main():
+    """Measure entry point import times and optionally check them against a baseline."""
+    parser = argparse.ArgumentParser(description="Track python -X importtime for each entry point")
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS))
+    parser.add_argument('-n', '--repeat', type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument('--baseline', help="JSON baseline to check against")
+    parser.add_argument('--budget', type=float, default=1.25, help="allowed slowdown ratio vs the baseline")
+    parser.add_argument('--save', nargs='?', const=BASELINE_FILE, help="write the results as a baseline")
+    args = parser.parse_args()
+
+    results = measure(args.modules, args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    print(f"⏱️  Import times (median of {args.repeat})")
+    for module, result in results.items():
+        line = f"  {module:24} {result['us'] / 1000:8.1f} ms"
+        if module in baseline:
+            line += f"  (baseline {baseline[module]['us'] / 1000:.1f} ms)"
+        if result['heavy']:
+            line += f"  loads {', '.join(result['heavy'])}"
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline written to {args.save}")
+
+    regressions = compare(results, baseline, args.budget)
+    if regressions:
+        print(f"❌ Slower than {args.budget:.2f}x baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,378 +4,453 @@ Euro Millions Lottery Analyzer and Predictor
 Analyzes historical lottery data and generates predictions using multiple methods.
 """
 
-import pandas as pd
-import numpy as np
+import os
 from collections import Counter, defaultdict
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
+import random
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
+from analysis_cache import AnalysisCache, source_hash
+import analysis_results
+from analysis_results import (AnalysisResults, counter_pairs, int_keys, render_basic_statistics, render_gap_analysis,
+                              render_hot_cold, render_pattern_analysis, render_recommendation, render_text)
+import analysis_state
+from backend import numpy as np, use_numpy  # imported on first use; small histories never load it
+import draw_stats
+import draw_store
+from draw_store import count_draws, draw_masks, load_draws, load_rows, match_counts, rules_for
+from draw_stats import (CoOccurrence, FrequencyIndex, gap_stats_by_number, incidence_matrix, pattern_tally,
+                        summarize_draws, window_frequencies)
+import game_rules
+from pipeline import Pipeline
+from prediction_methods import generate_tickets
+import row_stats
+from weighted_sampler import weighted_sample
+
+# Every module whose code shapes a cached value (loading, kernels, rules, serialization);
+# editing any of them changes the cache keys
+CACHE_SOURCES = (__file__,) + tuple(module.__file__ for module in (
+    analysis_results, analysis_state, draw_stats, draw_store, game_rules, row_stats))
+
+# Attributes built by _load(); with a cache they are only loaded on first use
+LOADED_ATTRIBUTES = ('date_labels', 'date_codes', 'draw_rows')
+# Array views of the draws; a small history only builds them when an array API asks for them
+ARRAY_ATTRIBUTES = ('draws', 'main_masks', 'star_masks', 'sorted_main', 'main_incidence', 'star_incidence')
+
 class EuroMillionsAnalyzer:
-    def __init__(self, csv_file):
-        """Initialize the analyzer with lottery data."""
-        self.df = pd.read_csv(csv_file)
-        self.main_balls = ['Ball 1', 'Ball 2', 'Ball 3', 'Ball 4', 'Ball 5']
-        self.lucky_stars = ['Lucky Star 1', 'Lucky Star 2']
-        
-        # Clean the data - some dates might have .htm extension
-        self.df['Date'] = self.df['Date'].astype(str).str.replace('.htm', '')
-        
-        print(f"Loaded {len(self.df)} lottery draws")
-        print(f"Date range: {self.df['Date'].min()} to {self.df['Date'].max()}")
-        
+    def __init__(self, csv_file, rules=None, cache=None):
+        """Initialize the analyzer with lottery data (EuroMillions unless other game rules are given).
+        
+        With an AnalysisCache, the analyses are read from the cache when this
+        dataset was analyzed before, and the draws themselves are only loaded
+        if something still needs them.
+        """
+        # A draw store knows its game; a CSV file is read with the given rules
+        self.rules = rules = rules_for(csv_file, rules)
+        self.csv_file = csv_file
+        self.main_balls = rules.main_columns
+        self.lucky_stars = rules.star_columns
+        self.cache = cache
+        self.dataset = cache.dataset_hash(csv_file) if cache is not None else None
+        
+        # Aggregates (the fused summary pass, indexes, cached stages) computed once on first use;
+        # a lock per name lets concurrent pipeline stages wait for one computation
+        self._memo = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._df = None
+        self.last_pipeline = None
+        
+        if cache is None:
+            self._once('load', self._load)
+        info = self._cached('dataset', lambda: {'draws': len(self.date_codes),
+                                                'date_range': [min(self.date_labels), max(self.date_labels)]})
+        self.draw_count = info['draws']
+        self.date_range = tuple(info['date_range'])
+        
+        print(f"Loaded {self.draw_count} lottery draws")
+        print(f"Date range: {self.date_range[0]} to {self.date_range[1]}")
+    
+    def _load(self):
+        """Load the draws: plain rows for a small history (numpy is never imported), arrays for a big one."""
+        # CSV file or binary draw store; dates (cleaned of .htm) are date_labels[date_codes]
+        if use_numpy(count_draws(self.csv_file)):
+            self.date_labels, self.date_codes, self._draw_matrix = load_draws(self.csv_file, rules=self.rules)
+            self.draw_rows = None
+        else:
+            labels = {}
+            self.date_codes, self.draw_rows = [], []
+            for row in load_rows(self.csv_file, self.rules):
+                self.date_codes.append(labels.setdefault(row[0], len(labels)))
+                self.draw_rows.append(row[1:])
+            self.date_labels = list(labels)
+    
+    def _load_arrays(self):
+        """Build the arrays from the loaded draw matrix, or from the rows of a small history (importing numpy)."""
+        if self.draw_rows is None:
+            draws, self._draw_matrix = self._draw_matrix, None
+        else:
+            draws = np.array(self.draw_rows, dtype=self.rules.number_dtype).reshape(-1, self.rules.width)
+        self._set_arrays(draws)
+    
+    def _set_arrays(self, draws):
+        """Keep the draw matrix and build the masks, sorted rows and incidence matrices."""
+        rules = self.rules
+        self.draws = draws
+        
+        # One bitmask per draw (bit n-1 set for number n)
+        self.main_masks, self.star_masks = draw_masks(self.draws, rules)
+        self.sorted_main = np.sort(self.draws[:, :rules.main_picks], axis=1)  # row-sorted for the pattern kernels
+        
+        # One-hot draws x numbers incidence matrices
+        self.main_incidence = incidence_matrix(self.draws[:, :rules.main_picks], rules.main_pool)
+        self.star_incidence = incidence_matrix(self.draws[:, rules.main_picks:], rules.star_pool)
+    
+    def __getattr__(self, name):
+        # Only called for attributes not set yet: load the history on first use
+        if name in LOADED_ATTRIBUTES or name in ARRAY_ATTRIBUTES:
+            self._once('load', self._load)
+            if name in ARRAY_ATTRIBUTES:
+                self._once('arrays', self._load_arrays)
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def _once(self, name, compute):
+        """Return compute() memoized under name; concurrent callers wait for the first one."""
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.RLock())
+        with lock:
+            if name not in self._memo:
+                self._memo[name] = compute()
+        return self._memo[name]
+    
+    def _cache_key(self, stage, **params):
+        # The disk key covers the dataset hash, the game rules, the analysis source code and the call parameters
+        return self.cache.key(self.dataset, stage, game=self.rules.to_dict(), code=source_hash(*CACHE_SOURCES),
+                              **params)
+    
+    def _cached(self, stage, compute, **params):
+        """Return a stage's JSON-compatible result, memoized and (with a cache) kept on disk."""
+        if self.cache is None:
+            fetch = compute
+        else:
+            key = self._cache_key(stage, **params)
+            fetch = lambda: self.cache.fetch(key, compute)
+        return self._once((stage,) + tuple(sorted(params.items())), fetch)
+    
+    def _all_cached(self, *stages):
+        """Return True if every (stage, params) result is memoized or on disk; disk hits are memoized.
+        
+        Lets the pipeline skip loading and summarizing the draws when nothing
+        downstream would read them.
+        """
+        if self.cache is None:
+            return False
+        for stage, params in stages:
+            name = (stage,) + tuple(sorted(params.items()))
+            if name in self._memo:
+                continue
+            value = self.cache.get(self._cache_key(stage, **params))
+            if value is None:
+                return False
+            self._memo.setdefault(name, value)
+        return True
+    
+    def load_arrays(self):
+        """Build the draw arrays now when the analyses read them (a big history); a small one is summarized from rows."""
+        if self.draw_rows is None:
+            self._once('arrays', self._load_arrays)
+    
+    @property
+    def df(self):
+        """The draws as a pandas DataFrame with the CSV columns; pandas is only imported here."""
+        if self._df is None:
+            import pandas as pd
+            
+            self._df = pd.DataFrame(self.draws, columns=self.main_balls + self.lucky_stars)
+            self._df.insert(0, 'Date', np.array(self.date_labels, dtype=object)[self.date_codes])
+        return self._df
+        
+    def summary(self):
+        """Return every aggregate of the history, computed once in one fused pass (stdlib loops when small)."""
+        rules = self.rules
+        def compute():
+            if self.draw_rows is not None:
+                return row_stats.summarize_rows(self.draw_rows, rules.main_picks, rules.main_pool, rules.star_pool)
+            return summarize_draws(self.draws, self.main_incidence, self.star_incidence, self.sorted_main,
+                                   rules.main_picks, rules.main_pool, rules.star_pool)
+        return self._once('summary', compute)
+    
+    def frequency_index(self):
+        """Return the prefix-sum frequency index for range, window and year queries."""
+        def build():
+            label_years = np.array([int(date) if date.isdigit() else np.nan for date in self.date_labels])
+            years = label_years[self.date_codes]
+            return FrequencyIndex(self.main_incidence, self.star_incidence, years)
+        return self._once('frequency_index', build)
+    
+    def cooccurrence(self):
+        """Return the pair, triple and main x star co-occurrence counts."""
+        return self._once('cooccurrence', lambda: CoOccurrence(self.main_incidence, self.star_incidence))
+    
+    def cooccurrence_summary(self, top=10):
+        """Return the top main pairs, triples, star pairs and main x star pairs as [[numbers], count] lists."""
+        def compute():
+            rules = self.rules
+            if self.draw_rows is not None:
+                tops = row_stats.top_cooccurrences(self.draw_rows, top, rules.main_picks, rules.main_pool,
+                                                   rules.star_pool)
+            else:
+                counts = self.cooccurrence()
+                tops = {'main_pairs': counts.top_pairs(top), 'triples': counts.top_triples(top),
+                        'star_pairs': counts.top_pairs(top, 'star'), 'cross': counts.top_pairs(top, 'cross')}
+            return {kind: [[list(numbers), int(count)] for numbers, count in pairs] for kind, pairs in tops.items()}
+        return self._cached('cooccurrence', compute, top=top)
+    
+    def match_history(self, main, lucky):
+        """Count how many main balls and lucky stars a ticket shares with every draw."""
+        return match_counts(self.main_masks, self.star_masks, main, lucky, self.rules)
+    
+    def generate_tickets(self, method, k, seed=None, recent_draws=50):
+        """Return (k x main picks, k x star picks) arrays of k tickets for one prediction method in one vectorized call."""
+        return generate_tickets(self.draws, method, k, seed, recent_draws, self.rules)
+    
+    def frequencies(self):
+        """Return (main ball Counter, lucky star Counter) over the whole history."""
+        pairs = self._cached('frequencies', lambda: [counter_pairs(Counter(self.summary()['main_freq'])),
+                                                     counter_pairs(Counter(self.summary()['lucky_freq']))])
+        return tuple(Counter(dict(freq)) for freq in pairs)
+    
     def basic_statistics(self):
         """Generate basic statistics about the lottery numbers."""
-        print("\n" + "="*50)
-        print("BASIC STATISTICS")
-        print("="*50)
-        
-        # Frequency analysis for main balls (1-50)
-        all_main_balls = []
-        for col in self.main_balls:
-            all_main_balls.extend(self.df[col].tolist())
-        
-        main_freq = Counter(all_main_balls)
-        print(f"\nMain Balls Frequency (1-50):")
-        print("Most frequent:")
-        for num, count in main_freq.most_common(10):
-            percentage = (count / len(all_main_balls)) * 100
-            print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
-        
-        print("Least frequent:")
-        for num, count in main_freq.most_common()[-10:]:
-            percentage = (count / len(all_main_balls)) * 100
-            print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
-        
-        # Frequency analysis for lucky stars (1-12)
-        all_lucky_stars = []
-        for col in self.lucky_stars:
-            all_lucky_stars.extend(self.df[col].tolist())
-        
-        lucky_freq = Counter(all_lucky_stars)
-        print(f"\nLucky Stars Frequency (1-12):")
-        print("Most frequent:")
-        for num, count in lucky_freq.most_common(6):
-            percentage = (count / len(all_lucky_stars)) * 100
-            print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
-        
-        print("Least frequent:")
-        for num, count in lucky_freq.most_common()[-6:]:
-            percentage = (count / len(all_lucky_stars)) * 100
-            print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
-        
+        main_freq, lucky_freq = self.frequencies()
+        print(render_basic_statistics(main_freq, lucky_freq, self.draw_count, self.rules))
         return main_freq, lucky_freq
     
+    def gap_distributions(self):
+        """Gap mean, median, p90, max and current gap of every main ball and lucky star."""
+        def compute():
+            summary = self.summary()
+            return [{str(num): stats for num, stats in gap_stats_by_number(summary[key]).items()}
+                    for key in ('main_gaps', 'lucky_gaps')]
+        main_stats, lucky_stats = self._cached('gap_distributions', compute)
+        return int_keys(main_stats), int_keys(lucky_stats)
+    
     def gap_analysis(self):
         """Analyze gaps between appearances of numbers."""
-        print("\n" + "="*50)
-        print("GAP ANALYSIS")
-        print("="*50)
-        
-        # Track last appearance of each number
-        main_last_seen = {i: -1 for i in range(1, 51)}
-        lucky_last_seen = {i: -1 for i in range(1, 13)}
-        
-        main_gaps = {i: [] for i in range(1, 51)}
-        lucky_gaps = {i: [] for i in range(1, 13)}
-        
-        for draw_idx, row in self.df.iterrows():
-            # Process main balls
-            drawn_main = [row[col] for col in self.main_balls]
-            for num in range(1, 51):
-                if num in drawn_main:
-                    if main_last_seen[num] != -1:
-                        gap = draw_idx - main_last_seen[num]
-                        main_gaps[num].append(gap)
-                    main_last_seen[num] = draw_idx
-            
-            # Process lucky stars
-            drawn_lucky = [row[col] for col in self.lucky_stars]
-            for num in range(1, 13):
-                if num in drawn_lucky:
-                    if lucky_last_seen[num] != -1:
-                        gap = draw_idx - lucky_last_seen[num]
-                        lucky_gaps[num].append(gap)
-                    lucky_last_seen[num] = draw_idx
+        main_stats, lucky_stats = self.gap_distributions()
+        print(render_gap_analysis(main_stats, lucky_stats, self.rules))
         
         # Current gaps (numbers that haven't appeared recently)
-        current_draw = len(self.df) - 1
-        main_current_gaps = {num: current_draw - last_seen for num, last_seen in main_last_seen.items()}
-        lucky_current_gaps = {num: current_draw - last_seen for num, last_seen in lucky_last_seen.items()}
-        
-        print("Numbers with longest current gaps (overdue):")
-        print("Main balls:")
-        sorted_main_gaps = sorted(main_current_gaps.items(), key=lambda x: x[1], reverse=True)
-        for num, gap in sorted_main_gaps[:10]:
-            print(f"  {num:2d}: {gap:3d} draws ago")
-        
-        print("Lucky stars:")
-        sorted_lucky_gaps = sorted(lucky_current_gaps.items(), key=lambda x: x[1], reverse=True)
-        for num, gap in sorted_lucky_gaps[:6]:
-            print(f"  {num:2d}: {gap:3d} draws ago")
-        
+        main_current_gaps = {num: stats['current'] for num, stats in main_stats.items()}
+        lucky_current_gaps = {num: stats['current'] for num, stats in lucky_stats.items()}
         return main_current_gaps, lucky_current_gaps
     
-    def pattern_analysis(self):
-        """Analyze patterns in lottery draws."""
-        print("\n" + "="*50)
-        print("PATTERN ANALYSIS")
-        print("="*50)
-        
-        patterns = {
-            'consecutive_pairs': 0,
-            'consecutive_triplets': 0,
-            'same_decade': 0,
-            'all_odd': 0,
-            'all_even': 0,
-            'majority_odd': 0,
-            'majority_even': 0,
-            'sum_ranges': defaultdict(int)
-        }
-        
-        for _, row in self.df.iterrows():
-            main_nums = sorted([row[col] for col in self.main_balls])
-            
-            # Consecutive numbers
-            consecutive_count = 0
-            for i in range(len(main_nums) - 1):
-                if main_nums[i+1] - main_nums[i] == 1:
-                    consecutive_count += 1
-            
-            if consecutive_count >= 1:
-                patterns['consecutive_pairs'] += 1
-            if consecutive_count >= 2:
-                patterns['consecutive_triplets'] += 1
-            
-            # Same decade analysis
-            decades = [num // 10 for num in main_nums]
-            if len(set(decades)) <= 3:  # Numbers concentrated in 3 or fewer decades
-                patterns['same_decade'] += 1
-            
-            # Odd/Even analysis
-            odd_count = sum(1 for num in main_nums if num % 2 == 1)
-            if odd_count == 5:
-                patterns['all_odd'] += 1
-            elif odd_count == 0:
-                patterns['all_even'] += 1
-            elif odd_count >= 3:
-                patterns['majority_odd'] += 1
+    def patterns(self, sum_width=25):
+        """Return the pattern counts, bucketing sums into sum_width-wide ranges."""
+        def compute():
+            if sum_width == 25:
+                patterns = self.summary()['patterns']
+            elif self.draw_rows is not None:
+                patterns = row_stats.pattern_tally(self.draw_rows, self.rules.main_picks, sum_width)
             else:
-                patterns['majority_even'] += 1
-            
-            # Sum analysis
-            total_sum = sum(main_nums)
-            sum_range = f"{(total_sum // 25) * 25}-{(total_sum // 25) * 25 + 24}"
-            patterns['sum_ranges'][sum_range] += 1
-        
-        total_draws = len(self.df)
-        print(f"Pattern frequencies out of {total_draws} draws:")
-        print(f"  Consecutive pairs: {patterns['consecutive_pairs']} ({patterns['consecutive_pairs']/total_draws*100:.1f}%)")
-        print(f"  Consecutive triplets: {patterns['consecutive_triplets']} ({patterns['consecutive_triplets']/total_draws*100:.1f}%)")
-        print(f"  Same decade concentration: {patterns['same_decade']} ({patterns['same_decade']/total_draws*100:.1f}%)")
-        print(f"  All odd: {patterns['all_odd']} ({patterns['all_odd']/total_draws*100:.1f}%)")
-        print(f"  All even: {patterns['all_even']} ({patterns['all_even']/total_draws*100:.1f}%)")
-        print(f"  Majority odd: {patterns['majority_odd']} ({patterns['majority_odd']/total_draws*100:.1f}%)")
-        print(f"  Majority even: {patterns['majority_even']} ({patterns['majority_even']/total_draws*100:.1f}%)")
-        
-        print("\nSum ranges:")
-        for sum_range, count in sorted(patterns['sum_ranges'].items()):
-            print(f"  {sum_range}: {count} ({count/total_draws*100:.1f}%)")
-        
+                patterns = pattern_tally(self.sorted_main, sum_width, presorted=True)
+            return {key: dict(value) if key == 'sum_ranges' else int(value) for key, value in patterns.items()}
+        patterns = self._cached('patterns', compute, sum_width=sum_width)
+        return dict(patterns, sum_ranges=defaultdict(int, patterns['sum_ranges']))
+    
+    def pattern_metrics(self):
+        """Return the span, widest gap and low-half histograms of the main balls, with their means."""
+        return self._cached('pattern_metrics', lambda: {
+            key: [int(count) for count in value] if hasattr(value, '__len__') else float(value)
+            for key, value in self.summary()['pattern_metrics'].items()})
+    
+    def pattern_analysis(self, sum_width=25):
+        """Analyze patterns in lottery draws, bucketing sums into sum_width-wide ranges."""
+        patterns = self.patterns(sum_width)
+        print(render_pattern_analysis(patterns, self.pattern_metrics(), self.draw_count, self.rules))
         return patterns
     
+    def recent_frequencies(self, recent_draws=50):
+        """Return (main ball Counter, lucky star Counter) over the last recent_draws draws."""
+        def compute():
+            if self.draw_rows is not None:
+                window = row_stats.window_frequencies(self.draw_rows, recent_draws, self.rules.main_picks)
+            else:
+                # The window is counted directly unless the prefix-sum index is already built:
+                # the index holds a row per draw and is not worth building for one query
+                window = window_frequencies(self.draws, recent_draws, self._memo.get('frequency_index'),
+                                            self.rules.main_picks, self.rules.main_pool, self.rules.star_pool)
+            return [counter_pairs(freq) for freq in window]
+        pairs = self._cached('recent_frequencies', compute, recent_draws=recent_draws)
+        return tuple(Counter(dict(freq)) for freq in pairs)
+    
     def hot_cold_analysis(self, recent_draws=50):
         """Analyze hot and cold numbers based on recent draws."""
-        print(f"\n" + "="*50)
-        print(f"HOT/COLD ANALYSIS (Last {recent_draws} draws)")
-        print("="*50)
-        
-        recent_data = self.df.tail(recent_draws)
-        
-        # Recent frequency for main balls
-        recent_main_balls = []
-        for col in self.main_balls:
-            recent_main_balls.extend(recent_data[col].tolist())
-        
-        recent_main_freq = Counter(recent_main_balls)
-        
-        print("HOT main balls (most frequent in recent draws):")
-        for num, count in recent_main_freq.most_common(10):
-            percentage = (count / len(recent_main_balls)) * 100
-            print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
-        
-        print("\nCOLD main balls (least frequent in recent draws):")
-        cold_main = [num for num in range(1, 51) if num not in recent_main_freq]
-        if cold_main:
-            print(f"  Numbers not drawn: {cold_main}")
-        
-        least_frequent_main = recent_main_freq.most_common()[-10:]
-        for num, count in least_frequent_main:
-            percentage = (count / len(recent_main_balls)) * 100
-            print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
-        
-        # Recent frequency for lucky stars
-        recent_lucky_stars = []
-        for col in self.lucky_stars:
-            recent_lucky_stars.extend(recent_data[col].tolist())
-        
-        recent_lucky_freq = Counter(recent_lucky_stars)
-        
-        print("\nHOT lucky stars:")
-        for num, count in recent_lucky_freq.most_common(6):
-            percentage = (count / len(recent_lucky_stars)) * 100
-            print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
-        
-        print("\nCOLD lucky stars:")
-        cold_lucky = [num for num in range(1, 13) if num not in recent_lucky_freq]
-        if cold_lucky:
-            print(f"  Numbers not drawn: {cold_lucky}")
-        
+        recent_main_freq, recent_lucky_freq = self.recent_frequencies(recent_draws)
+        print(render_hot_cold(recent_main_freq, recent_lucky_freq, recent_draws, self.rules))
         return recent_main_freq, recent_lucky_freq
     
+    def pipeline(self, recent_draws=50, sum_width=25, workers=None):
+        """Return the analysis as a lazy stage DAG; nothing runs until a stage is asked for.
+        
+        Inputs are the dataset, the hot/cold window and the pattern sum width.
+        'arrays' builds the draw arrays and 'summary' runs the fused pass that
+        the frequency, gap and pattern views read, so each cost is timed
+        once; both are skipped when the cache already holds every result
+        that needs them. The window and co-occurrence stages run alongside
+        the summary; the predictions wait for the frequency, gap and window
+        stages, and 'results' gathers everything into AnalysisResults.
+        """
+        views = [('frequencies', {}), ('gap_distributions', {}), ('patterns', {'sum_width': sum_width}),
+                 ('pattern_metrics', {})]
+        others = [('recent_frequencies', {'recent_draws': recent_draws}), ('cooccurrence', {'top': 10})]
+        
+        stages = Pipeline(workers)
+        stages.value('dataset', self.csv_file)
+        stages.value('recent_draws', recent_draws)
+        stages.value('sum_width', sum_width)
+        stages.add('arrays', lambda dataset: None if self._all_cached(*views, *others) else self.load_arrays(),
+                   ['dataset'])
+        stages.add('summary', lambda arrays: None if self._all_cached(*views) else self.summary(), ['arrays'])
+        stages.add('frequencies', lambda summary: self.frequencies(), ['summary'])
+        stages.add('gap_distributions', lambda summary: self.gap_distributions(), ['summary'])
+        stages.add('patterns', lambda summary, width: self.patterns(width), ['summary', 'sum_width'])
+        stages.add('pattern_metrics', lambda summary: self.pattern_metrics(), ['summary'])
+        stages.add('recent_frequencies', lambda arrays, window: self.recent_frequencies(window),
+                   ['arrays', 'recent_draws'])
+        stages.add('cooccurrence', lambda arrays: self.cooccurrence_summary(), ['arrays'])
+        
+        def predictions(freq, gap_stats, recent):
+            main_gaps, lucky_gaps = ({num: stats['current'] for num, stats in by_number.items()}
+                                     for by_number in gap_stats)
+            return self.predict(freq[0], freq[1], main_gaps, lucky_gaps, recent[0], recent[1])
+        stages.add('predictions', predictions, ['frequencies', 'gap_distributions', 'recent_frequencies'])
+        
+        def results(freq, gap_stats, patterns, metrics, window, recent, cooccurrence, predictions):
+            return AnalysisResults(self.draw_count, self.date_range, freq[0], freq[1], gap_stats[0], gap_stats[1],
+                                   patterns, metrics, window, recent[0], recent[1], predictions, self.rules,
+                                   cooccurrence)
+        stages.add('results', results, ['frequencies', 'gap_distributions', 'patterns', 'pattern_metrics',
+                                        'recent_draws', 'recent_frequencies', 'cooccurrence', 'predictions'])
+        return stages
+    
+    def analyze(self, recent_draws=50, workers=None):
+        """Run every analysis and prediction method without printing; returns AnalysisResults.
+        
+        The stage DAG of the run (with its per-stage timings) is kept as
+        last_pipeline.
+        """
+        self.last_pipeline = self.pipeline(recent_draws, workers=workers)
+        return self.last_pipeline.get('results')
+    
     def generate_predictions(self):
         """Generate predictions using multiple methods."""
-        print("\n" + "="*70)
-        print("LOTTERY PREDICTIONS FOR NEXT DRAW")
-        print("="*70)
-        
-        # Get analysis data
-        main_freq, lucky_freq = self.basic_statistics()
-        main_gaps, lucky_gaps = self.gap_analysis()
-        patterns = self.pattern_analysis()
-        recent_main_freq, recent_lucky_freq = self.hot_cold_analysis()
-        
+        results = self.analyze()
+        print(render_text(results))
+        return results.predictions
+    
+    def predict(self, main_freq, lucky_freq, main_gaps, lucky_gaps, recent_main_freq, recent_lucky_freq):
+        """Return {method: {'main', 'lucky'}} from the frequency, gap and hot/cold analyses."""
         predictions = {}
+        main_pool, main_picks = self.rules.main_pool, self.rules.main_picks
+        star_pool, star_picks = self.rules.star_pool, self.rules.star_picks
         
         # Method 1: Most frequent numbers
         most_frequent_main = [num for num, _ in main_freq.most_common(10)]
         most_frequent_lucky = [num for num, _ in lucky_freq.most_common(4)]
         predictions['most_frequent'] = {
-            'main': np.random.choice(most_frequent_main, 5, replace=False).tolist(),
-            'lucky': np.random.choice(most_frequent_lucky, 2, replace=False).tolist()
+            'main': random.sample(most_frequent_main, main_picks),
+            'lucky': random.sample(most_frequent_lucky, star_picks)
         }
         
         # Method 2: Overdue numbers (longest gaps)
         overdue_main = sorted(main_gaps.items(), key=lambda x: x[1], reverse=True)[:10]
         overdue_lucky = sorted(lucky_gaps.items(), key=lambda x: x[1], reverse=True)[:4]
         predictions['overdue'] = {
-            'main': np.random.choice([num for num, _ in overdue_main], 5, replace=False).tolist(),
-            'lucky': np.random.choice([num for num, _ in overdue_lucky], 2, replace=False).tolist()
+            'main': random.sample([num for num, _ in overdue_main], main_picks),
+            'lucky': random.sample([num for num, _ in overdue_lucky], star_picks)
         }
         
         # Method 3: Hot numbers (recent frequency)
         hot_main = [num for num, _ in recent_main_freq.most_common(10)]
         hot_lucky = [num for num, _ in recent_lucky_freq.most_common(4)]
         predictions['hot'] = {
-            'main': np.random.choice(hot_main, 5, replace=False).tolist(),
-            'lucky': np.random.choice(hot_lucky, 2, replace=False).tolist()
+            'main': random.sample(hot_main, main_picks),
+            'lucky': random.sample(hot_lucky, star_picks)
         }
         
         # Method 4: Balanced approach (mix of frequent and overdue)
         balanced_main_candidates = list(set(most_frequent_main[:7] + [num for num, _ in overdue_main[:7]]))
         balanced_lucky_candidates = list(set(most_frequent_lucky[:3] + [num for num, _ in overdue_lucky[:3]]))
         predictions['balanced'] = {
-            'main': sorted(np.random.choice(balanced_main_candidates, 5, replace=False).tolist()),
-            'lucky': sorted(np.random.choice(balanced_lucky_candidates, 2, replace=False).tolist())
+            'main': sorted(random.sample(balanced_main_candidates, main_picks)),
+            'lucky': sorted(random.sample(balanced_lucky_candidates, star_picks))
         }
         
         # Method 5: Pattern-based prediction
         # Aim for typical patterns: mix of odd/even, reasonable sum, avoid all consecutive
         pattern_main = []
-        while len(pattern_main) < 5:
-            candidate = np.random.randint(1, 51)
+        while len(pattern_main) < main_picks:
+            candidate = random.randint(1, main_pool)
             if candidate not in pattern_main:
                 pattern_main.append(candidate)
         
-        # Ensure mix of odd/even
+        # Ensure mix of odd/even (for 5 picks: at least 2 and at most 3 odd)
         odd_count = sum(1 for num in pattern_main if num % 2 == 1)
-        if odd_count < 2:  # Add more odds
+        fewest_odd, most_odd = main_picks // 2, (main_picks + 1) // 2
+        if odd_count < fewest_odd:  # Add more odds
             for i, num in enumerate(pattern_main):
-                if num % 2 == 0 and odd_count < 3:
-                    new_odd = np.random.choice([n for n in range(1, 51, 2) if n not in pattern_main])
+                if num % 2 == 0 and odd_count < most_odd:
+                    new_odd = random.choice([n for n in range(1, main_pool + 1, 2) if n not in pattern_main])
                     pattern_main[i] = new_odd
                     odd_count += 1
-        elif odd_count > 3:  # Add more evens
+        elif odd_count > most_odd:  # Add more evens
             for i, num in enumerate(pattern_main):
-                if num % 2 == 1 and odd_count > 3:
-                    new_even = np.random.choice([n for n in range(2, 51, 2) if n not in pattern_main])
+                if num % 2 == 1 and odd_count > most_odd:
+                    new_even = random.choice([n for n in range(2, main_pool + 1, 2) if n not in pattern_main])
                     pattern_main[i] = new_even
                     odd_count -= 1
         
-        pattern_lucky = sorted(np.random.choice(range(1, 13), 2, replace=False).tolist())
+        pattern_lucky = sorted(random.sample(range(1, star_pool + 1), star_picks))
         predictions['pattern_based'] = {
             'main': sorted(pattern_main),
             'lucky': pattern_lucky
         }
         
         # Method 6: AI/ML inspired (using weighted probabilities)
-        main_weights = np.array([main_freq.get(i, 0) for i in range(1, 51)])
-        gap_weights = np.array([1.0 / (main_gaps.get(i, 1) + 1) for i in range(1, 51)])
-        combined_weights = main_weights * 0.7 + gap_weights * 0.3
-        combined_weights = combined_weights / combined_weights.sum()
-        
-        ml_main = np.random.choice(range(1, 51), 5, replace=False, p=combined_weights).tolist()
-        
-        lucky_weights = np.array([lucky_freq.get(i, 0) for i in range(1, 13)])
-        lucky_gap_weights = np.array([1.0 / (lucky_gaps.get(i, 1) + 1) for i in range(1, 13)])
-        lucky_combined_weights = lucky_weights * 0.7 + lucky_gap_weights * 0.3
-        lucky_combined_weights = lucky_combined_weights / lucky_combined_weights.sum()
+        combined_weights = [main_freq.get(i, 0) * 0.7 + 1.0 / (main_gaps.get(i, 1) + 1) * 0.3
+                            for i in range(1, main_pool + 1)]
+        ml_main = weighted_sample(list(range(1, main_pool + 1)), combined_weights, main_picks)
         
-        ml_lucky = np.random.choice(range(1, 13), 2, replace=False, p=lucky_combined_weights).tolist()
+        lucky_combined_weights = [lucky_freq.get(i, 0) * 0.7 + 1.0 / (lucky_gaps.get(i, 1) + 1) * 0.3
+                                  for i in range(1, star_pool + 1)]
+        ml_lucky = weighted_sample(list(range(1, star_pool + 1)), lucky_combined_weights, star_picks)
         
         predictions['ml_weighted'] = {
             'main': sorted(ml_main),
             'lucky': sorted(ml_lucky)
         }
         
-        # Display predictions
-        print("\n🎱 PREDICTION METHODS:")
-        print("-" * 70)
-        
-        for method, pred in predictions.items():
-            method_name = method.replace('_', ' ').title()
-            main_str = ' - '.join(f"{num:2d}" for num in sorted(pred['main']))
-            lucky_str = ' - '.join(f"{num:2d}" for num in sorted(pred['lucky']))
-            print(f"{method_name:15}: [{main_str}] + [{lucky_str}]")
-        
         return predictions
     
     def save_analysis_report(self, filename="lottery_analysis_report.txt"):
-        """Save a comprehensive analysis report."""
-        import sys
-        from io import StringIO
+        """Save a comprehensive analysis report, plus the results as JSON next to it."""
+        results = self.analyze()
         
-        # Capture output
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        
-        try:
-            # Run all analyses
-            self.basic_statistics()
-            self.gap_analysis()
-            self.pattern_analysis()
-            self.hot_cold_analysis()
-            predictions = self.generate_predictions()
-            
-            # Get the captured output
-            report_content = captured_output.getvalue()
-            
-        finally:
-            # Restore stdout
-            sys.stdout = old_stdout
-        
-        # Save to file
         with open(filename, 'w') as f:
             f.write(f"Euro Millions Lottery Analysis Report\n")
             f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Data: {len(self.df)} draws from {self.df['Date'].min()} to {self.df['Date'].max()}\n")
+            f.write(f"Data: {self.draw_count} draws from {self.date_range[0]} to {self.date_range[1]}\n")
             f.write("=" * 80 + "\n\n")
-            f.write(report_content)
+            f.write(render_text(results) + "\n")
+        results.save(os.path.splitext(filename)[0] + '.json')
         
         print(f"\n📊 Analysis report saved to: {filename}")
-        return predictions
+        return results.predictions
 
 def main():
     """Main function to run the lottery analyzer."""
@@ -383,7 +458,7 @@ def main():
     print("=" * 50)
     
     # Initialize analyzer
-    analyzer = EuroMillionsAnalyzer('/Users/elbandi/Desktop/lotteryNumbers/lottery_results.csv')
+    analyzer = EuroMillionsAnalyzer('/Users/elbandi/Desktop/lotteryNumbers/lottery_results.csv', cache=AnalysisCache())
     
     # Run comprehensive analysis
     predictions = analyzer.save_analysis_report('/Users/elbandi/Desktop/lotteryNumbers/analysis_report.txt')
@@ -397,17 +472,8 @@ def main():
     balanced = predictions['balanced']
     ml_weighted = predictions['ml_weighted']
     
-    print("🥇 PRIMARY RECOMMENDATION (Balanced Method):")
-    main_str = ' - '.join(f"{num:2d}" for num in balanced['main'])
-    lucky_str = ' - '.join(f"{num:2d}" for num in balanced['lucky'])
-    print(f"   Main Balls: {main_str}")
-    print(f"   Lucky Stars: {lucky_str}")
-    
-    print("\n🥈 SECONDARY RECOMMENDATION (ML Weighted):")
-    main_str = ' - '.join(f"{num:2d}" for num in ml_weighted['main'])
-    lucky_str = ' - '.join(f"{num:2d}" for num in ml_weighted['lucky'])
-    print(f"   Main Balls: {main_str}")
-    print(f"   Lucky Stars: {lucky_str}")
+    print(render_recommendation("🥇 PRIMARY RECOMMENDATION (Balanced Method):", balanced, analyzer.rules))
+    print(render_recommendation("\n🥈 SECONDARY RECOMMENDATION (ML Weighted):", ml_weighted, analyzer.rules))
     
     print("\n📈 Analysis complete! Check the full report for detailed insights.")
 
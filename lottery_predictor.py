@@ -5,79 +5,111 @@ Analyzes historical lottery data and generates predictions using multiple method
 Pure Python implementation - no external dependencies required.
 """
 
-import csv
 import random
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime
 
+from analysis_state import AnalysisState, print_snapshot, stream_states, update_state
+from draw_store import iter_draw_rows, load_rows, number_mask, rules_for
+from weighted_sampler import weighted_sample
+
 class EuroMillionsAnalyzer:
-    def __init__(self, csv_file):
-        """Initialize the analyzer with lottery data."""
-        self.data = []
-        self.main_balls_cols = [1, 2, 3, 4, 5]  # Ball 1-5 column indices
-        self.lucky_stars_cols = [6, 7]  # Lucky Star 1-2 column indices
-        
-        # Read CSV file
-        with open(csv_file, 'r') as f:
-            reader = csv.reader(f)
-            headers = next(reader)  # Skip header
-            for row in reader:
-                # Convert numeric columns to integers
-                processed_row = [row[0]]  # Keep date as string
-                for i in range(1, 8):  # Convert balls and stars to int
-                    processed_row.append(int(row[i]))
-                self.data.append(processed_row)
-        
-        # Clean dates - remove .htm extension if present
-        for row in self.data:
-            row[0] = row[0].replace('.htm', '')
-        
-        print(f"Loaded {len(self.data)} lottery draws")
-        if self.data:
-            print(f"Date range: {self.data[0][0]} to {self.data[-1][0]}")
-        
+    def __init__(self, csv_file, state_file=None, stream=False, report_every=None, rules=None):
+        """Initialize the analyzer with lottery data.
+        
+        With a state_file, the aggregates are loaded from disk and only the
+        draws added since the last run are appended.
+        
+        With stream=True, csv_file may also be '-' (stdin) or any iterable of
+        [date, 7 ints] rows. Draws are folded into the bounded-memory state one
+        at a time and never stored, and statistics are printed every
+        report_every draws. match_history needs the full history and is not
+        available in this mode.
+        
+        rules (default: the draw store's own, else EuroMillions) sets the pools
+        and picks of the game.
+        """
+        self.rules = rules = rules_for(csv_file, rules)
+        self.main_balls_cols = list(range(1, rules.main_picks + 1))  # Main ball column indices
+        self.lucky_stars_cols = list(range(rules.main_picks + 1, rules.width + 1))  # Star column indices
+        
+        if stream:
+            self.data = None
+            self.main_masks = self.star_masks = None
+            self.first_date = self.last_date = None
+            self.state = AnalysisState.for_rules(rules)
+            for state in stream_states(self._track_dates(iter_draw_rows(csv_file, rules)), report_every, self.state):
+                if report_every:
+                    print_snapshot(state)
+        else:
+            # Read the CSV file or binary draw store (dates already cleaned)
+            self.data = load_rows(csv_file, rules)
+            
+            # One bitmask per draw (bit n-1 set for number n) for fast matching
+            split = rules.main_picks + 1
+            self.main_masks = [number_mask(row[1:split]) for row in self.data]
+            self.star_masks = [number_mask(row[split:]) for row in self.data]
+            
+            # Frequencies, gaps, patterns and the recent window in one pass
+            self.state, _ = update_state(self.data, state_file, rules=rules)
+            self.first_date = self.data[0][0] if self.data else None
+            self.last_date = self.data[-1][0] if self.data else None
+        
+        print(f"Loaded {self.state.draws} lottery draws")
+        if self.state.draws:
+            print(f"Date range: {self.first_date} to {self.last_date}")
+    
+    def _track_dates(self, rows):
+        """Pass rows through, remembering the first and last date seen."""
+        for row in rows:
+            if self.first_date is None:
+                self.first_date = row[0]
+            self.last_date = row[0]
+            yield row
+        
+    def match_history(self, main, lucky):
+        """Count how many main balls and lucky stars a ticket shares with every draw."""
+        if self.main_masks is None:
+            raise ValueError("match_history needs the full history and is not available when streaming")
+        ticket_main, ticket_star = number_mask(main), number_mask(lucky)
+        main_hits = [bin(mask & ticket_main).count('1') for mask in self.main_masks]
+        star_hits = [bin(mask & ticket_star).count('1') for mask in self.star_masks]
+        return main_hits, star_hits
+    
     def basic_statistics(self):
         """Generate basic statistics about the lottery numbers."""
         print("\n" + "="*50)
         print("BASIC STATISTICS")
         print("="*50)
         
-        # Frequency analysis for main balls (1-50)
-        all_main_balls = []
-        for row in self.data:
-            for col_idx in self.main_balls_cols:
-                all_main_balls.append(row[col_idx])
+        main_freq, lucky_freq = self.state.frequencies()
+        total_main = self.state.draws * len(self.main_balls_cols)
+        total_lucky = self.state.draws * len(self.lucky_stars_cols)
         
-        main_freq = Counter(all_main_balls)
-        print(f"\nMain Balls Frequency (1-50):")
+        # Frequency analysis for main balls
+        print(f"\nMain Balls Frequency (1-{self.rules.main_pool}):")
         print("Most frequent:")
         for num, count in main_freq.most_common(10):
-            percentage = (count / len(all_main_balls)) * 100
+            percentage = (count / total_main) * 100
             print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
         
         print("Least frequent:")
         least_common = sorted(main_freq.items(), key=lambda x: x[1])[:10]
         for num, count in least_common:
-            percentage = (count / len(all_main_balls)) * 100
+            percentage = (count / total_main) * 100
             print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
         
-        # Frequency analysis for lucky stars (1-12)
-        all_lucky_stars = []
-        for row in self.data:
-            for col_idx in self.lucky_stars_cols:
-                all_lucky_stars.append(row[col_idx])
-        
-        lucky_freq = Counter(all_lucky_stars)
-        print(f"\nLucky Stars Frequency (1-12):")
+        # Frequency analysis for lucky stars
+        print(f"\nLucky Stars Frequency (1-{self.rules.star_pool}):")
         print("Most frequent:")
         for num, count in lucky_freq.most_common(6):
-            percentage = (count / len(all_lucky_stars)) * 100
+            percentage = (count / total_lucky) * 100
             print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
         
         print("Least frequent:")
         least_common_lucky = sorted(lucky_freq.items(), key=lambda x: x[1])[:6]
         for num, count in least_common_lucky:
-            percentage = (count / len(all_lucky_stars)) * 100
+            percentage = (count / total_lucky) * 100
             print(f"  {num:2d}: {count:3d} times ({percentage:.1f}%)")
         
         return main_freq, lucky_freq
@@ -88,27 +120,8 @@ class EuroMillionsAnalyzer:
         print("GAP ANALYSIS")
         print("="*50)
         
-        # Track last appearance of each number
-        main_last_seen = {i: -1 for i in range(1, 51)}
-        lucky_last_seen = {i: -1 for i in range(1, 13)}
-        
-        for draw_idx, row in enumerate(self.data):
-            # Process main balls
-            drawn_main = [row[col_idx] for col_idx in self.main_balls_cols]
-            for num in range(1, 51):
-                if num in drawn_main:
-                    main_last_seen[num] = draw_idx
-            
-            # Process lucky stars
-            drawn_lucky = [row[col_idx] for col_idx in self.lucky_stars_cols]
-            for num in range(1, 13):
-                if num in drawn_lucky:
-                    lucky_last_seen[num] = draw_idx
-        
         # Current gaps (numbers that haven't appeared recently)
-        current_draw = len(self.data) - 1
-        main_current_gaps = {num: current_draw - last_seen for num, last_seen in main_last_seen.items()}
-        lucky_current_gaps = {num: current_draw - last_seen for num, last_seen in lucky_last_seen.items()}
+        main_current_gaps, lucky_current_gaps = self.state.current_gaps()
         
         print("Numbers with longest current gaps (overdue):")
         print("Main balls:")
@@ -129,53 +142,9 @@ class EuroMillionsAnalyzer:
         print("PATTERN ANALYSIS")
         print("="*50)
         
-        patterns = {
-            'consecutive_pairs': 0,
-            'consecutive_triplets': 0,
-            'same_decade': 0,
-            'all_odd': 0,
-            'all_even': 0,
-            'majority_odd': 0,
-            'majority_even': 0,
-            'sum_ranges': defaultdict(int)
-        }
+        patterns = self.state.pattern_counts()
         
-        for row in self.data:
-            main_nums = sorted([row[col_idx] for col_idx in self.main_balls_cols])
-            
-            # Consecutive numbers
-            consecutive_count = 0
-            for i in range(len(main_nums) - 1):
-                if main_nums[i+1] - main_nums[i] == 1:
-                    consecutive_count += 1
-            
-            if consecutive_count >= 1:
-                patterns['consecutive_pairs'] += 1
-            if consecutive_count >= 2:
-                patterns['consecutive_triplets'] += 1
-            
-            # Same decade analysis
-            decades = [num // 10 for num in main_nums]
-            if len(set(decades)) <= 3:  # Numbers concentrated in 3 or fewer decades
-                patterns['same_decade'] += 1
-            
-            # Odd/Even analysis
-            odd_count = sum(1 for num in main_nums if num % 2 == 1)
-            if odd_count == 5:
-                patterns['all_odd'] += 1
-            elif odd_count == 0:
-                patterns['all_even'] += 1
-            elif odd_count >= 3:
-                patterns['majority_odd'] += 1
-            else:
-                patterns['majority_even'] += 1
-            
-            # Sum analysis
-            total_sum = sum(main_nums)
-            sum_range = f"{(total_sum // 25) * 25}-{(total_sum // 25) * 25 + 24}"
-            patterns['sum_ranges'][sum_range] += 1
-        
-        total_draws = len(self.data)
+        total_draws = self.state.draws
         print(f"Pattern frequencies out of {total_draws} draws:")
         print(f"  Consecutive pairs: {patterns['consecutive_pairs']} ({patterns['consecutive_pairs']/total_draws*100:.1f}%)")
         print(f"  Consecutive triplets: {patterns['consecutive_triplets']} ({patterns['consecutive_triplets']/total_draws*100:.1f}%)")
@@ -198,81 +167,50 @@ class EuroMillionsAnalyzer:
         print(f"HOT/COLD ANALYSIS (Last {recent_draws} draws)")
         print("="*50)
         
-        recent_data = self.data[-recent_draws:]
-        
-        # Recent frequency for main balls
-        recent_main_balls = []
-        for row in recent_data:
-            for col_idx in self.main_balls_cols:
-                recent_main_balls.append(row[col_idx])
-        
-        recent_main_freq = Counter(recent_main_balls)
+        if recent_draws <= self.state.window:
+            recent_main_freq, recent_lucky_freq = self.state.recent_frequencies(recent_draws)
+        elif self.data is None:
+            raise ValueError(f"Window of {recent_draws} draws exceeds the streaming ring buffer ({self.state.window})")
+        else:
+            # Wider than the state's ring buffer: count the window directly
+            recent_main_freq, recent_lucky_freq = Counter(), Counter()
+            for row in self.data[-recent_draws:]:
+                recent_main_freq.update(row[col_idx] for col_idx in self.main_balls_cols)
+                recent_lucky_freq.update(row[col_idx] for col_idx in self.lucky_stars_cols)
+        total_recent_main = sum(recent_main_freq.values())
+        total_recent_lucky = sum(recent_lucky_freq.values())
         
         print("HOT main balls (most frequent in recent draws):")
         for num, count in recent_main_freq.most_common(10):
-            percentage = (count / len(recent_main_balls)) * 100
+            percentage = (count / total_recent_main) * 100
             print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
         
         print("\nCOLD main balls (least frequent in recent draws):")
-        cold_main = [num for num in range(1, 51) if num not in recent_main_freq]
+        cold_main = [num for num in range(1, self.rules.main_pool + 1) if num not in recent_main_freq]
         if cold_main:
             print(f"  Numbers not drawn: {cold_main}")
         
         if len(recent_main_freq) > 10:
             least_frequent_main = sorted(recent_main_freq.items(), key=lambda x: x[1])[:10]
             for num, count in least_frequent_main:
-                percentage = (count / len(recent_main_balls)) * 100
+                percentage = (count / total_recent_main) * 100
                 print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
         
-        # Recent frequency for lucky stars
-        recent_lucky_stars = []
-        for row in recent_data:
-            for col_idx in self.lucky_stars_cols:
-                recent_lucky_stars.append(row[col_idx])
-        
-        recent_lucky_freq = Counter(recent_lucky_stars)
-        
         print("\nHOT lucky stars:")
         for num, count in recent_lucky_freq.most_common(6):
-            percentage = (count / len(recent_lucky_stars)) * 100
+            percentage = (count / total_recent_lucky) * 100
             print(f"  {num:2d}: {count:2d} times ({percentage:.1f}%)")
         
         print("\nCOLD lucky stars:")
-        cold_lucky = [num for num in range(1, 13) if num not in recent_lucky_freq]
+        cold_lucky = [num for num in range(1, self.rules.star_pool + 1) if num not in recent_lucky_freq]
         if cold_lucky:
             print(f"  Numbers not drawn: {cold_lucky}")
         
         return recent_main_freq, recent_lucky_freq
     
     def weighted_random_choice(self, items, weights, k):
-        """Weighted random sampling without replacement."""
-        selected = []
-        items_copy = items[:]
-        weights_copy = weights[:]
-        
-        for _ in range(k):
-            if not items_copy:
-                break
-                
-            # Normalize weights
-            total_weight = sum(weights_copy)
-            if total_weight == 0:
-                # Fallback to uniform random
-                idx = random.randint(0, len(items_copy) - 1)
-            else:
-                rand_val = random.random() * total_weight
-                cumulative = 0
-                idx = 0
-                for i, weight in enumerate(weights_copy):
-                    cumulative += weight
-                    if rand_val <= cumulative:
-                        idx = i
-                        break
-            
-            selected.append(items_copy.pop(idx))
-            weights_copy.pop(idx)
-        
-        return selected
+        """Weighted random sampling without replacement (Fenwick tree, O(log n) per pick)."""
+        return weighted_sample(items, weights, k)
     
     def generate_predictions(self):
         """Generate predictions using multiple methods."""
@@ -286,98 +224,101 @@ class EuroMillionsAnalyzer:
         patterns = self.pattern_analysis()
         recent_main_freq, recent_lucky_freq = self.hot_cold_analysis()
         
+        main_pool, main_picks = self.rules.main_pool, self.rules.main_picks
+        star_pool, star_picks = self.rules.star_pool, self.rules.star_picks
         predictions = {}
         
         # Method 1: Most frequent numbers
         most_frequent_main = [num for num, _ in main_freq.most_common(10)]
         most_frequent_lucky = [num for num, _ in lucky_freq.most_common(6)]
         predictions['most_frequent'] = {
-            'main': sorted(random.sample(most_frequent_main, 5)),
-            'lucky': sorted(random.sample(most_frequent_lucky, 2))
+            'main': sorted(random.sample(most_frequent_main, main_picks)),
+            'lucky': sorted(random.sample(most_frequent_lucky, star_picks))
         }
         
         # Method 2: Overdue numbers (longest gaps)
         overdue_main = sorted(main_gaps.items(), key=lambda x: x[1], reverse=True)[:10]
         overdue_lucky = sorted(lucky_gaps.items(), key=lambda x: x[1], reverse=True)[:6]
         predictions['overdue'] = {
-            'main': sorted(random.sample([num for num, _ in overdue_main], 5)),
-            'lucky': sorted(random.sample([num for num, _ in overdue_lucky], 2))
+            'main': sorted(random.sample([num for num, _ in overdue_main], main_picks)),
+            'lucky': sorted(random.sample([num for num, _ in overdue_lucky], star_picks))
         }
         
         # Method 3: Hot numbers (recent frequency)
         hot_main = [num for num, _ in recent_main_freq.most_common(10)]
         hot_lucky = [num for num, _ in recent_lucky_freq.most_common(6)]
         # Ensure we have enough numbers
-        if len(hot_main) < 5:
-            hot_main.extend([i for i in range(1, 51) if i not in hot_main])
-        if len(hot_lucky) < 2:
-            hot_lucky.extend([i for i in range(1, 13) if i not in hot_lucky])
+        if len(hot_main) < main_picks:
+            hot_main.extend([i for i in range(1, main_pool + 1) if i not in hot_main])
+        if len(hot_lucky) < star_picks:
+            hot_lucky.extend([i for i in range(1, star_pool + 1) if i not in hot_lucky])
         predictions['hot'] = {
-            'main': sorted(random.sample(hot_main[:15], 5)),
-            'lucky': sorted(random.sample(hot_lucky[:8], 2))
+            'main': sorted(random.sample(hot_main[:15], main_picks)),
+            'lucky': sorted(random.sample(hot_lucky[:8], star_picks))
         }
         
         # Method 4: Balanced approach (mix of frequent and overdue)
         balanced_main_candidates = list(set(most_frequent_main[:7] + [num for num, _ in overdue_main[:7]]))
         balanced_lucky_candidates = list(set(most_frequent_lucky[:4] + [num for num, _ in overdue_lucky[:4]]))
         predictions['balanced'] = {
-            'main': sorted(random.sample(balanced_main_candidates, 5)),
-            'lucky': sorted(random.sample(balanced_lucky_candidates, 2))
+            'main': sorted(random.sample(balanced_main_candidates, main_picks)),
+            'lucky': sorted(random.sample(balanced_lucky_candidates, star_picks))
         }
         
         # Method 5: Pattern-based prediction
         # Aim for typical patterns: mix of odd/even, reasonable sum
         pattern_main = []
         attempts = 0
-        while len(pattern_main) < 5 and attempts < 100:
-            candidate = random.randint(1, 50)
+        while len(pattern_main) < main_picks and attempts < 100:
+            candidate = random.randint(1, main_pool)
             if candidate not in pattern_main:
                 pattern_main.append(candidate)
             attempts += 1
         
-        # Ensure mix of odd/even (aim for 2-3 odd numbers)
+        # Ensure mix of odd/even (aim for 2-3 odd numbers out of five)
+        fewest_odd, most_odd = main_picks // 2, (main_picks + 1) // 2
         odd_count = sum(1 for num in pattern_main if num % 2 == 1)
-        if odd_count < 2:  # Add more odds
+        if odd_count < fewest_odd:  # Add more odds
             for i, num in enumerate(pattern_main):
-                if num % 2 == 0 and odd_count < 3:
-                    new_odd = random.choice([n for n in range(1, 51, 2) if n not in pattern_main])
+                if num % 2 == 0 and odd_count < most_odd:
+                    new_odd = random.choice([n for n in range(1, main_pool + 1, 2) if n not in pattern_main])
                     pattern_main[i] = new_odd
                     odd_count += 1
                     break
-        elif odd_count > 3:  # Add more evens
+        elif odd_count > most_odd:  # Add more evens
             for i, num in enumerate(pattern_main):
-                if num % 2 == 1 and odd_count > 3:
-                    new_even = random.choice([n for n in range(2, 51, 2) if n not in pattern_main])
+                if num % 2 == 1 and odd_count > most_odd:
+                    new_even = random.choice([n for n in range(2, main_pool + 1, 2) if n not in pattern_main])
                     pattern_main[i] = new_even
                     odd_count -= 1
                     break
         
-        pattern_lucky = sorted(random.sample(range(1, 13), 2))
+        pattern_lucky = sorted(random.sample(range(1, star_pool + 1), star_picks))
         predictions['pattern_based'] = {
             'main': sorted(pattern_main),
             'lucky': pattern_lucky
         }
         
         # Method 6: Weighted approach (statistical weights)
-        main_numbers = list(range(1, 51))
+        main_numbers = list(range(1, main_pool + 1))
         main_weights = []
         for num in main_numbers:
-            freq_weight = main_freq.get(num, 0) / len(self.data) * 5
+            freq_weight = main_freq.get(num, 0) / self.state.draws * main_picks
             gap_weight = 1.0 / (main_gaps.get(num, 1) + 1)
             combined_weight = freq_weight * 0.6 + gap_weight * 0.4
             main_weights.append(combined_weight)
         
-        weighted_main = self.weighted_random_choice(main_numbers, main_weights, 5)
+        weighted_main = self.weighted_random_choice(main_numbers, main_weights, main_picks)
         
-        lucky_numbers = list(range(1, 13))
+        lucky_numbers = list(range(1, star_pool + 1))
         lucky_weights = []
         for num in lucky_numbers:
-            freq_weight = lucky_freq.get(num, 0) / len(self.data) * 2
+            freq_weight = lucky_freq.get(num, 0) / self.state.draws * star_picks
             gap_weight = 1.0 / (lucky_gaps.get(num, 1) + 1)
             combined_weight = freq_weight * 0.6 + gap_weight * 0.4
             lucky_weights.append(combined_weight)
         
-        weighted_lucky = self.weighted_random_choice(lucky_numbers, lucky_weights, 2)
+        weighted_lucky = self.weighted_random_choice(lucky_numbers, lucky_weights, star_picks)
         
         predictions['weighted_random'] = {
             'main': sorted(weighted_main),
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo estimate of prize-tier hit rates (EuroMillions or any game in game_rules).
+Simulates uniform future draws in numpy batches and scores the tickets
+each prediction method produces against them with mask AND + popcount.
+Batches are spread over a process pool; every batch gets its own
+SeedSequence child, so a run is reproducible from one seed whatever the
+worker count.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from draw_store import draw_masks, index_masks, load_rows, rules_for, shared_counts
+from game_rules import EUROMILLIONS, GAMES, get_game
+from prediction_methods import METHODS, history_inputs, predict
+
+# EuroMillions prize tiers as (main hits, star hits), best first
+PRIZE_TIERS = EUROMILLIONS.prize_tiers
+
+DEFAULT_SIMULATIONS = 10_000_000
+DEFAULT_CHUNK = 1 << 18
+DEFAULT_TICKETS = 1000
+Z_95 = 1.959963984540054
+
+
+def tier_probabilities(rules=EUROMILLIONS):
+    """Exact probability of each prize tier for one ticket against a uniform draw."""
+    return rules.tier_probabilities()
+
+
+def wilson_interval(hits, trials, z=Z_95):
+    """Return (low, high) Wilson score intervals for hit counts out of trials."""
+    hits = np.asarray(hits, dtype=np.float64)
+    trials = np.maximum(np.asarray(trials, dtype=np.float64), 1)
+    rate = hits / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    spread = z * np.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return np.clip(centre - spread, 0, 1), np.clip(centre + spread, 0, 1)
+
+
+def random_masks(size, pool, picks, rng, dtype='<u8', words=1):
+    """Return size uniform picks-of-pool draws as bitmasks (N x words uint64 when words > 1)."""
+    if picks == 0:
+        return index_masks(np.zeros((size, 0), dtype=np.intp), dtype, words)
+    keys = rng.random((size, pool), dtype=np.float32)
+    chosen = np.argpartition(keys, picks - 1, axis=1)[:, :picks]
+    return index_masks(chosen, dtype, words)
+
+
+def simulate_chunk(seed_seq, size, tickets, rules=EUROMILLIONS):
+    """Simulate size draws and return {method: (main picks + 1) x (star picks + 1) match histogram}.
+
+    tickets maps each method to its (main mask, star mask) arrays; draw i is
+    scored against ticket i % len(masks), so every method faces the same
+    simulated draws.
+    """
+    rng = np.random.default_rng(seed_seq)
+    main_draws = random_masks(size, rules.main_pool, rules.main_picks, rng,
+                              rules.main_mask_dtype, rules.main_mask_words)
+    star_draws = random_masks(size, rules.star_pool, rules.star_picks, rng,
+                              rules.star_mask_dtype, rules.star_mask_words)
+
+    histograms = {}
+    for method, (ticket_main, ticket_star) in tickets.items():
+        which = np.arange(size) % len(ticket_main)
+        main_hits = shared_counts(main_draws, ticket_main[which], rules.main_mask_words).astype(np.intp)
+        star_hits = shared_counts(star_draws, ticket_star[which], rules.star_mask_words).astype(np.intp)
+        cells = np.bincount(main_hits * (rules.star_picks + 1) + star_hits, minlength=rules.hit_cells)
+        histograms[method] = cells.reshape(rules.main_picks + 1, rules.star_picks + 1)
+    return histograms
+
+
+def _simulate_job(job):
+    return simulate_chunk(*job)
+
+
+def run_jobs(jobs, workers=None):
+    """Yield simulate_chunk results for every job, in parallel when worthwhile."""
+    if len(jobs) <= 1 or workers == 1:
+        yield from map(_simulate_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_simulate_job, jobs)
+
+
+def method_tickets(draws, methods, count, seed_seq, hot_window=250, rules=EUROMILLIONS):
+    """Generate count tickets per method from the history, as mask arrays."""
+    rng = np.random.default_rng(seed_seq)
+    inputs = history_inputs(draws, hot_window, count, rules)
+    tickets = {}
+    for method in methods:
+        main, lucky = predict(method, inputs, rng, rules)
+        tickets[method] = draw_masks(np.hstack([main, lucky]), rules)
+    return tickets
+
+
+def simulate(draws, methods=METHODS, simulations=DEFAULT_SIMULATIONS, seed=None, tickets=DEFAULT_TICKETS,
+             chunk_size=DEFAULT_CHUNK, workers=None, hot_window=250, rules=EUROMILLIONS):
+    """Estimate prize-tier hit rates of every method over simulated draws.
+
+    Returns {method: {'simulations', 'histogram', 'tiers'}} where tiers maps
+    each (main, stars) prize tier of the game to {'hits', 'rate', 'low',
+    'high'} with a 95% Wilson interval.
+    """
+    ticket_seed, draw_seed = np.random.SeedSequence(seed).spawn(2)
+    ticket_masks = method_tickets(draws, methods, tickets, ticket_seed, hot_window, rules)
+
+    sizes = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+    jobs = [(child, size, ticket_masks, rules) for child, size in zip(draw_seed.spawn(len(sizes)), sizes)]
+
+    totals = {method: np.zeros((rules.main_picks + 1, rules.star_picks + 1), dtype=np.int64) for method in methods}
+    for histograms in run_jobs(jobs, workers):
+        for method, histogram in histograms.items():
+            totals[method] += histogram
+
+    results = {}
+    for method, histogram in totals.items():
+        hits = np.array([histogram[tier] for tier in rules.prize_tiers], dtype=np.int64)
+        low, high = wilson_interval(hits, simulations)
+        results[method] = {
+            'simulations': simulations,
+            'histogram': histogram,
+            'tiers': {tier: {'hits': int(hits[i]), 'rate': float(hits[i]) / simulations if simulations else 0.0,
+                             'low': float(low[i]), 'high': float(high[i])}
+                      for i, tier in enumerate(rules.prize_tiers)},
+        }
+    return results
+
+
+def print_results(results, rules=EUROMILLIONS):
+    """Print the hit rate and interval of every tier next to the exact odds of a random ticket."""
+    exact = rules.tier_probabilities()
+    for method, result in results.items():
+        print(f"\n🎯 {method.replace('_', ' ').title()} ({result['simulations']:,} simulated draws)")
+        print(f"{'Tier':>6} {'Hits':>10} {'Rate':>12} {'95% CI':>27} {'Exact':>12}")
+        for tier, stats in result['tiers'].items():
+            label = f"{tier[0]}+{tier[1]}"
+            interval = f"[{stats['low']:.3e}, {stats['high']:.3e}]"
+            print(f"{label:>6} {stats['hits']:10d} {stats['rate']:12.3e} {interval:>27} {exact[tier]:12.3e}")
+
+
+def main():
+    """Run the Monte Carlo simulation from the command line."""
+    parser = argparse.ArgumentParser(description="Monte Carlo prize-tier hit rates of the prediction methods")
+    parser.add_argument('data_file', nargs='?', default='lottery_results.csv')
+    parser.add_argument('-n', '--simulations', type=int, default=DEFAULT_SIMULATIONS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--tickets', type=int, default=DEFAULT_TICKETS, help="tickets generated per method")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK)
+    parser.add_argument('--workers', type=int, default=None, help="number of simulation processes")
+    parser.add_argument('--methods', nargs='+', default=list(METHODS), choices=METHODS)
+    parser.add_argument('--game', choices=list(GAMES), help="game of a CSV history (a draw store knows its own)")
+    args = parser.parse_args()
+
+    rules = rules_for(args.data_file, get_game(args.game) if args.game else None)
+    rows = load_rows(args.data_file, rules)
+    draws = np.array([row[1:] for row in rows], dtype=rules.number_dtype)
+    workers = args.workers or os.cpu_count()
+    print(f"🎲 Simulating {args.simulations:,} {rules.name} draws on {workers} worker(s)")
+    results = simulate(draws, args.methods, args.simulations, args.seed, args.tickets,
+                       args.chunk_size, args.workers, rules=rules)
+    print_results(results, rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Lazy, memoized stage DAG.
+A Pipeline holds named stages, each a function of the values of its
+explicit inputs (other stages, or constant inputs such as a window size).
+Nothing runs until a stage is asked for; then it and whichever of its
+ancestors are still missing are computed once and memoized. Stages whose
+inputs are all ready run concurrently on a thread pool (numpy releases
+the GIL in its kernels, and cache reads wait on I/O), and every stage's
+start offset and wall time is recorded for the timing report.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Pipeline:
+    """Named stages with explicit inputs, computed lazily and at most once."""
+
+    def __init__(self, workers=None):
+        self.workers = workers  # thread pool size; 1 runs every stage inline
+        self.stages = {}  # name -> (func, inputs)
+        self.values = {}
+        self.timings = {}  # name -> (start offset, seconds)
+        self._started = None
+
+    def add(self, name, func, inputs=()):
+        """Declare a stage computed as func(*input values).
+
+        Inputs must already be declared, so the stages always form a DAG.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage {name!r} is already declared")
+        missing = [dep for dep in inputs if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name!r} has undeclared inputs: {', '.join(missing)}")
+        self.stages[name] = (func, tuple(inputs))
+
+    def value(self, name, value):
+        """Declare a constant input."""
+        self.add(name, None)
+        self.values[name] = value
+
+    def _needed(self, names):
+        """Every stage among names and their ancestors that has no value yet."""
+        needed, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage {name!r}")
+            if name in needed or name in self.values:
+                continue
+            needed.add(name)
+            stack.extend(self.stages[name][1])
+        return needed
+
+    def _run(self, name):
+        func, inputs = self.stages[name]
+        start = time.perf_counter()
+        value = func(*(self.values[dep] for dep in inputs))
+        return value, start - self._started, time.perf_counter() - start
+
+    def compute(self, *names):
+        """Compute the named stages (and missing ancestors); returns {name: value}.
+
+        Ready stages are submitted together, so independent branches of the
+        DAG overlap. A failing stage raises once the running ones finish.
+        """
+        pending = self._needed(names)
+        if self._started is None:
+            self._started = time.perf_counter()
+
+        def ready():
+            return [name for name in pending
+                    if all(dep in self.values for dep in self.stages[name][1])]
+
+        if self.workers == 1:
+            while pending:
+                for name in ready():
+                    self._store(name, self._run(name))
+                    pending.discard(name)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                running = {}
+                while pending or running:
+                    for name in ready():
+                        running[pool.submit(self._run, name)] = name
+                        pending.discard(name)
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._store(running.pop(future), future.result())
+        return {name: self.values[name] for name in names}
+
+    def _store(self, name, outcome):
+        self.values[name], start, seconds = outcome
+        self.timings[name] = (start, seconds)
+
+    def get(self, name):
+        """Return one stage's value, computing it on first access."""
+        if name not in self.values:
+            self.compute(name)
+        return self.values[name]
+
+    def render_timings(self):
+        """Text of the per-stage timing report, in start order."""
+        lines = ["⏱️  Stage timings:", f"  {'Stage':24} {'Start':>10} {'Time':>10}"]
+        order = sorted(self.timings.items(), key=lambda item: item[1][0])
+        for name, (start, seconds) in order:
+            lines.append(f"  {name:24} {start * 1000:8.1f}ms {seconds * 1000:8.1f}ms")
+        if order:
+            wall = max(start + seconds for start, seconds in self.timings.values())
+            busy = sum(seconds for _, seconds in self.timings.values())
+            lines.append(f"  {'Total':24} {'':10} {wall * 1000:8.1f}ms wall, {busy * 1000:.1f}ms in stages")
+        return "\n".join(lines)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Vectorized versions of the analyzers' prediction methods.
+Every method takes a batch of inputs (one row per history snapshot) and
+returns one ticket per row, so the backtester can score thousands of
+snapshots with a handful of array operations. The selection rules mirror
+generate_predictions in lottery_analyzer_simple.py (plus ml_weighted from
+lottery_analyzer.py); ties in the top-k lists are broken by the lower
+number instead of the Counter insertion order. Pools and picks come from
+the game rules, so every game shares these kernels.
+"""
+
+from backend import numpy as np  # lazy: importing the analyzers must not load numpy
+
+from game_rules import EUROMILLIONS
+
+METHODS = ('most_frequent', 'overdue', 'hot', 'balanced', 'pattern_based', 'weighted_random', 'ml_weighted')
+
+
+def top_k(scores, k):
+    """Return the 0-based indices of the k highest scores per row (ties: lower index first)."""
+    return np.argsort(-np.asarray(scores, dtype=np.float64), axis=1, kind='stable')[:, :k]
+
+
+def sample_columns(candidates, picks, rng):
+    """Uniformly sample picks distinct entries from each row of a candidate matrix."""
+    keys = rng.random(candidates.shape)
+    chosen = np.argsort(keys, axis=1)[:, :picks]
+    return np.take_along_axis(candidates, chosen, axis=1)
+
+
+def sample_from_mask(mask, picks, rng):
+    """Uniformly sample picks distinct 0-based indices from the True entries of each row."""
+    keys = rng.random(mask.shape)
+    keys[~mask] = 2.0  # never chosen while a True entry is left
+    return np.argsort(keys, axis=1)[:, :picks]
+
+
+def gumbel_top_k(weights, picks, rng):
+    """Sample picks indices per row without replacement, proportional to weights.
+
+    Adding Gumbel noise to log-weights and keeping the top k is exactly
+    sequential weighted sampling without replacement. Zero weights are only
+    chosen once every positive weight is used up.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        keys = np.log(weights)
+    keys = keys + rng.gumbel(size=weights.shape)
+    keys[np.isneginf(keys) | np.isnan(keys)] = -np.inf
+    return np.argsort(-keys, axis=1, kind='stable')[:, :picks]
+
+
+def _to_ticket(main_idx, lucky_idx, rules):
+    """Convert 0-based index matrices to sorted ticket numbers in the rules' number dtype."""
+    main = np.sort(main_idx, axis=1).astype(rules.number_dtype) + 1
+    lucky = np.sort(lucky_idx, axis=1).astype(rules.number_dtype) + 1
+    return main, lucky
+
+
+def most_frequent(inputs, rng, rules):
+    """Main picks of the ten most frequent main balls, star picks of the four most frequent stars."""
+    main = sample_columns(top_k(inputs['main_freq'], 10), rules.main_picks, rng)
+    lucky = sample_columns(top_k(inputs['lucky_freq'], 4), rules.star_picks, rng)
+    return _to_ticket(main, lucky, rules)
+
+
+def overdue(inputs, rng, rules):
+    """Main picks of the ten longest current gaps, star picks of the four longest star gaps."""
+    main = sample_columns(top_k(inputs['main_gaps'], 10), rules.main_picks, rng)
+    lucky = sample_columns(top_k(inputs['lucky_gaps'], 4), rules.star_picks, rng)
+    return _to_ticket(main, lucky, rules)
+
+
+def hot(inputs, rng, rules):
+    """Main picks of the ten most frequent main balls in the recent window."""
+    main = sample_columns(top_k(inputs['main_hot'], 10), rules.main_picks, rng)
+    lucky = sample_columns(top_k(inputs['lucky_hot'], 4), rules.star_picks, rng)
+    return _to_ticket(main, lucky, rules)
+
+
+def _union_mask(first, second, pool):
+    mask = np.zeros((len(first), pool), dtype=bool)
+    rows = np.arange(len(first))[:, None]
+    mask[rows, first] = True
+    mask[rows, second] = True
+    return mask
+
+
+def balanced(inputs, rng, rules):
+    """Sample from the union of the top frequent and top overdue numbers."""
+    main_mask = _union_mask(top_k(inputs['main_freq'], 7), top_k(inputs['main_gaps'], 7), rules.main_pool)
+    lucky_mask = _union_mask(top_k(inputs['lucky_freq'], 3), top_k(inputs['lucky_gaps'], 3), rules.star_pool)
+    return _to_ticket(sample_from_mask(main_mask, rules.main_picks, rng),
+                      sample_from_mask(lucky_mask, rules.star_picks, rng), rules)
+
+
+def pattern_based(inputs, rng, rules):
+    """Uniform random line, then odd/even rebalanced like the analyzers do.
+
+    With five picks, lines with fewer than two odd numbers get evens swapped
+    for unused odds until three are odd; lines with more than three odd
+    numbers get odds swapped for unused evens until three are odd. Other
+    pick counts use picks // 2 and (picks + 1) // 2 as the bounds.
+    """
+    rows = len(inputs['main_freq'])
+    picks = rules.main_picks
+    fewest_odd, most_odd = picks // 2, (picks + 1) // 2
+    slots = max(most_odd, picks - most_odd)
+    main = sample_from_mask(np.ones((rows, rules.main_pool), dtype=bool), picks, rng)
+    is_odd = main % 2 == 0  # 0-based index i is number i + 1
+    odd_count = is_odd.sum(axis=1)
+
+    for fix_odd in (True, False):
+        needs_fix = odd_count < fewest_odd if fix_odd else odd_count > most_odd
+        if not needs_fix.any():
+            continue
+        fix_rows = np.flatnonzero(needs_fix)
+        swaps = np.abs(most_odd - odd_count[fix_rows])
+
+        # Replacement pool: numbers of the wanted parity not already in the line
+        first_index = 0 if fix_odd else 1  # index 0 is number 1 (odd)
+        wanted = np.zeros((len(fix_rows), rules.main_pool), dtype=bool)
+        wanted[:, first_index::2] = True
+        np.put_along_axis(wanted, main[fix_rows], False, axis=1)
+        replacements = sample_from_mask(wanted, slots, rng)
+
+        # Replace the first positions holding the unwanted parity, in line order
+        unwanted = ~is_odd[fix_rows] if fix_odd else is_odd[fix_rows]
+        order = np.argsort(~unwanted, axis=1, kind='stable')
+        for slot in range(slots):
+            active = swaps > slot
+            target = order[active, slot]
+            main[fix_rows[active], target] = replacements[active, slot]
+
+    lucky = sample_from_mask(np.ones((rows, rules.star_pool), dtype=bool), rules.star_picks, rng)
+    return _to_ticket(main, lucky, rules)
+
+
+def weighted_random(inputs, rng, rules):
+    """Weighted sampling from 0.6 x scaled frequency + 0.4 x 1/(gap + 1)."""
+    draws = np.maximum(np.asarray(inputs['draws'], dtype=np.float64), 1)[:, None]
+    main_weights = (inputs['main_freq'] / draws * rules.main_picks) * 0.6 + 1.0 / (inputs['main_gaps'] + 1) * 0.4
+    lucky_weights = (inputs['lucky_freq'] / draws * rules.star_picks) * 0.6 + 1.0 / (inputs['lucky_gaps'] + 1) * 0.4
+    return _to_ticket(gumbel_top_k(main_weights, rules.main_picks, rng),
+                      gumbel_top_k(lucky_weights, rules.star_picks, rng), rules)
+
+
+def ml_weighted(inputs, rng, rules):
+    """Weighted sampling from 0.7 x raw frequency + 0.3 x 1/(gap + 1)."""
+    main_weights = inputs['main_freq'] * 0.7 + 1.0 / (inputs['main_gaps'] + 1) * 0.3
+    lucky_weights = inputs['lucky_freq'] * 0.7 + 1.0 / (inputs['lucky_gaps'] + 1) * 0.3
+    return _to_ticket(gumbel_top_k(main_weights, rules.main_picks, rng),
+                      gumbel_top_k(lucky_weights, rules.star_picks, rng), rules)
+
+
+PREDICTORS = {
+    'most_frequent': most_frequent,
+    'overdue': overdue,
+    'hot': hot,
+    'balanced': balanced,
+    'pattern_based': pattern_based,
+    'weighted_random': weighted_random,
+    'ml_weighted': ml_weighted,
+}
+
+
+def history_inputs(draws, hot_window=250, rows=1, rules=EUROMILLIONS):
+    """Build method inputs from a whole N x width draw matrix, repeated over rows.
+
+    Every row is the same snapshot (the history up to the latest draw), so
+    predict() returns rows independent tickets from it.
+    """
+    draws = np.asarray(draws)
+    total_draws = len(draws)
+    recent = draws[max(total_draws - hot_window, 0):]
+
+    def counts(block, pool):
+        return np.bincount(block.ravel().astype(np.intp), minlength=pool + 1)[1:]
+
+    def gaps(block, pool):
+        last_seen = np.full(pool, -1, dtype=np.int64)
+        positions = np.broadcast_to(np.arange(total_draws)[:, None], block.shape)
+        np.maximum.at(last_seen, block.ravel().astype(np.intp) - 1, positions.ravel())
+        return (total_draws - 1) - last_seen
+
+    picks = rules.main_picks
+    snapshot = {
+        'main_freq': counts(draws[:, :picks], rules.main_pool),
+        'lucky_freq': counts(draws[:, picks:], rules.star_pool),
+        'main_gaps': gaps(draws[:, :picks], rules.main_pool),
+        'lucky_gaps': gaps(draws[:, picks:], rules.star_pool),
+        'main_hot': counts(recent[:, :picks], rules.main_pool),
+        'lucky_hot': counts(recent[:, picks:], rules.star_pool),
+    }
+    inputs = {key: np.broadcast_to(value, (rows, len(value))) for key, value in snapshot.items()}
+    inputs['draws'] = np.full(rows, total_draws)
+    return inputs
+
+
+def predict(method, inputs, rng, rules=EUROMILLIONS):
+    """Return (main, lucky) ticket matrices, one row per input snapshot."""
+    try:
+        predictor = PREDICTORS[method]
+    except KeyError:
+        raise ValueError(f"Unknown prediction method: {method}")
+    return predictor(inputs, rng, rules)
+
+
+def generate_tickets(draws, method, k, seed=None, hot_window=250, rules=EUROMILLIONS):
+    """Return (k x main picks, k x star picks) arrays of k tickets for a method from the history.
+
+    Every ticket is valid (distinct sorted numbers) and the result depends
+    only on the history and seed, so the same seed gives the same tickets in
+    any process.
+    """
+    if method not in PREDICTORS:
+        raise ValueError(f"Unknown prediction method: {method}")
+    rng = np.random.default_rng(seed)
+    return predict(method, history_inputs(draws, hot_window, k, rules), rng, rules)
@@ -3,21 +3,21 @@
 Euro Millions Lottery Analyzer and Predictor - Quick Version
 """
 
-import csv
 import random
 from collections import Counter
 
-def analyze_lottery():
+from draw_store import load_rows, rules_for
+
+def analyze_lottery(data_file='lottery_results.csv', rules=None):
     print("🎰 Euro Millions Lottery Analyzer")
     print("=" * 50)
     
-    # Read lottery data
-    data = []
-    with open('lottery_results.csv', 'r') as f:
-        reader = csv.reader(f)
-        headers = next(reader)  # Skip header
-        for row in reader:
-            data.append([row[0]] + [int(x) for x in row[1:8]])
+    # Read lottery data (CSV file or binary draw store) and its game rules
+    rules = rules_for(data_file, rules)
+    main_pool, main_picks = rules.main_pool, rules.main_picks
+    star_pool, star_picks = rules.star_pool, rules.star_picks
+    split = main_picks + 1
+    data = load_rows(data_file, rules)
     
     print(f"✓ Loaded {len(data)} lottery draws")
     print(f"✓ Date range: {data[0][0]} to {data[-1][0]}")
@@ -27,8 +27,8 @@ def analyze_lottery():
     all_lucky_stars = []
     
     for row in data:
-        all_main_balls.extend(row[1:6])  # Ball 1-5
-        all_lucky_stars.extend(row[6:8])  # Lucky Star 1-2
+        all_main_balls.extend(row[1:split])  # Main balls
+        all_lucky_stars.extend(row[split:])  # Lucky stars
     
     # Frequency analysis
     main_freq = Counter(all_main_balls)
@@ -45,13 +45,13 @@ def analyze_lottery():
         print(f"  {num:2d}: {count} times ({count/len(all_lucky_stars)*100:.1f}%)")
     
     # Gap analysis (overdue numbers)
-    main_last_seen = {i: -1 for i in range(1, 51)}
-    lucky_last_seen = {i: -1 for i in range(1, 13)}
+    main_last_seen = {i: -1 for i in range(1, main_pool + 1)}
+    lucky_last_seen = {i: -1 for i in range(1, star_pool + 1)}
     
     for draw_idx, row in enumerate(data):
-        for num in row[1:6]:  # Main balls
+        for num in row[1:split]:  # Main balls
             main_last_seen[num] = draw_idx
-        for num in row[6:8]:  # Lucky stars
+        for num in row[split:]:  # Lucky stars
             lucky_last_seen[num] = draw_idx
     
     current_draw = len(data) - 1
@@ -76,8 +76,8 @@ def analyze_lottery():
     recent_lucky = []
     
     for row in recent_data:
-        recent_main.extend(row[1:6])
-        recent_lucky.extend(row[6:8])
+        recent_main.extend(row[1:split])
+        recent_lucky.extend(row[split:])
     
     recent_main_freq = Counter(recent_main)
     recent_lucky_freq = Counter(recent_lucky)
@@ -99,39 +99,39 @@ def analyze_lottery():
     # Method 1: Most frequent
     frequent_main = [num for num, _ in main_freq.most_common(10)]
     frequent_lucky = [num for num, _ in lucky_freq.most_common(6)]
-    pred1_main = sorted(random.sample(frequent_main, 5))
-    pred1_lucky = sorted(random.sample(frequent_lucky, 2))
+    pred1_main = sorted(random.sample(frequent_main, main_picks))
+    pred1_lucky = sorted(random.sample(frequent_lucky, star_picks))
     
     # Method 2: Overdue numbers
     overdue_main = [num for num, _ in sorted_main_gaps[:10]]
     overdue_lucky = [num for num, _ in sorted_lucky_gaps[:6]]
-    pred2_main = sorted(random.sample(overdue_main, 5))
-    pred2_lucky = sorted(random.sample(overdue_lucky, 2))
+    pred2_main = sorted(random.sample(overdue_main, main_picks))
+    pred2_lucky = sorted(random.sample(overdue_lucky, star_picks))
     
     # Method 3: Hot numbers
     hot_main = [num for num, _ in recent_main_freq.most_common(10)]
     hot_lucky = [num for num, _ in recent_lucky_freq.most_common(6)]
-    if len(hot_main) < 5:
-        hot_main.extend([i for i in range(1, 51) if i not in hot_main])
-    if len(hot_lucky) < 2:
-        hot_lucky.extend([i for i in range(1, 13) if i not in hot_lucky])
-    pred3_main = sorted(random.sample(hot_main[:15], 5))
-    pred3_lucky = sorted(random.sample(hot_lucky[:8], 2))
+    if len(hot_main) < main_picks:
+        hot_main.extend([i for i in range(1, main_pool + 1) if i not in hot_main])
+    if len(hot_lucky) < star_picks:
+        hot_lucky.extend([i for i in range(1, star_pool + 1) if i not in hot_lucky])
+    pred3_main = sorted(random.sample(hot_main[:15], main_picks))
+    pred3_lucky = sorted(random.sample(hot_lucky[:8], star_picks))
     
     # Method 4: Balanced (mix of frequent and overdue)
     balanced_main = list(set(frequent_main[:7] + overdue_main[:7]))
     balanced_lucky = list(set(frequent_lucky[:4] + overdue_lucky[:4]))
-    pred4_main = sorted(random.sample(balanced_main, 5))
-    pred4_lucky = sorted(random.sample(balanced_lucky, 2))
+    pred4_main = sorted(random.sample(balanced_main, main_picks))
+    pred4_lucky = sorted(random.sample(balanced_lucky, star_picks))
     
     # Method 5: Random with constraints
     pred5_main = []
-    while len(pred5_main) < 5:
-        num = random.randint(1, 50)
+    while len(pred5_main) < main_picks:
+        num = random.randint(1, main_pool)
         if num not in pred5_main:
             pred5_main.append(num)
     pred5_main.sort()
-    pred5_lucky = sorted(random.sample(range(1, 13), 2))
+    pred5_lucky = sorted(random.sample(range(1, star_pool + 1), star_picks))
     
     # Display predictions
     predictions = [
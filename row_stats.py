@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Stdlib versions of the draw_stats kernels for small histories.
+Below backend.NUMPY_MIN_ROWS draws, importing numpy costs more than the
+whole analysis, so the analyzers run these loops over plain rows instead.
+Each function returns the same structures as its draw_stats counterpart
+(lists where that returns arrays), with Counters in the same column-major
+first-seen order, so the reports are identical whichever path ran.
+"""
+
+import math
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from itertools import combinations
+from operator import sub
+
+from analysis_state import empty_patterns, tally_pattern
+
+
+def column_counter(rows, start, stop):
+    """Counter of columns start..stop-1 of the rows, read column by column."""
+    return Counter(row[column] for column in range(start, stop) for row in rows)
+
+
+def _percentile(sorted_values, q):
+    # Same linear interpolation as draw_stats._histogram_percentile
+    position = q * (len(sorted_values) - 1)
+    low = float(sorted_values[math.floor(position)])
+    high = float(sorted_values[math.ceil(position)])
+    return low + (high - low) * (position - math.floor(position))
+
+
+def gap_distribution(rows, start, stop, pool):
+    """Gap summary of the numbers in columns start..stop-1, like draw_stats.gap_distribution (None for NaN)."""
+    positions = [[] for _ in range(pool)]
+    for position, row in enumerate(rows):
+        for column in range(start, stop):
+            positions[row[column] - 1].append(position)
+
+    total_draws = len(rows)
+    distribution = {key: [] for key in ('mean', 'median', 'p90', 'max', 'current', 'count')}
+    for seen in positions:
+        gaps = sorted(later - earlier for earlier, later in zip(seen, seen[1:]))
+        distribution['current'].append((total_draws - 1) - (seen[-1] if seen else -1))
+        distribution['count'].append(len(gaps))
+        if gaps:
+            distribution['mean'].append(sum(gaps) / len(gaps))
+            distribution['median'].append(_percentile(gaps, 0.5))
+            distribution['p90'].append(_percentile(gaps, 0.9))
+            distribution['max'].append(gaps[-1])
+        else:
+            for key in ('mean', 'median', 'p90'):
+                distribution[key].append(None)
+            distribution['max'].append(0)
+    return distribution
+
+
+def pattern_tally(rows, main_picks=5, sum_width=25):
+    """Pattern tally of the rows' main balls, like draw_stats.pattern_tally."""
+    patterns = empty_patterns()
+    for row in rows:
+        tally_pattern(patterns, row[:main_picks], main_picks, sum_width)
+    by_bucket = sorted(patterns['sum_ranges'].items(), key=lambda item: int(item[0].split('-')[0]))
+    patterns['sum_ranges'] = defaultdict(int, by_bucket)
+    return patterns
+
+
+def _histogram(values, minlength):
+    # np.bincount(values, minlength=minlength) as a list
+    counts = [0] * max([minlength] + [value + 1 for value in values])
+    for value in values:
+        counts[value] += 1
+    return counts
+
+
+def pattern_metrics(rows, main_picks=5, main_pool=50):
+    """Span, widest gap and low-half histograms of the main balls, like draw_stats.pattern_metrics."""
+    spans, max_gaps, low_counts = [], [], []
+    half = main_pool // 2
+    for row in rows:
+        main = sorted(row[:main_picks])
+        spans.append(main[-1] - main[0])
+        max_gaps.append(max(map(sub, main[1:], main)))
+        low_counts.append(bisect_right(main, half))
+    return {
+        'span': _histogram(spans, main_pool),
+        'max_gap': _histogram(max_gaps, main_pool),
+        'low_count': _histogram(low_counts, main_picks + 1),
+        'mean_span': sum(spans) / len(spans) if spans else float('nan'),
+        'mean_max_gap': sum(max_gaps) / len(max_gaps) if max_gaps else float('nan'),
+    }
+
+
+def window_frequencies(rows, recent_draws, main_picks=5):
+    """Return (main, lucky) Counters over the last recent_draws rows, like draw_stats.window_frequencies."""
+    recent = rows[len(rows) - min(max(recent_draws, 0), len(rows)):]
+    width = len(rows[0]) if rows else main_picks
+    return column_counter(recent, 0, main_picks), column_counter(recent, main_picks, width)
+
+
+def _top(counts, keys, k):
+    # Stable sort over keys in ascending order: ties go to the lower numbers
+    return sorted(((key, counts[key]) for key in keys), key=lambda item: -item[1])[:k]
+
+
+def top_cooccurrences(rows, k=10, main_picks=5, main_pool=50, star_pool=12):
+    """The k most frequent main pairs, main triples, star pairs and main x star pairs.
+
+    Returns {'main_pairs', 'triples', 'star_pairs', 'cross'} lists of
+    (numbers, count), ranked like draw_stats.CoOccurrence's top_pairs and
+    top_triples.
+    """
+    main_pairs, triples, star_pairs, cross = Counter(), Counter(), Counter(), Counter()
+    for row in rows:
+        main, stars = sorted(row[:main_picks]), sorted(row[main_picks:])
+        main_pairs.update(combinations(main, 2))
+        triples.update(combinations(main, 3))
+        star_pairs.update(combinations(stars, 2))
+        cross.update((num, star) for num in main for star in stars)
+    return {
+        'main_pairs': _top(main_pairs, combinations(range(1, main_pool + 1), 2), k),
+        'triples': _top(triples, sorted(triples), k),
+        'star_pairs': _top(star_pairs, combinations(range(1, star_pool + 1), 2), k),
+        'cross': _top(cross, ((num, star) for num in range(1, main_pool + 1) for star in range(1, star_pool + 1)), k),
+    }
+
+
+def summarize_rows(rows, main_picks=5, main_pool=50, star_pool=12):
+    """Every aggregate the analyzers report, like draw_stats.summarize_draws, from number rows."""
+    width = len(rows[0]) if rows else main_picks
+    return {
+        'draws': len(rows),
+        'main_freq': column_counter(rows, 0, main_picks),
+        'lucky_freq': column_counter(rows, main_picks, width),
+        'main_gaps': gap_distribution(rows, 0, main_picks, main_pool),
+        'lucky_gaps': gap_distribution(rows, main_picks, width, star_pool),
+        'patterns': pattern_tally(rows, main_picks),
+        'pattern_metrics': pattern_metrics(rows, main_picks, main_pool),
+    }
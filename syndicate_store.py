@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Syndicate ticket store.
+Tickets are kept as ticket keys (see ticket_index.py) in a flat
+little-endian array after a 32-byte header that records the game's pools,
+so tens of millions of lines fit in a few hundred MB and open instantly
+with np.memmap. Keys are the narrowest unsigned type the game allows
+(4 bytes for EuroMillions). A line's id is its position in the store.
+
+Checking a draw needs no unranking: the key splits into a line rank and a
+star rank, each looked up in a small hit table, and the prize tier of
+every line comes from one more lookup.
+"""
+
+import argparse
+import csv
+import os
+import struct
+
+import numpy as np
+
+from draw_store import load_rows
+from game_rules import EUROMILLIONS, GAMES, GameRules, count_dtype, get_game
+from ticket_index import RankBitset, combination_hits, key_dtype, star_count, ticket_ranks, ticket_unranks
+
+STORE_FILE = 'syndicate.tks'
+MAGIC = b'LTKT'
+VERSION = 2
+
+# magic, version, header size, line count, main pool, main picks, star pool, star picks
+HEADER_STRUCT = struct.Struct('<4sHHQHHHH')
+HEADER_SIZE = 32
+
+IMPORT_CHUNK = 1 << 20
+CHECK_CHUNK = 1 << 23
+
+# Longest digit string parsed; anything longer is out of every pool and can't overflow int64
+MAX_DIGITS = 18
+
+
+def tier_table(rules=EUROMILLIONS):
+    """Return the uint8 table whose [main hits, star hits] is the prize tier (1 = best), 0 = no prize."""
+    table = np.zeros((rules.main_picks + 1, rules.star_picks + 1), dtype=np.uint8)
+    for tier_number, (tier_main, tier_star) in enumerate(rules.prize_tiers, 1):
+        table[tier_main, tier_star] = tier_number
+    return table
+
+
+def _read_header(f):
+    """Return (line count, rules) from a store header."""
+    header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_STRUCT.size:
+        raise ValueError("Not a syndicate ticket store")
+    magic, version, header_size, count, *pools = HEADER_STRUCT.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError("Not a syndicate ticket store")
+    if version != VERSION or header_size != HEADER_SIZE:
+        raise ValueError(f"Unsupported ticket store version {version}")
+    return count, GameRules.for_pools(*pools)
+
+
+def _pack_header(count, rules):
+    return HEADER_STRUCT.pack(MAGIC, VERSION, HEADER_SIZE, count, *rules.pools).ljust(HEADER_SIZE, b'\0')
+
+
+def create_store(path, rules=EUROMILLIONS):
+    """Create an empty store for the rules' game."""
+    with open(path, 'wb') as f:
+        f.write(_pack_header(0, rules))
+
+
+def _column_values(fields):
+    """Parse an array of stripped strings as ASCII decimals; returns (values, ok).
+
+    Works on the code points of the whole array at once: ok is False for any
+    field that is empty, has a non-digit or is longer than MAX_DIGITS, and
+    values of those fields are left meaningless rather than overflowing.
+    """
+    lengths = np.char.str_len(fields)
+    codes = fields.view(np.uint32).reshape(fields.shape + (fields.itemsize // 4,))
+    digits = codes - np.uint32(ord('0'))
+    padding = np.arange(codes.shape[-1]) >= lengths[..., None]
+    ok = ((digits < 10) | padding).all(axis=-1) & (lengths >= 1) & (lengths <= MAX_DIGITS)
+    values = np.zeros(fields.shape, dtype=np.int64)
+    for position in range(min(codes.shape[-1], MAX_DIGITS)):
+        values = np.where(padding[..., position], values, values * 10 + digits[..., position])
+    return values, ok
+
+
+def parse_ticket_rows(rows, rules=EUROMILLIONS):
+    """Validate a list of string rows and return (keys, rejected).
+
+    keys are the ticket keys of the valid rows in order; rejected is the
+    number of rows that were not main_picks distinct balls in the main pool
+    followed by star_picks distinct stars in the star pool. The chunk is
+    parsed as one string matrix, and every field is checked to be a short
+    digit string before its value is used.
+    """
+    width = rules.width
+    # Tolerate blank fields (trailing commas) by dropping them, as long as width remain
+    rows = [row if len(row) == width else [field for field in row if field.strip()] for row in rows]
+    fields = np.char.strip(np.array([row for row in rows if len(row) == width], dtype=str).reshape(-1, width))
+    numbers, digits = _column_values(fields)
+
+    main = np.sort(numbers[:, :rules.main_picks], axis=1)
+    stars = np.sort(numbers[:, rules.main_picks:], axis=1)
+    ok = digits.all(axis=1)
+    ok &= (main[:, 0] >= 1) & (main[:, -1] <= rules.main_pool) & (np.diff(main, axis=1) > 0).all(axis=1)
+    if rules.star_picks:
+        ok &= (stars[:, 0] >= 1) & (stars[:, -1] <= rules.star_pool) & (np.diff(stars, axis=1) > 0).all(axis=1)
+    keys = ticket_ranks(np.hstack([main, stars])[ok], rules)
+    return keys, len(rows) - int(ok.sum())
+
+
+class SyndicateStore:
+    """Memory-mapped array of ticket keys with bulk import and draw checking."""
+
+    def __init__(self, path=STORE_FILE, rules=None):
+        """Open a store, creating it for rules (EuroMillions by default) if it does not exist."""
+        self.path = path
+        if not os.path.exists(path):
+            create_store(path, rules or EUROMILLIONS)
+        self._open()
+        if rules is not None and rules.pools != self.rules.pools:
+            raise ValueError(f"{path} holds {self.rules.name} tickets, not {rules.name}")
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self.count, self.rules = _read_header(f)
+        self.key_dtype = np.dtype(key_dtype(self.rules))
+        if self.count:
+            self.keys = np.memmap(self.path, dtype=self.key_dtype, mode='r', offset=HEADER_SIZE, shape=(self.count,))
+        else:
+            self.keys = np.zeros(0, dtype=self.key_dtype)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Release the memory map."""
+        self.keys = None
+
+    def ticket(self, line_id):
+        """Return (main, lucky) lists for one line id."""
+        main, lucky = ticket_unranks(self.keys[line_id:line_id + 1], self.rules)
+        return main[0].tolist(), lucky[0].tolist()
+
+    def _existing_bitset(self):
+        bitset = RankBitset.for_tickets(self.rules)
+        for start in range(0, self.count, CHECK_CHUNK):
+            bitset.update(np.asarray(self.keys[start:start + CHECK_CHUNK]))
+        return bitset
+
+    def append_keys(self, keys, seen=None):
+        """Append keys not already stored; returns (added, duplicates)."""
+        seen = self._existing_bitset() if seen is None else seen
+        keys = np.asarray(keys, dtype=np.int64)
+        # First occurrence of each key in the batch, in input order
+        _, first = np.unique(keys, return_index=True)
+        unique = keys[np.sort(first)]
+        view = np.frombuffer(seen.bits, dtype=np.uint8)
+        stored = (view[unique >> 3] >> (unique & 7).astype(np.uint8)) & 1
+        new_keys = unique[stored == 0]
+        seen.update(new_keys)
+
+        if len(new_keys):
+            self.close()
+            with open(self.path, 'r+b') as f:
+                count, _ = _read_header(f)
+                f.seek(HEADER_SIZE + count * self.key_dtype.itemsize)
+                f.write(new_keys.astype(self.key_dtype).tobytes())
+                f.flush()
+                f.seek(0)
+                f.write(_pack_header(count + len(new_keys), self.rules))
+            self._open()
+        return len(new_keys), len(keys) - len(new_keys)
+
+    def import_csv(self, csv_file, chunk_size=IMPORT_CHUNK):
+        """Stream tickets from a CSV (main balls then stars per line) into the store.
+
+        Returns {'added', 'duplicates', 'rejected'}. A header line counts as
+        rejected.
+        """
+        seen = self._existing_bitset()
+        totals = {'added': 0, 'duplicates': 0, 'rejected': 0}
+        with open(csv_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            while True:
+                rows = [row for _, row in zip(range(chunk_size), reader)]
+                if not rows:
+                    break
+                keys, rejected = parse_ticket_rows(rows, self.rules)
+                added, duplicates = self.append_keys(keys, seen)
+                totals['added'] += added
+                totals['duplicates'] += duplicates
+                totals['rejected'] += rejected
+        return totals
+
+    def check(self, main, lucky):
+        """Return the uint8 prize tier of every line for one draw (0 = no prize)."""
+        rules = self.rules
+        # Hits of every possible line and star set against this draw, by rank
+        cell_dtype = count_dtype(rules.hit_cells)
+        line_cells = combination_hits(rules.main_pool, rules.main_picks, main).astype(cell_dtype)
+        line_cells *= np.dtype(cell_dtype).type(rules.star_picks + 1)
+        star_hits = combination_hits(rules.star_pool, rules.star_picks, lucky).astype(cell_dtype)
+        tier_of = tier_table(rules).ravel()
+
+        tiers = np.empty(self.count, dtype=np.uint8)
+        stars = self.key_dtype.type(star_count(rules))
+        for start in range(0, self.count, CHECK_CHUNK):
+            keys = np.asarray(self.keys[start:start + CHECK_CHUNK], dtype=self.key_dtype)
+            line_rank = keys // stars
+            star_rank = keys - line_rank * stars
+            cells = line_cells[line_rank]
+            cells += star_hits[star_rank]
+            tiers[start:start + len(keys)] = tier_of[cells]
+        return tiers
+
+
+def tier_summary(tiers, rules=EUROMILLIONS):
+    """Return ({(main, stars): line count}, winning line ids) for check() output."""
+    counts = np.bincount(tiers, minlength=len(rules.prize_tiers) + 1)
+    return ({tier: int(counts[i]) for i, tier in enumerate(rules.prize_tiers, 1)},
+            np.flatnonzero(tiers))
+
+
+def main():
+    """Import tickets into a store or check a store against a draw."""
+    parser = argparse.ArgumentParser(description="Syndicate ticket store")
+    parser.add_argument('--store', default=STORE_FILE)
+    parser.add_argument('--game', choices=list(GAMES), help="game of a new store (an existing store knows its own)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help="import tickets from a CSV")
+    importer.add_argument('csv_file')
+    checker = commands.add_parser('check', help="check every line against a draw")
+    checker.add_argument('data_file', nargs='?', default='lottery_results.csv',
+                         help="the latest draw in this file is checked")
+    checker.add_argument('--draw', nargs='+', type=int, metavar='N', help="check these main balls then stars instead")
+    checker.add_argument('--show', type=int, default=20, help="winning lines to list")
+    args = parser.parse_args()
+
+    try:
+        store = SyndicateStore(args.store, get_game(args.game) if args.game else None)
+    except ValueError as e:
+        parser.error(str(e))
+    rules = store.rules
+    if args.command == 'import':
+        totals = store.import_csv(args.csv_file)
+        print(f"✅ {args.store}: {len(store)} lines ({totals['added']} added, "
+              f"{totals['duplicates']} duplicates, {totals['rejected']} rejected)")
+        return
+
+    if args.draw:
+        label, numbers = 'given draw', args.draw
+    else:
+        rows = load_rows(args.data_file, rules)
+        label, numbers = f"latest draw ({rows[-1][0]})", rows[-1][1:]
+    main_balls, lucky_stars = numbers[:rules.main_picks], numbers[rules.main_picks:]
+    if not rules.is_valid_ticket(main_balls, lucky_stars):
+        parser.error(f"not a {rules.name} draw: {numbers}")
+    counts, winners = tier_summary(store.check(main_balls, lucky_stars), rules)
+
+    print(f"🎯 Checking {len(store)} lines against the {label}: {main_balls} + {lucky_stars}")
+    for (tier_main, tier_star), count in counts.items():
+        if count:
+            print(f"  {tier_main}+{tier_star}: {count} lines")
+    print(f"🏆 {len(winners)} winning lines")
+    for line_id in winners[:args.show]:
+        ticket_main, ticket_lucky = store.ticket(int(line_id))
+        print(f"  #{line_id}: {ticket_main} + {ticket_lucky}")
+
+
+if __name__ == "__main__":
+    main()
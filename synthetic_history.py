@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Synthetic draw histories for scale and bias testing.
+Writes lottery_results.csv-compatible histories (and optionally a binary
+draw store) of any length for any k-of-n game. Draws are uniform unless
+biases are planted:
+
+  hot numbers  - a number is drawn as if its weight were multiplied
+  pairs        - two main balls are forced into a share of the draws
+  drift        - a number's weight ramps linearly across the history
+
+Each draw is weighted sampling without replacement, done for a whole
+chunk at once with Gumbel-top-k (log weight + Gumbel noise, keep the k
+largest). Chunks are written as they are generated, so 100M draws need
+only one chunk of memory.
+"""
+
+import argparse
+import contextlib
+
+import numpy as np
+
+from draw_store import StoreWriter
+from game_rules import EUROMILLIONS, GAMES, get_game
+from generate_csv import format_row
+
+CHUNK = 1 << 19
+
+
+def _gumbel_pick(log_weights, picks, rng):
+    """Return the sorted 1-based picks of every row of an n x pool log-weight matrix."""
+    # -log of a float32 Exp(1) variate is Gumbel noise, without a float64 temporary (a 0 gives +inf)
+    with np.errstate(divide='ignore'):
+        keys = log_weights - np.log(rng.standard_exponential(log_weights.shape, dtype=np.float32))
+    chosen = np.argpartition(-keys, picks - 1, axis=1)[:, :picks]
+    return np.sort(chosen, axis=1) + 1
+
+
+def _log_weights(rows, start, total, pool, hot, drift):
+    """n x pool float32 log weights for draws [start, start + rows) of total."""
+    base = np.zeros(pool, dtype=np.float32)
+    for number, weight in (hot or {}).items():
+        base[number - 1] += np.log(weight)
+    log_weights = np.broadcast_to(base, (rows, pool)).copy()
+    if drift:
+        # Position of each draw in the history, 0 at the first and 1 at the last
+        position = (start + np.arange(rows, dtype=np.float64)) / max(total - 1, 1)
+        for number, weight in drift.items():
+            log_weights[:, number - 1] += np.log1p((weight - 1) * position).astype(np.float32)
+    return log_weights
+
+
+def generate_draws(draws, rules=EUROMILLIONS, seed=None, hot=None, hot_stars=None, pairs=(),
+                   drift=None, drift_stars=None, chunk_size=CHUNK):
+    """Yield (start, n x width block) chunks of a synthetic history of the given length.
+
+    hot and drift map a main ball to a weight (drift: the weight reached at
+    the end of the history, ramping from 1); hot_stars and drift_stars do
+    the same for lucky stars. pairs is a sequence of ((a, b), probability):
+    each draw contains both a and b with at least that probability.
+    Results depend only on the arguments and seed.
+    """
+    main_pool, main_picks = rules.main_pool, rules.main_picks
+    star_pool, star_picks = rules.star_pool, rules.star_picks
+    if 2 * len(pairs) > main_picks:
+        raise ValueError(f"At most {main_picks // 2} planted pairs fit in one draw")
+    rng = np.random.default_rng(seed)
+    for start in range(0, draws, chunk_size):
+        rows = min(chunk_size, draws - start)
+        main_keys = _log_weights(rows, start, draws, main_pool, hot, drift)
+        for (first, second), probability in pairs:
+            # Forced numbers outrank every Gumbel key, so the pair is always picked
+            planted = rng.random(rows) < probability
+            main_keys[planted, first - 1] = np.inf
+            main_keys[planted, second - 1] = np.inf
+        block = np.empty((rows, rules.width), dtype=rules.number_dtype)
+        block[:, :main_picks] = _gumbel_pick(main_keys, main_picks, rng)
+        if star_picks:
+            star_keys = _log_weights(rows, start, draws, star_pool, hot_stars, drift_stars)
+            block[:, main_picks:] = _gumbel_pick(star_keys, star_picks, rng)
+        yield start, block
+
+
+def spread_years(start, rows, total, first_year=2004, last_year=2025):
+    """Years for draws [start, start + rows) when total draws are spread evenly over the years."""
+    index = start + np.arange(rows, dtype=np.int64)
+    return (first_year + index * (last_year - first_year + 1) // max(total, 1)).astype(np.uint16)
+
+
+def _number_text(max_value):
+    """ASCII digit table (left-aligned) and lengths of every value 0..max_value."""
+    width = len(str(max_value))
+    table = np.zeros((max_value + 1, width), dtype=np.uint8)
+    lengths = np.empty(max_value + 1, dtype=np.int64)
+    for value in range(max_value + 1):
+        text = str(value).encode()
+        table[value, :len(text)] = np.frombuffer(text, dtype=np.uint8)
+        lengths[value] = len(text)
+    return table, lengths
+
+
+def format_csv_rows(columns, table, lengths):
+    """Format an n x c integer matrix as comma-separated lines, vectorized; returns bytes."""
+    columns = np.asarray(columns, dtype=np.int64)
+    cell_lengths = lengths[columns] + 1  # digits plus the ',' or '\n' after them
+    ends = np.cumsum(cell_lengths.ravel())
+    starts = ends - cell_lengths.ravel()
+    out = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    digits = table[columns.ravel()]
+    for position in range(table.shape[1]):
+        present = lengths[columns.ravel()] > position
+        out[starts[present] + position] = digits[present, position]
+    separators = np.full(columns.shape, ord(','), dtype=np.uint8)
+    separators[:, -1] = ord('\n')
+    out[ends - 1] = separators.ravel()
+    return out.tobytes()
+
+
+def write_history(csv_file, draws, store_file=None, rules=EUROMILLIONS, seed=None,
+                  first_year=2004, last_year=2025, chunk_size=CHUNK, **biases):
+    """Write a synthetic history to csv_file (and store_file if given).
+
+    Returns (main ball counts, lucky star counts) over the whole history,
+    indexed by number - 1. biases are passed to generate_draws.
+    """
+    main_picks = rules.main_picks
+    main_counts = np.zeros(rules.main_pool, dtype=np.int64)
+    star_counts = np.zeros(rules.star_pool, dtype=np.int64)
+    table, lengths = _number_text(max(last_year, rules.main_pool, rules.star_pool))
+
+    store = StoreWriter(store_file, draws, rules) if store_file else contextlib.nullcontext()
+    with store as writer, open(csv_file, 'wb') as f:
+        f.write(format_row(rules.csv_header).encode())
+        for start, block in generate_draws(draws, rules, seed, chunk_size=chunk_size, **biases):
+            years = spread_years(start, len(block), draws, first_year, last_year)
+            f.write(format_csv_rows(np.column_stack([years, block]), table, lengths))
+            if writer:
+                writer.write(block, years)
+            main_counts += np.bincount(block[:, :main_picks].ravel(), minlength=rules.main_pool + 1)[1:]
+            star_counts += np.bincount(block[:, main_picks:].ravel(), minlength=rules.star_pool + 1)[1:]
+    return main_counts, star_counts
+
+
+def _weights_arg(text):
+    """Parse 'N:W,N:W' into {N: W}."""
+    weights = {}
+    for item in text.split(','):
+        number, weight = item.split(':')
+        weights[int(number)] = float(weight)
+    return weights
+
+
+def _pair_arg(text):
+    """Parse 'A-B:P' into ((A, B), P)."""
+    numbers, probability = text.split(':')
+    first, second = numbers.split('-')
+    return (int(first), int(second)), float(probability)
+
+
+def _frequency_rank(counts, number):
+    """1-based rank of number when counts are sorted from most to least frequent."""
+    return int((counts > counts[number - 1]).sum()) + 1
+
+
+def main():
+    """Write a synthetic history and report where the planted biases rank."""
+    parser = argparse.ArgumentParser(description="Write a synthetic lottery history")
+    parser.add_argument('draws', type=int, help="number of draws to generate")
+    parser.add_argument('csv_file', nargs='?', default='synthetic_results.csv')
+    parser.add_argument('--store', help="also write a binary draw store here")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--game', default=EUROMILLIONS.name, choices=list(GAMES), help="game rules to draw with")
+    parser.add_argument('--hot', type=_weights_arg, help="main ball weights, e.g. 7:1.5,23:1.3")
+    parser.add_argument('--hot-stars', type=_weights_arg, help="lucky star weights, e.g. 3:1.5")
+    parser.add_argument('--pair', type=_pair_arg, action='append', default=[],
+                        help="plant a main ball pair in a share of draws, e.g. 12-34:0.05")
+    parser.add_argument('--drift', type=_weights_arg, help="main ball weights reached by the last draw")
+    parser.add_argument('--drift-stars', type=_weights_arg, help="lucky star weights reached by the last draw")
+    parser.add_argument('--chunk', type=int, default=CHUNK, help="draws generated per chunk")
+    args = parser.parse_args()
+
+    rules = get_game(args.game)
+
+    main_counts, star_counts = write_history(
+        args.csv_file, args.draws, args.store, rules, args.seed, chunk_size=args.chunk,
+        hot=args.hot, hot_stars=args.hot_stars, pairs=args.pair, drift=args.drift, drift_stars=args.drift_stars)
+    print(f"✅ {args.draws:,} draws written to {args.csv_file}" + (f" and {args.store}" if args.store else ""))
+
+    for label, weights, counts in (("Hot main ball", args.hot, main_counts), ("Hot lucky star", args.hot_stars, star_counts),
+                                   ("Drifting main ball", args.drift, main_counts),
+                                   ("Drifting lucky star", args.drift_stars, star_counts)):
+        for number, weight in (weights or {}).items():
+            print(f"  {label} {number} (x{weight}): frequency rank {_frequency_rank(counts, number)} "
+                  f"of {len(counts)}")
+
+
+if __name__ == "__main__":
+    main()
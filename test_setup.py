@@ -40,7 +40,727 @@ def test_data_file():
         return True
     else:
         print("❌ lottery_results.csv not found")
-        print("💡 Run 'php csvGen.php' to generate the data file")
+        print("💡 Run 'python3 generate_csv.py' to generate the data file")
+        return False
+
+def test_extractor():
+    """Test the HTML extractor against the committed CSV"""
+    print("🧩 Testing HTML extractor...")
+    
+    try:
+        import generate_csv
+        
+        draws = generate_csv.extract_draws(os.path.join('results', '2004.html'))
+        with open('lottery_results.csv', 'r') as f:
+            expected = [line for line in f if line.startswith('2004,')]
+        
+        extracted = [generate_csv.format_row(generate_csv.pad_row(row)) for row in draws]
+        if extracted == expected:
+            print(f"✅ Extracted {len(draws)} draws matching lottery_results.csv")
+            return True
+        else:
+            print(f"❌ Extractor output differs from lottery_results.csv")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error running extractor: {e}")
+        return False
+
+def test_csv_refresh():
+    """Test that a manifest refresh skips unchanged years, trusts touched ones and drops deleted ones"""
+    print("🔄 Testing incremental CSV refresh...")
+    
+    try:
+        import shutil
+        import tempfile
+        import generate_csv
+        
+        def expected_lines(*years):
+            with open('lottery_results.csv', 'r') as f:
+                return [line for line in f if line.split(',')[0] in years]
+        
+        parsed = []
+        extract_entry = generate_csv.extract_entry
+        generate_csv.extract_entry = lambda path: parsed.append(os.path.basename(path)) or extract_entry(path)
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                years = ('2004', '2005', '2006')
+                for year in years:
+                    shutil.copy2(os.path.join('results', f'{year}.html'), tmp_dir)
+                manifest_file = os.path.join(tmp_dir, 'manifest.json')
+                csv_file = os.path.join(tmp_dir, 'lottery_results.csv')
+                
+                def run():
+                    del parsed[:]
+                    files = generate_csv.find_year_files(tmp_dir)
+                    manifest = generate_csv.load_manifest(manifest_file)
+                    changed = generate_csv.refresh(files, manifest, workers=1)
+                    generate_csv.write_csv(generate_csv.manifest_rows(files, manifest), csv_file)
+                    generate_csv.save_manifest(manifest, manifest_file)
+                    with open(csv_file, 'r') as f:
+                        lines = f.readlines()
+                    return changed, list(parsed), lines, manifest
+                
+                checks = []
+                changed, parsed_now, lines, _ = run()
+                checks.append(("first build", changed == parsed_now == ['2004.html', '2005.html', '2006.html']
+                               and lines[1:] == expected_lines(*years)))
+                
+                changed, parsed_now, lines, _ = run()
+                checks.append(("unchanged files skipped", changed == parsed_now == []
+                               and lines[1:] == expected_lines(*years)))
+                
+                touched = os.path.join(tmp_dir, '2005.html')
+                stat = os.stat(touched)
+                os.utime(touched, (stat.st_atime, stat.st_mtime + 60))
+                changed, parsed_now, lines, manifest = run()
+                checks.append(("touched file not re-parsed", changed == parsed_now == []
+                               and manifest['files']['2005.html']['mtime'] == stat.st_mtime + 60
+                               and lines[1:] == expected_lines(*years)))
+                
+                os.remove(os.path.join(tmp_dir, '2004.html'))
+                changed, parsed_now, lines, manifest = run()
+                checks.append(("deleted year dropped", changed == ['2004.html'] and parsed_now == []
+                               and sorted(manifest['files']) == ['2005.html', '2006.html']
+                               and generate_csv.load_manifest(manifest_file) == manifest
+                               and lines[1:] == expected_lines('2005', '2006')))
+        finally:
+            generate_csv.extract_entry = extract_entry
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ CSV refresh checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} CSV refresh checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing CSV refresh: {e}")
+        return False
+
+def test_draw_store():
+    """Test the binary draw store round trip"""
+    print("💾 Testing binary draw store...")
+    
+    try:
+        import tempfile
+        import draw_store
+        
+        expected = draw_store.read_csv_rows('lottery_results.csv')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store_file = os.path.join(tmp_dir, 'lottery_results.bin')
+            draw_store.convert_csv('lottery_results.csv', store_file)
+            loaded = draw_store.load_rows(store_file)
+        
+        if loaded == expected:
+            print(f"✅ Draw store round trip preserved {len(loaded)} draws")
+            return True
+        else:
+            print("❌ Draw store contents differ from lottery_results.csv")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error testing draw store: {e}")
+        return False
+
+def test_pattern_engines():
+    """Test that the vectorized and incremental pattern tallies agree on a 6/49 history"""
+    print("🎲 Testing pattern engines on 6/49...")
+    
+    try:
+        import numpy as np
+        import draw_stats
+        import synthetic_history
+        from analysis_state import AnalysisState
+        from game_rules import LOTTO_6_49
+        
+        draws = np.concatenate([block for _, block in synthetic_history.generate_draws(5000, LOTTO_6_49, seed=7)])
+        state = AnalysisState.for_rules(LOTTO_6_49)
+        state.extend(draws.tolist())
+        
+        if draw_stats.pattern_tally(draws[:, :LOTTO_6_49.main_picks]) == state.pattern_counts():
+            print(f"✅ Pattern tallies agree over {len(draws):,} draws")
+            return True
+        else:
+            print("❌ draw_stats.pattern_tally differs from AnalysisState")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Error testing pattern engines: {e}")
+        return False
+
+def test_pipeline():
+    """Test that the analysis DAG runs the co-occurrence stage once and times the summary views after the summary"""
+    print("🧮 Testing analysis pipeline...")
+    
+    try:
+        import contextlib
+        import io
+        import lottery_analyzer_simple
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = lottery_analyzer_simple.EuroMillionsAnalyzer('lottery_results.csv')
+        calls = []
+        summary = analyzer.cooccurrence_summary
+        analyzer.cooccurrence_summary = lambda: calls.append(1) or summary()
+        
+        results = analyzer.analyze(workers=4)
+        stages = analyzer.last_pipeline
+        stages.compute('results', 'cooccurrence')
+        
+        if len(calls) != 1:
+            print(f"❌ Co-occurrence stage ran {len(calls)} times")
+            return False
+        if 'cooccurrence' not in stages.timings or results.cooccurrence != stages.get('cooccurrence'):
+            print("❌ Co-occurrence stage missing from the timings or the results")
+            return False
+        summary_end = sum(stages.timings['summary'])
+        views = ('frequencies', 'gap_distributions', 'patterns', 'pattern_metrics')
+        if any(stages.timings[view][0] < summary_end for view in views):
+            print("❌ A summary view started before the summary stage finished")
+            return False
+        print(f"✅ {len(stages.timings)} stages ran once each, co-occurrence in "
+              f"{stages.timings['cooccurrence'][1] * 1000:.1f} ms")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing pipeline: {e}")
+        return False
+
+def test_analysis_cache():
+    """Test analysis cache hits, misses, invalidation, LRU eviction and corrupt entries"""
+    print("🗄️  Testing analysis cache...")
+    
+    try:
+        import shutil
+        import tempfile
+        from analysis_cache import AnalysisCache
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, 'lottery_results.csv')
+            shutil.copy('lottery_results.csv', data_file)
+            cache = AnalysisCache(os.path.join(tmp_dir, 'cache'))
+            dataset = cache.dataset_hash(data_file)
+            key = cache.key(dataset, 'recent_frequencies', recent_draws=250)
+            calls = []
+            compute = lambda: calls.append(1) or {'value': 42}
+            
+            checks = []
+            first, second = cache.fetch(key, compute), cache.fetch(key, compute)
+            checks.append(("miss then hit", first == second == {'value': 42} and len(calls) == 1
+                           and (cache.misses, cache.hits) == (1, 1)))
+            checks.append(("parameters change the key",
+                           cache.key(dataset, 'recent_frequencies', recent_draws=50) != key))
+            
+            [(_, _, entry_file)] = cache.entries()
+            with open(entry_file, 'wb') as f:
+                f.write(b'not a cache entry')
+            checks.append(("corrupt entry is a miss", cache.get(key) is None and not cache.entries()))
+            
+            cache.put(key, {'value': 42})
+            with open(data_file, 'a') as f:
+                f.write("2025,1,2,3,4,5,1,2\n")
+            changed = cache.dataset_hash(data_file)
+            checks.append(("changed data invalidates", changed != dataset and cache.get(key) is None
+                           and not cache.entries()))
+            
+            keys = [cache.key(changed, 'stage', n=n) for n in range(3)]
+            for entry_key in keys:
+                cache.put(entry_key, list(range(1000)))
+            paths = {os.path.basename(path).split('.')[0]: path for _, _, path in cache.entries()}
+            for age, entry_key in enumerate(keys):
+                os.utime(paths[entry_key], ns=(age * 10**9, age * 10**9))  # keys[0] oldest
+            cache.get(keys[0])  # now the most recently used
+            cache.evict(sum(size for _, size, _ in cache.entries()) - 1)
+            checks.append(("LRU eviction", [cache.get(entry_key) is not None for entry_key in keys]
+                           == [True, False, True]))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Analysis cache checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} analysis cache checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing analysis cache: {e}")
+        return False
+
+def test_stream_mode():
+    """Test that streamed histories give the batch analyses and seeded predictions"""
+    print("🌊 Testing stream mode...")
+    
+    try:
+        import contextlib
+        import io
+        import random
+        import draw_store
+        import lottery_predictor
+        
+        with open('lottery_results.csv') as f:
+            text = f.read()
+        rows = draw_store.read_csv_rows('lottery_results.csv')
+        
+        def run(source, **kwargs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                analyzer = lottery_predictor.EuroMillionsAnalyzer(source, **kwargs)
+                analyses = (analyzer.basic_statistics(), analyzer.gap_analysis(), analyzer.pattern_analysis(),
+                            analyzer.hot_cold_analysis())
+                random.seed(42)
+                predictions = analyzer.generate_predictions()
+            return analyses, predictions, (analyzer.first_date, analyzer.last_date)
+        
+        batch = run('lottery_results.csv')
+        stdin = sys.stdin
+        try:
+            sys.stdin = io.StringIO(text)
+            from_stdin = run('-', stream=True)
+        finally:
+            sys.stdin = stdin
+        sources = [
+            ("CSV file", run('lottery_results.csv', stream=True)),
+            ("snapshots every 100 draws", run('lottery_results.csv', stream=True, report_every=100)),
+            ("stdin", from_stdin),
+            ("row iterable", run(iter(rows), stream=True)),
+        ]
+        
+        failed = [name for name, streamed in sources if streamed != batch]
+        if failed:
+            print(f"❌ Stream mode differs from batch for: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(sources)} streamed sources match the batch analyses of {len(rows)} draws")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing stream mode: {e}")
+        return False
+
+def test_backtest_snapshots():
+    """Test walk-forward snapshot inputs against a naive rescan of the draws before each step"""
+    print("⏪ Testing backtest snapshots...")
+    
+    try:
+        import random
+        import numpy as np
+        import backtest
+        import draw_store
+        import synthetic_history
+        from draw_stats import incidence_matrix
+        from game_rules import EUROMILLIONS, POWERBALL
+        
+        rng = random.Random(5)
+        histories = [
+            (EUROMILLIONS, np.array([row[1:] for row in draw_store.read_csv_rows('lottery_results.csv')])),
+            (POWERBALL, np.concatenate([block for _, block in synthetic_history.generate_draws(1500, POWERBALL, seed=5)])),
+        ]
+        checks = []
+        for rules, draws in histories:
+            main_incidence = incidence_matrix(draws[:, :rules.main_picks], rules.main_pool)
+            star_incidence = incidence_matrix(draws[:, rules.main_picks:], rules.star_pool)
+            incidence = np.hstack([main_incidence, star_incidence]).astype(np.int64)
+            # Odd chunk and window sizes put cut-points on, around and between chunk edges
+            for start, hot_window, chunk_size in ((50, 250, backtest.DEFAULT_CHUNK), (0, 37, 97)):
+                snapshots = {}
+                for steps, inputs in backtest.snapshot_inputs(main_incidence, star_incidence, start, hot_window,
+                                                              chunk_size):
+                    for row, t in enumerate(steps.tolist()):
+                        snapshots[t] = {name: values[row] for name, values in inputs.items()}
+                checks.append((f"{rules.name} steps from {start}", sorted(snapshots) == list(range(start, len(draws)))))
+                
+                cut_points = [start, start + 1, len(draws) - 1] + rng.sample(range(start, len(draws)), 300)
+                mismatched = 0
+                for t in cut_points:
+                    before = incidence[:t]
+                    seen = [np.flatnonzero(column) for column in before.T]
+                    freq = before.sum(axis=0)
+                    gaps = np.array([t - 1 - rows[-1] if len(rows) else t for rows in seen])
+                    hot = before[max(t - hot_window, 0):].sum(axis=0)
+                    expected = {'freq': freq, 'gaps': gaps, 'hot': hot}
+                    snapshot = snapshots[t]
+                    for name in ('freq', 'gaps', 'hot'):
+                        found = np.concatenate([snapshot[f'main_{name}'], snapshot[f'lucky_{name}']])
+                        if not np.array_equal(found, expected[name]):
+                            mismatched += 1
+                    if snapshot['draws'] != t:
+                        mismatched += 1
+                checks.append((f"{rules.name} window {hot_window} / chunk {chunk_size}", mismatched == 0))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Backtest snapshot checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} backtest snapshot checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing backtest snapshots: {e}")
+        return False
+
+def test_weighted_sampler():
+    """Test that the Fenwick sampler draws without replacement and restores its weights"""
+    print("⚖️  Testing weighted sampler...")
+    
+    try:
+        import random
+        from weighted_sampler import FenwickSampler
+        
+        rng = random.Random(11)
+        weights = [rng.random() * 3 for _ in range(50)] + [0.0] * 5
+        sampler = FenwickSampler(weights)
+        fresh = FenwickSampler(weights).tree
+        same_tree = lambda: all(abs(a - b) < 1e-9 for a, b in zip(sampler.tree, fresh))
+        
+        checks = []
+        batch = sampler.sample_batch(5, 2000, rng)
+        checks.append(("no repeats in a draw", all(len(set(picked)) == len(picked) == 5 for picked in batch)))
+        checks.append(("zero weights never drawn", all(idx < 50 for picked in batch for idx in picked)))
+        checks.append(("weights kept after sample_batch", same_tree() and sampler.remaining == len(weights)
+                       and abs(sampler.total() - sum(weights)) < 1e-9))
+        
+        picked = sampler.sample(len(weights) + 10, rng)
+        checks.append(("draws every item once", sorted(picked) == list(range(len(weights)))
+                       and sampler.remaining == 0 and sampler.total() < 1e-9))
+        sampler.restore()
+        checks.append(("weights kept after restore", same_tree() and sampler.remaining == len(weights)))
+        
+        sampler = FenwickSampler([1, 2, 3, 4])
+        counts = [0] * 4
+        for _ in range(20000):
+            counts[sampler.pick(rng)] += 1
+        checks.append(("picks follow the weights", all(abs(count / 20000 - (i + 1) / 10) < 0.02
+                                                       for i, count in enumerate(counts))))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Weighted sampler checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} weighted sampler checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing weighted sampler: {e}")
+        return False
+
+def test_cooccurrence():
+    """Test incremental co-occurrence counts and top pairs/triples against a brute-force recount"""
+    print("🔗 Testing co-occurrence counts...")
+    
+    try:
+        from collections import Counter
+        from itertools import combinations
+        import numpy as np
+        import synthetic_history
+        from draw_stats import CoOccurrence, incidence_matrix
+        
+        draws = np.concatenate([block for _, block in synthetic_history.generate_draws(3000, seed=5)])
+        split = 2000
+        cooc = CoOccurrence(incidence_matrix(draws[:split, :5], 50), incidence_matrix(draws[:split, 5:], 12))
+        for row in draws[split:].tolist():
+            cooc.append(row[:5], row[5:])
+        full = CoOccurrence(incidence_matrix(draws[:, :5], 50), incidence_matrix(draws[:, 5:], 12))
+        
+        checks = []
+        checks.append(("append matches a full recount", cooc.draws == full.draws == len(draws)
+                       and all((getattr(cooc, name) == getattr(full, name)).all()
+                               for name in ('main_pairs', 'star_pairs', 'cross'))
+                       and cooc.triples == full.triples))
+        
+        pairs, triples, star_pairs = Counter(), Counter(), Counter()
+        for row in draws.tolist():
+            pairs.update(combinations(sorted(row[:5]), 2))
+            triples.update(combinations(sorted(row[:5]), 3))
+            star_pairs.update(combinations(sorted(row[5:]), 2))
+        ranked = lambda counter, k: sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:k]
+        checks.append(("top_pairs", cooc.top_pairs(10) == ranked(pairs, 10)))
+        checks.append(("top star pairs", cooc.top_pairs(5, kind='star') == ranked(star_pairs, 5)))
+        checks.append(("top_triples", cooc.top_triples(10) == ranked(triples, 10)))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Co-occurrence checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} co-occurrence checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing co-occurrence counts: {e}")
+        return False
+
+def test_synthetic_biases():
+    """Test that biases planted by the synthetic generator show up in the analysis"""
+    print("🧪 Testing planted synthetic biases...")
+    
+    try:
+        import contextlib
+        import io
+        import tempfile
+        import lottery_analyzer_simple
+        import synthetic_history
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, 'synthetic_results.csv')
+            synthetic_history.write_history(data_file, 5000, seed=3, hot={7: 2.5}, hot_stars={3: 2.0},
+                                            pairs=[((12, 34), 0.05)], drift={40: 3.0})
+            with contextlib.redirect_stdout(io.StringIO()):
+                analyzer = lottery_analyzer_simple.EuroMillionsAnalyzer(data_file)
+            main_freq, lucky_freq = analyzer.frequencies()
+            recent_main, _ = analyzer.recent_frequencies(1000)
+            top_pair = analyzer.cooccurrence_summary()['main_pairs'][0][0]
+        
+        checks = [
+            ("hot main ball is the most frequent", main_freq.most_common(1)[0][0] == 7),
+            ("hot lucky star is the most frequent", lucky_freq.most_common(1)[0][0] == 3),
+            ("planted pair is the top main pair", top_pair == [12, 34]),
+            # Rate over the last 1000 draws vs the whole 5000; the ramp to x3 puts it near 1.3
+            ("drifting ball rises in recent draws", recent_main[40] / 1000 > 1.2 * main_freq[40] / 5000),
+        ]
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Synthetic bias checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} planted biases found by the analysis")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing synthetic biases: {e}")
+        return False
+
+def test_ticket_index():
+    """Test colex rank/unrank round trips, boundary ticket keys and bitset membership"""
+    print("🔑 Testing ticket index...")
+    
+    try:
+        import random
+        from math import comb
+        import numpy as np
+        from game_rules import EUROMILLIONS, LOTTO_6_49, POWERBALL
+        from ticket_index import (DrawnIndex, RankBitset, rank, ticket_rank, ticket_ranks, ticket_unrank,
+                                  ticket_unranks, unrank)
+        
+        rng = random.Random(7)
+        checks = []
+        checks.append(("rank/unrank round trip", all(rank(unrank(value, 5, 50)) == value
+                                                     for value in rng.sample(range(comb(50, 5)), 500))))
+        checks.append(("unrank/rank round trip", all(unrank(rank(line), 5, 50) == sorted(line)
+                                                     for line in (rng.sample(range(1, 51), 5) for _ in range(500)))))
+        
+        last = comb(50, 5) * comb(12, 2) - 1
+        checks.append(("first ticket key", ticket_rank([1, 2, 3, 4, 5], [1, 2]) == 0
+                       and ticket_unrank(0) == ([1, 2, 3, 4, 5], [1, 2])))
+        checks.append(("last ticket key", last == 139_838_159
+                       and ticket_rank([46, 47, 48, 49, 50], [11, 12]) == last
+                       and ticket_unrank(last) == ([46, 47, 48, 49, 50], [11, 12])))
+        
+        for rules in (EUROMILLIONS, LOTTO_6_49, POWERBALL):
+            keys = [0, rules.combinations - 1] + rng.sample(range(rules.combinations), 200)
+            tickets = [ticket_unrank(key, rules) for key in keys]
+            checks.append((f"{rules.name} keys", [ticket_rank(main, lucky, rules) for main, lucky in tickets] == keys
+                           and all(rules.is_valid_ticket(main, lucky) for main, lucky in tickets)))
+            main, lucky = ticket_unranks(np.array(keys), rules)
+            checks.append((f"{rules.name} array keys",
+                           ticket_ranks(np.hstack([main, lucky]), rules).tolist() == keys))
+        
+        bitset = RankBitset.for_tickets(EUROMILLIONS)
+        members = set(rng.sample(range(last + 1), 1000)) | {0, last}
+        bitset.update(sorted(members))
+        probes = members | set(rng.sample(range(last + 1), 1000))
+        checks.append(("bitset membership", all((key in bitset) == (key in members) for key in probes)
+                       and len(bitset) == len(members) and list(bitset.iter_ranks()) == sorted(members)
+                       and -1 not in bitset and last + 1 not in bitset))
+        
+        index = DrawnIndex([['2024-01-02', 7, 3, 45, 21, 12, 9, 2]])
+        checks.append(("drawn index", index.ticket_drawn([3, 7, 12, 21, 45], [2, 9])
+                       and index.line_drawn([45, 21, 12, 7, 3]) and not index.ticket_drawn([3, 7, 12, 21, 45], [2, 8])))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Ticket index checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} ticket index checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing ticket index: {e}")
+        return False
+
+def test_ticket_matcher():
+    """Test best matches and hit histograms against a brute-force set-intersection loop"""
+    print("🎯 Testing ticket matcher...")
+    
+    try:
+        import random
+        import numpy as np
+        from draw_store import draw_masks
+        from game_rules import EUROMILLIONS, LOTTO_6_49, POWERBALL
+        from ticket_matcher import match_tickets
+        
+        rng = random.Random(11)
+        checks = []
+        for rules in (EUROMILLIONS, LOTTO_6_49, POWERBALL):
+            def line():
+                return (sorted(rng.sample(range(1, rules.main_pool + 1), rules.main_picks))
+                        + sorted(rng.sample(range(1, rules.star_pool + 1), rules.star_picks)))
+            history = [line() for _ in range(40)]
+            history += [history[3], history[17]]  # repeated draws, so ties go to the earliest one
+            tickets = [line() for _ in range(30)] + [history[17], history[3], history[-1]]
+            main_masks, star_masks = draw_masks(np.array(history), rules)
+            # A tiny block size spreads the tickets over several blocks
+            matches = match_tickets(np.array(tickets), main_masks, star_masks, workers=1,
+                                    block_cells=len(history) * 4, rules=rules)
+            
+            expected_best, expected_histograms = [], []
+            for ticket in tickets:
+                histogram = np.zeros((rules.main_picks + 1, rules.star_picks + 1), dtype=np.int64)
+                best = None
+                for index, draw in enumerate(history):
+                    main_hits = len(set(ticket[:rules.main_picks]) & set(draw[:rules.main_picks]))
+                    star_hits = len(set(ticket[rules.main_picks:]) & set(draw[rules.main_picks:]))
+                    histogram[main_hits, star_hits] += 1
+                    # Most main balls, then most stars, then the earliest draw
+                    if best is None or (main_hits, star_hits) > best[:2]:
+                        best = (main_hits, star_hits, index)
+                expected_best.append(best)
+                expected_histograms.append(histogram)
+            
+            found = list(zip(matches['best_main'].tolist(), matches['best_star'].tolist(),
+                             matches['best_draw'].tolist()))
+            checks.append((f"{rules.name} best matches", found == expected_best))
+            checks.append((f"{rules.name} histograms", np.array_equal(matches['histogram'], expected_histograms)))
+            checks.append((f"{rules.name} histogram totals",
+                           (matches['histogram'].sum(axis=(1, 2)) == len(history)).all()))
+            checks.append((f"{rules.name} earliest repeat", found[-3][2] == 17 and found[-2][2] == 3
+                           and found[-1][2] == 17))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Ticket matcher checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} ticket matcher checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing ticket matcher: {e}")
+        return False
+
+def test_ticket_generation():
+    """Test that every prediction method gives valid, seed-reproducible tickets for every game"""
+    print("🎟️  Testing ticket generation...")
+    
+    try:
+        import numpy as np
+        import synthetic_history
+        from game_rules import GAMES
+        from prediction_methods import METHODS, generate_tickets
+        
+        checks = []
+        for rules in GAMES.values():
+            draws = np.concatenate([block for _, block in synthetic_history.generate_draws(500, rules, seed=3)])
+            # A three-draw history leaves most numbers undrawn and every hot count tied
+            for history in (draws, draws[:3]):
+                for method in METHODS:
+                    main, lucky = generate_tickets(history, method, 200, seed=9, rules=rules)
+                    again = generate_tickets(history, method, 200, seed=9, rules=rules)
+                    name = f"{rules.name} {method} ({len(history)} draws)"
+                    checks.append((f"{name} shapes", main.shape == (200, rules.main_picks)
+                                   and lucky.shape == (200, rules.star_picks)))
+                    checks.append((f"{name} valid", all(rules.is_valid_ticket(m, s) and m == sorted(m) and s == sorted(s)
+                                                        for m, s in zip(main.tolist(), lucky.tolist()))))
+                    checks.append((f"{name} seeded", np.array_equal(main, again[0]) and np.array_equal(lucky, again[1])))
+        
+        try:
+            generate_tickets(draws, 'astrology', 1)
+            checks.append(("unknown method", False))
+        except ValueError:
+            checks.append(("unknown method", True))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Ticket generation checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} ticket generation checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing ticket generation: {e}")
+        return False
+
+def test_syndicate_store():
+    """Test syndicate ticket import validation and prize tier checks"""
+    print("🎫 Testing syndicate store...")
+    
+    try:
+        import tempfile
+        from game_rules import EUROMILLIONS, POWERBALL
+        from syndicate_store import SyndicateStore, parse_ticket_rows, tier_summary
+        
+        rows = [['8', '15', '26', '33', '41', '9', '10'], [' 8', '15 ', '26', '33', '40', '9', '11', ''],
+                ['1', '2', '3', '4', '9' * 30, '1', '2'], ['1', '1', '2', '3', '4', '5', '6'],
+                ['Ball 1', 'Ball 2', 'Ball 3', 'Ball 4', 'Ball 5', 'Star 1', 'Star 2']]
+        keys, rejected = parse_ticket_rows(rows)
+        checks = [("rejects bad rows", len(keys) == 2 and rejected == 3)]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = SyndicateStore(os.path.join(tmp_dir, 'em.tks'))
+            checks.append(("skips duplicates", store.append_keys(list(keys) * 2) == (2, 2) and len(store) == 2))
+            counts, winners = tier_summary(store.check([8, 15, 26, 33, 41], [9, 10]), EUROMILLIONS)
+            checks.append(("prize tiers", counts[(5, 2)] == 1 and counts[(4, 1)] == 1 and list(winners) == [0, 1]))
+            
+            store = SyndicateStore(os.path.join(tmp_dir, 'pb.tks'), POWERBALL)
+            keys, _ = parse_ticket_rows([['65', '3', '69', '21', '7', '26']], POWERBALL)
+            store.append_keys(keys)
+            store = SyndicateStore(os.path.join(tmp_dir, 'pb.tks'))
+            checks.append(("keeps its game", store.rules == POWERBALL
+                           and store.ticket(0) == ([3, 7, 21, 65, 69], [26])
+                           and store.check([3, 7, 21, 65, 69], [26]).tolist() == [1]))
+        
+        failed = [name for name, ok in checks if not ok]
+        if failed:
+            print(f"❌ Syndicate store checks failed: {', '.join(failed)}")
+            return False
+        print(f"✅ {len(checks)} syndicate store checks passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing syndicate store: {e}")
+        return False
+
+def test_results_json():
+    """Test that a short history's results save as strict JSON and render without nan"""
+    print("📦 Testing results JSON...")
+    
+    try:
+        import contextlib
+        import io
+        import json
+        import tempfile
+        import lottery_analyzer_simple
+        from analysis_results import AnalysisResults, render_text
+        
+        def reject_constant(name):
+            raise ValueError(f"non-standard JSON constant {name}")
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, 'lottery_results.csv')
+            with open('lottery_results.csv', 'r') as src, open(data_file, 'w') as dst:
+                dst.writelines(line for _, line in zip(range(21), src))  # header + 20 draws
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = lottery_analyzer_simple.EuroMillionsAnalyzer(data_file).analyze()
+            json_file = os.path.join(tmp_dir, 'analysis.json')
+            results.save(json_file)
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f, parse_constant=reject_constant)
+        
+        missing = [num for num, stats in data['main_gaps'].items() if stats['mean'] is None]
+        text = render_text(AnalysisResults.from_dict(data))
+        if not missing or 'nan' in text or 'n/a' not in text:
+            print("❌ Numbers without a completed gap are not reported as null / n/a")
+            return False
+        print(f"✅ Strict JSON with {len(missing)} numbers reported as n/a")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error testing results JSON: {e}")
         return False
 
 def test_analyzer():
@@ -106,6 +826,22 @@ def main():
     tests = [
         ("Dependencies", test_dependencies),
         ("Data File", test_data_file),
+        ("HTML Extractor", test_extractor),
+        ("CSV Refresh", test_csv_refresh),
+        ("Draw Store", test_draw_store),
+        ("Pattern Engines", test_pattern_engines),
+        ("Analysis Pipeline", test_pipeline),
+        ("Analysis Cache", test_analysis_cache),
+        ("Stream Mode", test_stream_mode),
+        ("Backtest Snapshots", test_backtest_snapshots),
+        ("Weighted Sampler", test_weighted_sampler),
+        ("Co-occurrence", test_cooccurrence),
+        ("Synthetic Biases", test_synthetic_biases),
+        ("Ticket Index", test_ticket_index),
+        ("Ticket Matcher", test_ticket_matcher),
+        ("Ticket Generation", test_ticket_generation),
+        ("Syndicate Store", test_syndicate_store),
+        ("Results JSON", test_results_json),
         ("Analyzer Script", test_analyzer),
         ("HTML Generator", test_html_generator),
     ]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Combinatorial index over a game's ticket space.
+Every sorted main line has a colex rank in [0, C(main_pool, main_picks))
+and every star set a rank in [0, C(star_pool, star_picks)); a full ticket
+is line_rank * star_count + star_rank. For EuroMillions that is
+line_rank * 66 + star_rank, a 4-byte key in [0, 139,838,160). A bitset
+over those ranks marks every ticket ever drawn, so "has this exact ticket
+come up" is one bit test and the whole space can be walked or sliced by
+rank.
+
+The scalar functions are pure Python; the array versions need numpy.
+"""
+
+import argparse
+from math import comb
+
+from backend import numpy as np  # lazy: scalar rank/unrank and the bitset work without it
+from draw_store import load_rows, rules_for
+from game_rules import EUROMILLIONS, GAMES, count_dtype, get_game
+
+
+def line_count(rules=EUROMILLIONS):
+    """Number of distinct main lines (2,118,760 for EuroMillions)."""
+    return comb(rules.main_pool, rules.main_picks)
+
+
+def star_count(rules=EUROMILLIONS):
+    """Number of distinct star sets (66 for EuroMillions, 1 for a game without stars)."""
+    return comb(rules.star_pool, rules.star_picks)
+
+
+def key_dtype(rules=EUROMILLIONS):
+    """Narrowest unsigned dtype of the rules' ticket keys (uint32 for EuroMillions)."""
+    return count_dtype(rules.combinations - 1)
+
+
+def rank(numbers):
+    """Colex rank of a combination of 1-based numbers (any order)."""
+    return sum(comb(num - 1, i + 1) for i, num in enumerate(sorted(numbers)))
+
+
+def unrank(rank_value, picks, pool):
+    """Return the sorted 1-based combination of picks numbers from pool with the given colex rank."""
+    numbers = []
+    candidate = pool - 1
+    for i in range(picks, 0, -1):
+        while comb(candidate, i) > rank_value:
+            candidate -= 1
+        numbers.append(candidate + 1)
+        rank_value -= comb(candidate, i)
+        candidate -= 1
+    return numbers[::-1]
+
+
+def ticket_rank(main, lucky, rules=EUROMILLIONS):
+    """Return the key of a ticket: line rank * star_count(rules) + star rank."""
+    return rank(main) * star_count(rules) + rank(lucky)
+
+
+def ticket_unrank(key, rules=EUROMILLIONS):
+    """Return (main, lucky) sorted number lists for a ticket key."""
+    line_rank, star_rank = divmod(key, star_count(rules))
+    return (unrank(line_rank, rules.main_picks, rules.main_pool),
+            unrank(star_rank, rules.star_picks, rules.star_pool))
+
+
+def _binomials(pool, picks):
+    """Table with entry [n, k] = C(n, k) for n <= pool, k <= picks."""
+    return np.array([[comb(n, k) for k in range(picks + 1)] for n in range(pool + 1)], dtype=np.int64)
+
+
+def rank_array(numbers, pool):
+    """Colex ranks of every row of an N x k matrix of 1-based numbers."""
+    numbers = np.sort(np.asarray(numbers, dtype=np.intp), axis=1) - 1
+    binomials = _binomials(pool, numbers.shape[1])
+    return binomials[numbers, np.arange(1, numbers.shape[1] + 1)].sum(axis=1)
+
+
+def unrank_array(ranks, picks, pool):
+    """Return the N x picks sorted uint8 combinations for an array of colex ranks."""
+    remaining = np.asarray(ranks, dtype=np.int64).copy()
+    binomials = _binomials(pool, picks)
+    numbers = np.empty((len(remaining), picks), dtype=np.uint8)
+    for i in range(picks, 0, -1):
+        # Largest n with C(n, i) <= remaining; column i is non-decreasing in n
+        candidate = np.searchsorted(binomials[:, i], remaining, side='right') - 1
+        numbers[:, i - 1] = candidate + 1
+        remaining -= binomials[candidate, i]
+    return numbers
+
+
+def combination_hits(pool, picks, drawn):
+    """Return how many of the drawn numbers every picks-of-pool combination holds, indexed by colex rank.
+
+    In colex order the combinations with largest element top are the
+    combinations of picks - 1 from [0, top) (a prefix of the smaller table)
+    plus top itself, so the uint8 table is built from prefix slices without
+    unranking, whatever the pool size.
+    """
+    drawn = set(drawn)
+    hits = np.zeros(1, dtype=np.uint8)
+    for k in range(1, picks + 1):
+        hits = np.concatenate([hits[:comb(top, k - 1)] + np.uint8(top + 1 in drawn) for top in range(k - 1, pool)])
+    return hits
+
+
+def ticket_ranks(draws, rules=EUROMILLIONS):
+    """Return the ticket keys (in key_dtype(rules)) of an N x width draw matrix."""
+    draws = np.asarray(draws)
+    lines = rank_array(draws[:, :rules.main_picks], rules.main_pool)
+    stars = rank_array(draws[:, rules.main_picks:rules.width], rules.star_pool)
+    return (lines * star_count(rules) + stars).astype(key_dtype(rules))
+
+
+def ticket_unranks(keys, rules=EUROMILLIONS):
+    """Return (N x main_picks, N x star_picks) uint8 matrices for an array of ticket keys."""
+    lines, stars = np.divmod(np.asarray(keys, dtype=np.int64), star_count(rules))
+    return (unrank_array(lines, rules.main_picks, rules.main_pool),
+            unrank_array(stars, rules.star_picks, rules.star_pool))
+
+
+class RankBitset:
+    """One bit per rank in [0, size), stored in a bytearray (17.5 MB for every EuroMillions ticket)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.bits = bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_tickets(cls, rules=EUROMILLIONS):
+        """Return an empty bitset over every ticket key of the rules."""
+        return cls(rules.combinations)
+
+    def add(self, rank_value):
+        """Set the bit of one rank."""
+        self.bits[rank_value >> 3] |= 1 << (rank_value & 7)
+
+    def update(self, ranks):
+        """Set the bits of many ranks (vectorized when given a numpy array)."""
+        if np is not None and np.loaded and isinstance(ranks, np.ndarray):
+            if not len(ranks):
+                return
+            view = np.frombuffer(self.bits, dtype=np.uint8)
+            ranks = np.sort(ranks.astype(np.int64))
+            byte_idx = ranks >> 3
+            bits = (1 << (ranks & 7)).astype(np.uint8)
+            # OR together the bits landing in the same byte, then set each byte once
+            starts = np.flatnonzero(np.concatenate(([True], byte_idx[1:] != byte_idx[:-1])))
+            view[byte_idx[starts]] |= np.bitwise_or.reduceat(bits, starts)
+        else:
+            for rank_value in ranks:
+                self.add(rank_value)
+
+    def __contains__(self, rank_value):
+        return 0 <= rank_value < self.size and bool(self.bits[rank_value >> 3] >> (rank_value & 7) & 1)
+
+    def __len__(self):
+        """Number of set bits."""
+        if np is None:
+            return sum(bin(byte).count('1') for byte in self.bits)
+        return int(np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8)).sum())
+
+    def iter_ranks(self, start=0, stop=None):
+        """Yield the set ranks in [start, stop) in ascending order."""
+        stop = self.size if stop is None else min(stop, self.size)
+        for byte_idx in range(start >> 3, (stop + 7) >> 3):
+            byte = self.bits[byte_idx]
+            while byte:
+                low = byte & -byte
+                rank_value = (byte_idx << 3) + low.bit_length() - 1
+                if start <= rank_value < stop:
+                    yield rank_value
+                byte ^= low
+
+
+class DrawnIndex:
+    """Bitsets of every main line and every full ticket ever drawn."""
+
+    def __init__(self, rows=(), rules=EUROMILLIONS):
+        self.rules = rules
+        self.lines = RankBitset(line_count(rules))
+        self.tickets = RankBitset.for_tickets(rules)
+        for row in rows:
+            self.add(row[1:1 + rules.main_picks], row[1 + rules.main_picks:1 + rules.width])
+
+    @classmethod
+    def from_draws(cls, draws, rules=EUROMILLIONS):
+        """Build the index from an N x width draw matrix in one vectorized pass."""
+        index = cls(rules=rules)
+        keys = ticket_ranks(draws, rules).astype(np.int64)
+        index.tickets.update(keys)
+        index.lines.update(keys // star_count(rules))
+        return index
+
+    def add(self, main, lucky):
+        key = ticket_rank(main, lucky, self.rules)
+        self.tickets.add(key)
+        self.lines.add(key // star_count(self.rules))
+
+    def line_drawn(self, main):
+        """Return True if these main balls have ever been drawn together."""
+        return rank(main) in self.lines
+
+    def ticket_drawn(self, main, lucky):
+        """Return True if this exact ticket (main balls and stars) has ever been drawn."""
+        return ticket_rank(main, lucky, self.rules) in self.tickets
+
+    def drawn_tickets(self, start=0, stop=None):
+        """Yield (main, lucky) for every drawn ticket with a key in [start, stop), in key order."""
+        for key in self.tickets.iter_ranks(start, stop):
+            yield ticket_unrank(key, self.rules)
+
+
+def main():
+    """Report whether a ticket has ever been drawn."""
+    parser = argparse.ArgumentParser(description="Check a ticket against every draw in a history")
+    parser.add_argument('numbers', nargs='+', type=int, help="main balls then stars")
+    parser.add_argument('--data-file', default='lottery_results.csv')
+    parser.add_argument('--game', choices=list(GAMES), help="game of a CSV history (a draw store knows its own)")
+    args = parser.parse_args()
+
+    rules = rules_for(args.data_file, get_game(args.game) if args.game else None)
+    main_balls, lucky_stars = args.numbers[:rules.main_picks], args.numbers[rules.main_picks:]
+    if not rules.is_valid_ticket(main_balls, lucky_stars):
+        parser.error(f"expected {rules.main_picks} distinct balls in 1-{rules.main_pool}"
+                     + (f" then {rules.star_picks} distinct {rules.star_label.lower()}s in 1-{rules.star_pool}"
+                        if rules.star_picks else ""))
+
+    index = DrawnIndex(load_rows(args.data_file, rules), rules)
+    key = ticket_rank(main_balls, lucky_stars, rules)
+    line_rank, star_rank = divmod(key, star_count(rules))
+    print(f"🔑 Ticket key: {key} (line rank {line_rank}, star rank {star_rank})")
+    print(f"{'✅' if index.line_drawn(main_balls) else '❌'} Main line drawn before")
+    print(f"{'✅' if index.ticket_drawn(main_balls, lucky_stars) else '❌'} Exact ticket drawn before")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Match a batch of tickets against the whole draw history.
+Each ticket is reduced to a pair of bitmasks and compared with every draw
+as popcount(ticket_mask & draw_mask), one tickets x draws block at a time,
+with blocks spread over a process pool. For every ticket the result is
+its best match (most main balls, then most stars, earliest draw) and the
+full (main hits, star hits) histogram over the history. Pick counts and
+mask widths come from the game rules, so any k-of-n game can be matched.
+"""
+
+import argparse
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from draw_store import draw_masks, load_rows, rules_for, shared_counts
+from game_rules import EUROMILLIONS, GAMES, get_game
+
+BLOCK_CELLS = 1 << 22  # tickets x draws comparisons per block
+
+
+def read_tickets(path, rules=EUROMILLIONS):
+    """Read tickets (main balls then stars per line) into an N x width matrix.
+
+    Lines that are not rules.width integers (headers, blanks) are skipped; a
+    line with out-of-range or repeated numbers raises ValueError.
+    """
+    tickets = []
+    with open(path, 'r', newline='') as f:
+        for line_no, row in enumerate(csv.reader(f), 1):
+            fields = [field.strip() for field in row if field.strip()]
+            if len(fields) != rules.width or not all(field.isdigit() for field in fields):
+                continue
+            numbers = [int(field) for field in fields]
+            if not rules.is_valid_ticket(numbers[:rules.main_picks], numbers[rules.main_picks:]):
+                raise ValueError(f"{path}:{line_no}: invalid ticket {numbers}")
+            tickets.append(numbers)
+    return np.array(tickets, dtype=rules.number_dtype).reshape(-1, rules.width)
+
+
+def match_block(ticket_main, ticket_star, main_masks, star_masks, rules=EUROMILLIONS):
+    """Match a block of ticket masks against every draw.
+
+    Returns (best_main, best_star, best_draw, histogram) where histogram is
+    len(block) x (main picks + 1) x (star picks + 1).
+    """
+    main_hits = shared_counts(main_masks[None, :], ticket_main[:, None], rules.main_mask_words)
+    star_hits = shared_counts(star_masks[None, :], ticket_star[:, None], rules.star_mask_words)
+    cells = main_hits.astype(np.intp) * (rules.star_picks + 1) + star_hits
+
+    best_draw = np.argmax(cells, axis=1)
+    best_cell = np.take_along_axis(cells, best_draw[:, None], axis=1)[:, 0]
+
+    # Offset each ticket's cells so one bincount builds every histogram
+    offsets = np.arange(len(cells))[:, None] * rules.hit_cells
+    histogram = np.bincount((cells + offsets).ravel(), minlength=len(cells) * rules.hit_cells)
+    histogram = histogram.reshape(len(cells), rules.main_picks + 1, rules.star_picks + 1)
+    best_main, best_star = np.divmod(best_cell, rules.star_picks + 1)
+    return best_main.astype(np.uint8), best_star.astype(np.uint8), best_draw, histogram.astype(np.int32)
+
+
+def _match_job(job):
+    return match_block(*job)
+
+
+def match_tickets(tickets, main_masks, star_masks, workers=None, block_cells=BLOCK_CELLS, rules=EUROMILLIONS):
+    """Match an N x width ticket matrix against the draw masks.
+
+    Returns a dict of arrays: 'best_main', 'best_star', 'best_draw' (index
+    of the earliest draw with the best match) and 'histogram'
+    (N x (main picks + 1) x (star picks + 1)).
+    """
+    ticket_main, ticket_star = draw_masks(tickets, rules)
+    main_masks = np.asarray(main_masks, dtype=rules.main_mask_dtype)
+    star_masks = np.asarray(star_masks, dtype=rules.star_mask_dtype)
+    block = max(1, block_cells // max(len(main_masks) * rules.main_mask_words, 1))
+    jobs = [(ticket_main[start:start + block], ticket_star[start:start + block], main_masks, star_masks, rules)
+            for start in range(0, len(tickets), block)]
+
+    if len(jobs) <= 1 or workers == 1:
+        parts = [_match_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_match_job, jobs))
+
+    if not parts:
+        parts = [_match_job((ticket_main, ticket_star, main_masks, star_masks, rules))]
+    best_main, best_star, best_draw, histogram = (np.concatenate(column) for column in zip(*parts))
+    return {'best_main': best_main, 'best_star': best_star, 'best_draw': best_draw, 'histogram': histogram}
+
+
+def write_matches(path, tickets, matches, dates, rules=EUROMILLIONS):
+    """Write one CSV row per ticket: numbers, best match, its date and the histogram cells."""
+    cells = [f"{main}+{star}" for main in range(rules.main_picks + 1) for star in range(rules.star_picks + 1)]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(rules.main_columns + rules.star_columns + ['Best Main', 'Best Stars', 'Best Date'] + cells)
+        histogram = matches['histogram'].reshape(len(tickets), -1)
+        for i, ticket in enumerate(tickets):
+            writer.writerow(ticket.tolist() + [int(matches['best_main'][i]), int(matches['best_star'][i]),
+                                               dates[matches['best_draw'][i]]] + histogram[i].tolist())
+
+
+def main():
+    """Match a ticket file against the draw history."""
+    parser = argparse.ArgumentParser(description="Match tickets against every historical draw")
+    parser.add_argument('tickets_file', help="CSV with one ticket (main balls then stars) per line")
+    parser.add_argument('data_file', nargs='?', default='lottery_results.csv')
+    parser.add_argument('-o', '--output', help="write per-ticket results to this CSV")
+    parser.add_argument('--workers', type=int, default=None, help="number of matcher processes")
+    parser.add_argument('--game', choices=list(GAMES), help="game of a CSV history (a draw store knows its own)")
+    args = parser.parse_args()
+
+    rules = rules_for(args.data_file, get_game(args.game) if args.game else None)
+    rows = load_rows(args.data_file, rules)
+    draws = np.array([row[1:] for row in rows], dtype=rules.number_dtype)
+    main_masks, star_masks = draw_masks(draws, rules)
+    tickets = read_tickets(args.tickets_file, rules)
+    print(f"🎟️  Matching {len(tickets)} tickets against {len(draws)} draws")
+
+    matches = match_tickets(tickets, main_masks, star_masks, args.workers, rules=rules)
+    if args.output:
+        write_matches(args.output, tickets, matches, [row[0] for row in rows], rules)
+        print(f"✅ Results written to {args.output}")
+
+    best = np.zeros((rules.main_picks + 1, rules.star_picks + 1), dtype=np.int64)
+    np.add.at(best, (matches['best_main'], matches['best_star']), 1)
+    print("\n📊 Best match per ticket:")
+    for main in range(rules.main_picks, -1, -1):
+        for star in range(rules.star_picks, -1, -1):
+            if best[main, star]:
+                print(f"  {main}+{star}: {best[main, star]} tickets")
+
+
+if __name__ == "__main__":
+    main()
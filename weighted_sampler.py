@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Weighted sampling without replacement for the pure-Python predictor.
+A Fenwick (binary indexed) tree over the weights is built once in O(n);
+each pick is a binary descent in O(log n) and removing the picked item
+is a point update in O(log n), so drawing k of n items costs
+O(n + k log n) instead of O(k n). sample_batch reuses one tree for
+many tickets, putting the picked weights back after each draw.
+"""
+
+import random
+
+
+class FenwickSampler:
+    """Weighted sampler over items 0..n-1 supporting O(log n) pick and removal."""
+
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.weights = [float(weight) for weight in weights]
+        self.removed = [False] * self.size
+        self.remaining = self.size
+        self.positive = sum(1 for weight in self.weights if weight > 0)
+        self._build()
+
+    def _build(self):
+        # O(n) construction: push each node's sum to its parent
+        tree = [0.0] + [weight if not removed else 0.0 for weight, removed in zip(self.weights, self.removed)]
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self._top_bit = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def _add(self, idx, delta):
+        i = idx + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        """Return the sum of the weights still in the sampler."""
+        total = 0.0
+        i = self.size
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target):
+        """Return the first index whose cumulative weight reaches target."""
+        pos = 0
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] < target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        if pos >= self.size or self.removed[pos] or self.weights[pos] <= 0:
+            # Float drift past the last positive weight: take the last one left
+            pos = max(i for i in range(self.size) if not self.removed[i] and self.weights[i] > 0)
+        return pos
+
+    def remove(self, idx):
+        """Take item idx out of the sampler."""
+        if not self.removed[idx]:
+            self.removed[idx] = True
+            self.remaining -= 1
+            if self.weights[idx] > 0:
+                self.positive -= 1
+            self._add(idx, -self.weights[idx])
+
+    def restore(self):
+        """Put every removed item back."""
+        if self.remaining < self.size:
+            self.removed = [False] * self.size
+            self.remaining = self.size
+            self.positive = sum(1 for weight in self.weights if weight > 0)
+            self._build()
+
+    def pick(self, rng=random):
+        """Pick one remaining index with probability proportional to its weight.
+
+        Falls back to a uniform pick when every remaining weight is zero.
+        """
+        if not self.remaining:
+            raise IndexError("pick from an empty sampler")
+        if not self.positive:
+            active = [i for i in range(self.size) if not self.removed[i]]
+            return active[rng.randint(0, len(active) - 1)]
+        return self.find(rng.random() * self.total())
+
+    def sample(self, k, rng=random):
+        """Draw up to k distinct indices without replacement, removing them."""
+        selected = []
+        for _ in range(min(k, self.remaining)):
+            idx = self.pick(rng)
+            self.remove(idx)
+            selected.append(idx)
+        return selected
+
+    def sample_batch(self, k, count, rng=random):
+        """Draw count independent k-subsets, restoring the weights between draws."""
+        batch = []
+        for _ in range(count):
+            picked = self.sample(k, rng)
+            for idx in picked:
+                self.removed[idx] = False
+                self.remaining += 1
+                if self.weights[idx] > 0:
+                    self.positive += 1
+                self._add(idx, self.weights[idx])
+            batch.append(picked)
+        return batch
+
+
+def weighted_sample(items, weights, k, rng=random):
+    """Weighted random sampling of k items without replacement."""
+    sampler = FenwickSampler(weights)
+    return [items[idx] for idx in sampler.sample(k, rng)]